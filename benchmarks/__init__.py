@@ -0,0 +1,5 @@
+"""
+Benchmarks de rendimiento para 'src/preprocessing.py' y 'src/cli.py'.
+
+Se ejecutan con 'cli bench' (ver benchmarks.suite).
+"""
@@ -0,0 +1,459 @@
+"""
+Suite de benchmarks de las funciones de preprocesamiento y de la CLI.
+
+Mide cada caso para varios tamaños de entrada y mezclas de datos y
+registra el tiempo (mejor de 'repeat' ejecuciones), el throughput
+(elementos/segundo) y el pico de memoria (tracemalloc). Los resultados se
+guardan como baseline JSON y se pueden comparar entre commits para
+detectar regresiones.
+"""
+
+# Imports
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from fnmatch import fnmatch
+from functools import partial
+from typing import Any, Callable
+
+import numpy as np
+from click.testing import CliRunner
+
+import src.preprocessing as pp
+
+# Tamaños por defecto: 10, 100, ..., 10^7
+DEFAULT_SIZES = [10**exponent for exponent in range(1, 8)]
+
+# Umbral por defecto para marcar una regresión (+20% de tiempo)
+DEFAULT_THRESHOLD = 0.2
+
+# Por debajo de este tiempo las diferencias son ruido de medida
+MIN_COMPARABLE_SECONDS = 1e-3
+
+STOP_WORDS = ["de", "la", "el", "en", "y", "a", "los", "por lo tanto"]
+
+
+# 1. Generadores de datos (mezclas)
+
+
+def _numeric(size: int, rng: random.Random) -> list:
+    """Números limpios (mitad int, mitad float)."""
+    return [
+        rng.randint(-1000, 1000) if i % 2 else rng.uniform(-1e3, 1e3)
+        for i in range(size)
+    ]
+
+
+def _array(size: int, rng: random.Random) -> np.ndarray:
+    """Array float64 (backend vectorizado)."""
+    return np.random.default_rng(rng.randrange(2**32)).uniform(-1e3, 1e3, size)
+
+
+def _missing(size: int, rng: random.Random) -> list:
+    """Números con un 50% de faltantes (None, "", nan)."""
+    holes = [None, "", math.nan]
+    return [
+        rng.choice(holes) if rng.random() < 0.5 else rng.uniform(0, 100)
+        for _ in range(size)
+    ]
+
+
+def _mixed(size: int, rng: random.Random) -> list:
+    """Tipos mezclados: int, float, str, None."""
+    makers = [
+        lambda: rng.randint(0, 100),
+        lambda: rng.uniform(0, 100),
+        lambda: f"id{rng.randint(0, 1000)}",
+        lambda: None,
+    ]
+    return [rng.choice(makers)() for _ in range(size)]
+
+
+def _strings(size: int, rng: random.Random) -> list:
+    """Números escritos como strings (entrada de convert_to_integers)."""
+    return [
+        (
+            str(rng.randint(-(10**6), 10**6))
+            if rng.random() < 0.8
+            else f"{rng.uniform(0, 1e3):.3f}"
+        )
+        for _ in range(size)
+    ]
+
+
+def _nested(size: int, rng: random.Random) -> list:
+    """Listas pequeñas anidadas mezcladas con escalares."""
+    return [
+        [rng.randint(0, 9)] * rng.randint(0, 3) if i % 2 else i for i in range(size)
+    ]
+
+
+_WORDS = (
+    "la casa de el perro en y a los datos modelo aprendizaje automático "
+    "por lo tanto texto prueba Hola, mundo! 123 ¿Qué? tal"
+).split()
+
+
+def _text(size: int, rng: random.Random) -> list:
+    """Documentos largos (~50 palabras con puntuación)."""
+    return [" ".join(rng.choices(_WORDS, k=50)) for _ in range(size)]
+
+
+MIXES: dict[str, Callable[[int, random.Random], Any]] = {
+    "numeric": _numeric,
+    "array": _array,
+    "missing": _missing,
+    "mixed": _mixed,
+    "strings": _strings,
+    "nested": _nested,
+    "text": _text,
+}
+
+
+# 2. Casos: nombre -> (función que recibe los datos, mezclas a las que aplica)
+
+
+def _each(func: Callable[[Any], Any], docs: list) -> list:
+    """Aplica una función de un documento a todos los documentos."""
+    return [func(doc) for doc in docs]
+
+
+def _vectorize(vectorizer: Any, docs: list) -> Any:
+    """Tokeniza los documentos y los vectoriza (HashingVectorizer/CountVectorizer)."""
+    return vectorizer.transform(pp.tokenize_many(docs))
+
+
+def _fit_vocabulary(docs: list) -> Any:
+    """Tokeniza los documentos y construye un Vocabulary podado por frecuencia."""
+    return pp.Vocabulary.fit(pp.tokenize_many(docs), min_df=2)
+
+
+_CLEAN = ("numeric", "missing", "mixed")
+_NUMERIC = ("numeric", "array", "missing", "mixed")
+
+FUNCTION_CASES: dict[str, tuple[Callable[[Any], Any], tuple[str, ...]]] = {
+    "remove_missing_values": (pp.remove_missing_values, _CLEAN),
+    "filling_missing_values": (pp.filling_missing_values, _CLEAN),
+    "remove_duplicated_values": (pp.remove_duplicated_values, _CLEAN),
+    "normalize_min_max": (pp.normalize_min_max, _NUMERIC),
+    "standardize_z_score": (pp.standardize_z_score, _NUMERIC),
+    "clip_values": (partial(pp.clip_values, min_val=0, max_val=100), _NUMERIC),
+    "logarithmic_transform": (pp.logarithmic_transform, _NUMERIC),
+    "convert_to_integers": (pp.convert_to_integers, ("strings", "mixed")),
+    "parse_values": (pp.parse_values, ("strings",)),
+    "tokenize_text": (partial(_each, pp.tokenize_text), ("text",)),
+    "tokenize_many": (pp.tokenize_many, ("text",)),
+    "select_alphanumeric_spaces": (
+        partial(_each, pp.select_alphanumeric_spaces),
+        ("text",),
+    ),
+    "remove_stop_words": (
+        partial(_each, partial(pp.remove_stop_words, stop_words=STOP_WORDS)),
+        ("text",),
+    ),
+    "hashing_vectorizer": (partial(_vectorize, pp.HashingVectorizer()), ("text",)),
+    "vocabulary_fit": (_fit_vocabulary, ("text",)),
+    "flatten_list": (pp.flatten_list, ("nested",)),
+    "shuffle_list": (partial(pp.shuffle_list, seed=0), ("numeric",)),
+    "sample_list": (partial(pp.sample_list, k=1000, seed=0), ("numeric",)),
+    "pipeline": (
+        pp.Pipeline.from_spec(
+            "clean.remove-missing,numeric.clip:0:100,numeric.normalize"
+        ).run,
+        ("missing",),
+    ),
+}
+
+# Comandos de la CLI: nombre -> (argumentos, mezclas). Se ejecutan con --input.
+CLI_CASES: dict[str, tuple[list[str], tuple[str, ...]]] = {
+    "cli clean remove-missing": (["clean", "remove-missing"], ("missing",)),
+    "cli clean fill-missing": (["clean", "fill-missing"], ("missing",)),
+    "cli clean unique": (["clean", "unique"], ("mixed",)),
+    "cli numeric normalize": (["numeric", "normalize"], ("numeric",)),
+    "cli numeric standardize": (["numeric", "standardize"], ("numeric",)),
+    "cli numeric clip": (
+        ["numeric", "clip", "--min-val", "0", "--max-val", "100"],
+        ("numeric",),
+    ),
+    "cli numeric to-integers": (["numeric", "to-integers"], ("strings",)),
+    "cli numeric log-transform": (["numeric", "log-transform"], ("numeric",)),
+    "cli text tokenize": (["text", "tokenize"], ("text",)),
+    "cli text remove-punctuation": (["text", "remove-punctuation"], ("text",)),
+    "cli text remove-stops": (["text", "remove-stops", "--stop-word", "de"], ("text",)),
+    "cli text vectorize": (["text", "vectorize"], ("text",)),
+    "cli struct flatten": (["struct", "flatten"], ("numeric",)),
+    "cli struct shuffle": (["struct", "shuffle", "--seed", "0"], ("numeric",)),
+    "cli struct sample": (
+        ["struct", "sample", "--k", "1000", "--seed", "0"],
+        ("numeric",),
+    ),
+}
+
+
+def _cli_runner(args: list[str], input_path: str) -> Callable[[Any], Any]:
+    """Devuelve una función que ejecuta un comando de la CLI sobre un fichero."""
+    from src.cli import cli  # Import diferido: solo hace falta para estos casos
+
+    runner = CliRunner()
+    output_path = input_path + ".out"
+
+    def run(_data: Any) -> None:
+        result = runner.invoke(
+            cli, [*args, "--input", input_path, "--output", output_path]
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(f"Falló 'cli {' '.join(args)}': {result.output}")
+
+    return run
+
+
+def _write_lines(data: Any, path: str) -> None:
+    """Escribe los datos de una mezcla como un valor por línea."""
+    with open(path, "w", encoding="utf-8") as handle:
+        for item in data:
+            handle.write(f"{item}\n")
+
+
+# 3. Medición
+
+
+def measure(func: Callable[[Any], Any], data: Any, repeat: int = 3) -> dict:
+    """
+    Mide el tiempo (mejor de 'repeat') y el pico de memoria de func(data).
+
+    Args:
+        func (Callable): Función a medir.
+        data (Any): Entrada.
+        repeat (int, optional): Repeticiones cronometradas. Por defecto 3.
+
+    Returns:
+        dict: {'seconds': float, 'peak_bytes': int}
+    """
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+
+    # El pico de memoria se mide aparte: tracemalloc ralentiza la ejecución
+    tracemalloc.start()
+    try:
+        func(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak}
+
+
+def _selected(name: str, patterns: tuple[str, ...]) -> bool:
+    """Indica si un caso coincide con alguno de los patrones (fnmatch)."""
+    return not patterns or any(fnmatch(name, pattern) for pattern in patterns)
+
+
+def run_benchmarks(
+    sizes: list[int] | None = None,
+    cases: tuple[str, ...] = (),
+    mixes: tuple[str, ...] = (),
+    repeat: int = 3,
+    include_cli: bool = True,
+    seed: int = 0,
+    progress: Callable[[dict], None] | None = None,
+) -> list[dict]:
+    """
+    Ejecuta la suite y devuelve un resultado por (caso, mezcla, tamaño).
+
+    Args:
+        sizes (list[int] | None, optional): Tamaños de entrada. Por defecto
+                                            DEFAULT_SIZES.
+        cases (tuple[str, ...], optional): Patrones fnmatch de los casos a
+                                           ejecutar (vacío = todos).
+        mixes (tuple[str, ...], optional): Mezclas a usar (vacío = todas).
+        repeat (int, optional): Repeticiones cronometradas. Por defecto 3.
+        include_cli (bool, optional): Incluir los comandos de la CLI.
+        seed (int, optional): Semilla de los generadores de datos.
+        progress (Callable | None, optional): Se llama con cada resultado.
+
+    Returns:
+        list[dict]: Resultados con case, mix, size, seconds, throughput y peak_bytes.
+    """
+    sizes = sizes or DEFAULT_SIZES
+    all_cases = dict(FUNCTION_CASES)
+    if include_cli:
+        all_cases.update(CLI_CASES)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in sizes:
+            data_cache: dict[str, Any] = {}
+            for name, (target, case_mixes) in all_cases.items():
+                if not _selected(name, cases):
+                    continue
+                for mix in case_mixes:
+                    if mixes and mix not in mixes:
+                        continue
+                    if mix not in data_cache:
+                        data_cache[mix] = MIXES[mix](size, random.Random(seed))
+                    data = data_cache[mix]
+
+                    if name in CLI_CASES:
+                        input_path = os.path.join(tmp_dir, f"{mix}-{size}.txt")
+                        if not os.path.exists(input_path):
+                            _write_lines(data, input_path)
+                        func = _cli_runner(target, input_path)
+                    else:
+                        func = target
+
+                    record = {"case": name, "mix": mix, "size": size}
+                    record.update(measure(func, data, repeat))
+                    seconds = record["seconds"]
+                    record["throughput"] = size / seconds if seconds else math.inf
+                    results.append(record)
+                    if progress is not None:
+                        progress(record)
+    return results
+
+
+def scaling_exponents(results: list[dict]) -> dict[tuple[str, str], float]:
+    """
+    Estima cómo escala cada caso: pendiente de log(tiempo) frente a log(tamaño).
+
+    Un valor cercano a 1 indica coste lineal; cercano a 2, cuadrático.
+
+    Args:
+        results (list[dict]): Resultados de run_benchmarks.
+
+    Returns:
+        dict[tuple[str, str], float]: (caso, mezcla) -> exponente.
+    """
+    curves: dict[tuple[str, str], list[tuple[float, float]]] = {}
+    for record in results:
+        if record["seconds"] > 0:
+            curves.setdefault((record["case"], record["mix"]), []).append(
+                (math.log(record["size"]), math.log(record["seconds"]))
+            )
+    exponents = {}
+    for key, points in curves.items():
+        if len({x for x, _ in points}) >= 2:
+            xs, ys = zip(*points)
+            exponents[key] = float(np.polyfit(xs, ys, 1)[0])
+    return exponents
+
+
+# 4. Baselines y comparación
+
+
+def _git_commit() -> str | None:
+    """Commit actual del repositorio (None si git no está disponible)."""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def save_baseline(results: list[dict], path: str) -> None:
+    """
+    Guarda los resultados como baseline JSON junto con el entorno.
+
+    Args:
+        results (list[dict]): Resultados de run_benchmarks.
+        path (str): Fichero de salida.
+    """
+    baseline = {
+        "meta": {
+            "commit": _git_commit(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(baseline, handle, indent=2)
+
+
+def load_baseline(path: str) -> dict:
+    """Carga una baseline guardada con save_baseline."""
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def compare(
+    baseline: list[dict],
+    current: list[dict],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_seconds: float = MIN_COMPARABLE_SECONDS,
+) -> list[dict]:
+    """
+    Compara dos ejecuciones y devuelve las regresiones de tiempo.
+
+    Solo se comparan los casos presentes en ambas y cuyo tiempo de baseline
+    supera 'min_seconds' (por debajo, el ruido domina).
+
+    Args:
+        baseline (list[dict]): Resultados de referencia.
+        current (list[dict]): Resultados nuevos.
+        threshold (float, optional): Aumento relativo tolerado (0.2 = +20%).
+        min_seconds (float, optional): Tiempo mínimo para comparar.
+
+    Returns:
+        list[dict]: case, mix, size, baseline, current y ratio de cada regresión.
+    """
+    reference = {(r["case"], r["mix"], r["size"]): r for r in baseline}
+    regressions = []
+    for record in current:
+        key = (record["case"], record["mix"], record["size"])
+        old = reference.get(key)
+        if old is None or old["seconds"] < min_seconds:
+            continue
+        ratio = record["seconds"] / old["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                {
+                    "case": key[0],
+                    "mix": key[1],
+                    "size": key[2],
+                    "baseline": old["seconds"],
+                    "current": record["seconds"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def format_report(results: list[dict]) -> str:
+    """
+    Formatea los resultados como tabla de texto con el exponente de escalado.
+
+    Args:
+        results (list[dict]): Resultados de run_benchmarks.
+
+    Returns:
+        str: Tabla lista para imprimir.
+    """
+    exponents = scaling_exponents(results)
+    lines = [
+        f"{'caso':<30} {'mezcla':<8} {'tamaño':>10} {'tiempo (s)':>12} "
+        f"{'elem/s':>12} {'pico (MB)':>10} {'escala':>7}"
+    ]
+    for record in results:
+        exponent = exponents.get((record["case"], record["mix"]))
+        lines.append(
+            f"{record['case']:<30} {record['mix']:<8} {record['size']:>10} "
+            f"{record['seconds']:>12.6f} {record['throughput']:>12.0f} "
+            f"{record['peak_bytes'] / 2**20:>10.2f} "
+            f"{'' if exponent is None else f'{exponent:.2f}':>7}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,247 @@
+"""
+Lectura y escritura por bloques de arrays NumPy (.npy / .npz).
+
+Los .npy (y los miembros sin comprimir de un .npz) se leen con np.memmap:
+cada bloque es una vista del fichero, sin copias ni conversión a texto, así
+que se pueden procesar arrays más grandes que la memoria. Los arrays de
+varias dimensiones se aplanan en el orden en que están guardados (C o
+Fortran), que es el que permite leerlos sin copias. Los .npy de salida se
+escriben bloque a bloque sin conocer de antemano su longitud.
+"""
+
+# Imports
+import os
+import struct
+import zipfile
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+# Número de valores por bloque al leer arrays (8 MB en float64)
+ARRAY_CHUNK_SIZE = 1_000_000
+
+_NPY_MAGIC = b"\x93NUMPY\x01\x00"
+# Cabecera de tamaño fijo: cabe cualquier forma 1-D y se puede reescribir al final
+_NPY_HEADER_SIZE = 128
+
+
+def _read_npy_header(handle: Any) -> tuple[tuple, bool, np.dtype]:
+    """Lee la cabecera de un .npy y deja el fichero al inicio de los datos."""
+    version = np.lib.format.read_magic(handle)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(handle)
+    return np.lib.format.read_array_header_2_0(handle)
+
+
+def _npz_member(archive: zipfile.ZipFile, key: str | None) -> zipfile.ZipInfo:
+    """Busca el array 'key' (por defecto el primero) dentro de un .npz."""
+    names = [name.removesuffix(".npy") for name in archive.namelist()]
+    if not names:
+        raise ValueError("El fichero .npz no contiene arrays.")
+    key = names[0] if key is None else key
+    if key not in names:
+        raise ValueError(
+            f"El .npz no contiene '{key}'. Disponibles: {', '.join(names)}"
+        )
+    return archive.getinfo(f"{key}.npy")
+
+
+def open_array(path: str, key: str | None = None) -> np.ndarray:
+    """
+    Abre un .npy (o un miembro sin comprimir de un .npz) como memmap 1-D.
+
+    Args:
+        path (str): Ruta del .npy o .npz.
+        key (str | None, optional): Array del .npz. Por defecto, el primero.
+
+    Returns:
+        np.ndarray: Vista de solo lectura de los datos, sin cargarlos en memoria.
+
+    Raises:
+        ValueError: Si el miembro del .npz está comprimido (no se puede mapear).
+    """
+    if not path.lower().endswith(".npz"):
+        return np.load(path, mmap_mode="r").ravel(order="K")
+
+    with zipfile.ZipFile(path) as archive:
+        info = _npz_member(archive, key)
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(
+            f"'{info.filename}' está comprimido: usa iter_array_chunks para leerlo."
+        )
+
+    with open(path, "rb") as handle:
+        # Cabecera local del zip: 30 bytes + nombre + campo extra
+        handle.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", handle.read(30)[26:30])
+        handle.seek(info.header_offset + 30 + name_length + extra_length)
+        shape, fortran_order, dtype = _read_npy_header(handle)
+        offset = handle.tell()
+    array = np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+    return array.ravel(order="K")
+
+
+def iter_array_chunks(
+    path: str, chunk_size: int = ARRAY_CHUNK_SIZE, key: str | None = None
+) -> Iterator[np.ndarray]:
+    """
+    Recorre un .npy/.npz por bloques con memoria acotada.
+
+    Los datos mapeables se devuelven como vistas del memmap; los miembros
+    comprimidos de un .npz se descomprimen bloque a bloque.
+
+    Args:
+        path (str): Ruta del .npy o .npz.
+        chunk_size (int, optional): Valores por bloque. Por defecto ARRAY_CHUNK_SIZE.
+        key (str | None, optional): Array del .npz. Por defecto, el primero.
+
+    Returns:
+        Iterator[np.ndarray]: Bloques 1-D del array (aplanado).
+    """
+    if path.lower().endswith(".npz"):
+        with zipfile.ZipFile(path) as archive:
+            info = _npz_member(archive, key)
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as handle:
+                    dtype = _read_npy_header(handle)[2]
+                    while block := handle.read(chunk_size * dtype.itemsize):
+                        yield np.frombuffer(block, dtype=dtype)
+                return
+
+    array = open_array(path, key)
+    for start in range(0, array.size, chunk_size):
+        yield array[start : start + chunk_size]
+
+
+class NpyWriter:
+    """
+    Escribe un .npy 1-D por bloques sin conocer su longitud final.
+
+    Reserva una cabecera de tamaño fijo y la reescribe al cerrar con la
+    longitud real. Sin dtype explícito se usa el del primer bloque (float64
+    si no es numérico) y se promueve con np.result_type si un bloque
+    posterior no cabe sin pérdida (p. ej. enteros seguidos de decimales):
+    lo ya escrito se reescribe con el nuevo dtype. Con un dtype explícito,
+    un bloque que no se puede convertir sin pérdida es un error.
+
+    EJEMPLO:
+        with NpyWriter("salida.npy") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path: str, dtype: Any = None):
+        self.path = path
+        self.dtype = None if dtype is None else np.dtype(dtype)
+        self.fixed_dtype = dtype is not None
+        self.count = 0
+        self._handle = open(path, "wb")
+        self._handle.write(b"\0" * _NPY_HEADER_SIZE)
+
+    def _header(self) -> bytes:
+        header = repr(
+            {
+                "descr": np.lib.format.dtype_to_descr(
+                    self.dtype or np.dtype(np.float64)
+                ),
+                "fortran_order": False,
+                "shape": (self.count,),
+            }
+        )
+        header_length = _NPY_HEADER_SIZE - len(_NPY_MAGIC) - 2
+        return (
+            _NPY_MAGIC
+            + struct.pack("<H", header_length)
+            + header.ljust(header_length - 1).encode("latin-1")
+            + b"\n"
+        )
+
+    def _promote(self, dtype: np.dtype):
+        """Reescribe los valores ya escritos con un dtype más amplio."""
+        self._handle.close()
+        partial_path = f"{self.path}.partial"
+        with open(partial_path, "wb") as handle:
+            handle.write(b"\0" * _NPY_HEADER_SIZE)
+            if self.count:
+                written = np.memmap(
+                    self.path,
+                    dtype=self.dtype,
+                    mode="r",
+                    offset=_NPY_HEADER_SIZE,
+                    shape=(self.count,),
+                )
+                for start in range(0, self.count, ARRAY_CHUNK_SIZE):
+                    block = np.ascontiguousarray(
+                        written[start : start + ARRAY_CHUNK_SIZE], dtype=dtype
+                    )
+                    handle.write(memoryview(block).cast("B"))
+                del written
+        os.replace(partial_path, self.path)
+        self._handle = open(self.path, "r+b")
+        self._handle.seek(0, os.SEEK_END)
+        self.dtype = dtype
+
+    def write(self, chunk: Any):
+        """
+        Añade un bloque de valores al final del fichero.
+
+        Raises:
+            ValueError: Si el dtype es explícito y el bloque no cabe en él sin pérdida.
+        """
+        array = np.asarray(chunk)
+        chunk_dtype = (
+            array.dtype if array.dtype.kind in "biuf" else np.dtype(np.float64)
+        )
+        if self.dtype is None:
+            if array.size == 0:
+                return
+            self.dtype = chunk_dtype
+        elif not np.can_cast(chunk_dtype, self.dtype, casting="safe"):
+            if self.fixed_dtype:
+                raise ValueError(
+                    f"Un bloque {chunk_dtype} no se puede escribir sin pérdida como {self.dtype}."
+                )
+            self._promote(np.result_type(self.dtype, chunk_dtype))
+        array = np.ascontiguousarray(array, dtype=self.dtype).ravel()
+        self._handle.write(memoryview(array).cast("B"))
+        self.count += array.size
+
+    def close(self):
+        """Escribe la cabecera definitiva y cierra el fichero."""
+        if self._handle.closed:
+            return
+        self._handle.seek(0)
+        self._handle.write(self._header())
+        self._handle.close()
+
+    def __enter__(self) -> "NpyWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_npy(chunks: Iterable[Any], path: str, dtype: Any = None) -> int:
+    """
+    Escribe bloques de valores en un .npy 1-D.
+
+    Args:
+        chunks (Iterable[Any]): Bloques (arrays o listas numéricas).
+        path (str): Ruta del .npy de salida.
+        dtype (Any, optional): dtype de salida. Por defecto, el del primer
+            bloque, promovido si un bloque posterior no cabe en él.
+
+    Returns:
+        int: Número de valores escritos.
+    """
+    with NpyWriter(path, dtype) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer.count
@@ -6,44 +6,451 @@ to interact with the functions from 'preprocessing.py'.
 """
 
 # Imports
-from typing import List, Any
+# Solo se importan aquí módulos ligeros: NumPy y 'preprocessing' se cargan
+# la primera vez que un comando los usa, así '--help' y los comandos que no
+# los necesitan arrancan rápido (ver benchmarks/startup.py).
+import csv
+import importlib.util
+import json
+import os
+import sys
+from contextlib import contextmanager, nullcontext
+from functools import cache, partial
+from itertools import islice
+from types import ModuleType
+from typing import Any, Callable, Iterable, Iterator, List
 
 import click
-from numpy import nan
 
-import src.preprocessing as pp  # Importamos el preprocessing
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Registra un módulo que solo se ejecuta al acceder a uno de sus atributos.
+
+    Args:
+        name (str): Nombre completo del módulo.
+
+    Returns:
+        ModuleType: El módulo (cargado de forma diferida si aún no lo estaba).
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+pp = lazy_import("src.preprocessing")  # Importamos el preprocessing (diferido)
+array_io = lazy_import("src.array_io")  # Lectura/escritura de .npy/.npz (diferido)
+
+# Número de valores que se leen y procesan a la vez en el modo streaming
+CHUNK_SIZE = 10_000
+
+# Estrategias de 'clean fill-missing' (copia de pp.FILL_STRATEGIES: usarla
+# aquí cargaría NumPy solo para construir la CLI)
+FILL_STRATEGIES = (
+    "constant",
+    "mean",
+    "median",
+    "mode",
+    "ffill",
+    "bfill",
+    "interpolate",
+)
 
 # 1. Función Ayudante (Helper)
 
 def process_input_list(str_list: tuple) -> List[Any]:
-    """Convierte una tupla de strings de la CLI a una lista con tipos."""
-    processed = []
-    for item in str_list:
-        if item.lower() == "none":
-            processed.append(None)
-        elif item.lower() == "nan":
-            processed.append(nan)
-        elif item == "":
-            processed.append("")
-        else:
-            # Intenta convertir a float o int
-            try:
-                val = float(item)
-                # Si es un entero (ej. 10.0), conviértelo a int
-                if val.is_integer():
-                    processed.append(int(val))
-                else:
-                    processed.append(val)
-            except ValueError:
-                # Si falla, es un string
-                processed.append(item)
-    return processed
+    """
+    Convierte una tupla de strings de la CLI a una lista con tipos.
+
+    Delega en pp.parse_values, que convierte las columnas numéricas por
+    bloques y solo recorre valor a valor las columnas con texto.
+    """
+    return pp.parse_values(str_list)
 
 
 def process_input_value(str_val: str) -> Any:
     """Convierte un solo string de la CLI a su tipo Python."""
-    # Reutilizamos la función de lista para procesar un solo elemento
-    return process_input_list((str_val,))[0]
+    return pp.parse_value(str_val)
+
+
+# 1.1 Ayudantes del modo streaming (--input / --output)
+
+
+def input_options(func: Callable) -> Callable:
+    """Añade las opciones de lectura/escritura en streaming a un comando."""
+    func = click.option(
+        "--column",
+        default=None,
+        help="Columna a leer: nombre en CSV, clave en JSONL o array en .npz (default: la primera).",
+    )(func)
+    func = click.option(
+        "--format",
+        "input_format",
+        type=click.Choice(["lines", "csv", "jsonl"]),
+        default="lines",
+        help="Formato del fichero de entrada (default: lines, un valor por línea).",
+    )(func)
+    func = click.option(
+        "--output",
+        "output_path",
+        type=click.Path(dir_okay=False, allow_dash=True),
+        default=None,
+        help="Fichero de salida, un resultado por línea o un .npy (default: stdout).",
+    )(func)
+    func = click.option(
+        "--input",
+        "input_path",
+        type=click.Path(dir_okay=False, allow_dash=True),
+        default=None,
+        help="Fichero de entrada ('-' para stdin, o .npy/.npz). Se procesa por bloques.",
+    )(func)
+    return func
+
+
+def workers_option(func: Callable) -> Callable:
+    """Añade la opción --workers para procesar los bloques en paralelo."""
+    return click.option(
+        "--workers",
+        default=1,
+        type=click.IntRange(min=1),
+        help="Procesos para el modo streaming (default: 1, sin paralelismo).",
+    )(func)
+
+
+def percentile_option(name: str, default: float | None, help_text: str) -> Callable:
+    """Opción de percentil (0-100) compartida por los comandos por cuantiles."""
+    return click.option(
+        name, default=default, type=click.FloatRange(0, 100), help=help_text
+    )
+
+
+def is_streaming(input_path: str | None, output_path: str | None) -> bool:
+    """Indica si el comando debe ejecutarse en modo streaming."""
+    return input_path is not None or output_path is not None
+
+
+def require_data(data: tuple) -> tuple:
+    """Comprueba que se han pasado valores cuando no se usa --input."""
+    if not data:
+        raise click.UsageError("Indica los valores como argumentos o usa --input.")
+    return data
+
+
+def iter_chunks(values: Iterable, chunk_size: int = CHUNK_SIZE) -> Iterator[list]:
+    """Agrupa un iterable en listas de como mucho 'chunk_size' elementos."""
+    iterator = iter(values)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def csv_column(fieldnames: list[str], column: str | None) -> str:
+    """Columna de un CSV a leer (None es la primera); falla si no existe."""
+    if column is None:
+        return fieldnames[0]
+    if column not in fieldnames:
+        raise click.BadParameter(
+            f"El CSV no tiene la columna '{column}'. Disponibles: {', '.join(fieldnames)}",
+            param_hint="--column",
+        )
+    return column
+
+
+def iter_raw_values(
+    input_path: str, input_format: str = "lines", column: str | None = None
+) -> Iterator[Any]:
+    """
+    Lee los valores de un fichero (o stdin con '-') de uno en uno.
+
+    Args:
+        input_path (str): Ruta del fichero o '-' para stdin.
+        input_format (str): 'lines', 'csv' o 'jsonl'.
+        column (str | None): Columna a leer en CSV/JSONL.
+
+    Returns:
+        Iterator[Any]: Strings (lines/csv) o valores JSON (jsonl). Un CSV
+        vacío (sin cabecera) no devuelve nada.
+
+    Raises:
+        click.BadParameter: Si la columna no está en la cabecera del CSV.
+    """
+    with click.open_file(input_path, "r", encoding="utf-8") as handle:
+        if input_format == "csv":
+            reader = csv.DictReader(handle)
+            if not reader.fieldnames:
+                return
+            key = csv_column(reader.fieldnames, column)
+            for row in reader:
+                yield row[key]
+        elif input_format == "jsonl":
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, dict):
+                    key = column if column is not None else next(iter(record))
+                    yield record.get(key)
+                else:
+                    yield record
+        else:
+            for line in handle:
+                yield line.rstrip("\r\n")
+
+
+def iter_raw_rows(
+    input_path: str, input_format: str, columns: list[str | None]
+) -> Iterator[tuple]:
+    """
+    Lee varias columnas de cada fila de un CSV o JSONL.
+
+    Args:
+        input_path (str): Ruta del fichero o '-' para stdin.
+        input_format (str): 'csv' o 'jsonl'.
+        columns (list[str | None]): Columnas a leer (None es la primera).
+
+    Returns:
+        Iterator[tuple]: Una tupla por fila con los valores de 'columns'
+        (strings en CSV, valores JSON en JSONL; None si a un objeto JSONL
+        le falta la columna). Un CSV vacío no devuelve nada.
+
+    Raises:
+        click.UsageError: Si una columna no está en la cabecera del CSV o
+            en el primer objeto JSONL.
+    """
+    with click.open_file(input_path, "r", encoding="utf-8") as handle:
+        if input_format == "csv":
+            reader = csv.DictReader(handle)
+            if not reader.fieldnames:
+                return
+            check_columns(reader.fieldnames, columns)
+            keys = [reader.fieldnames[0] if key is None else key for key in columns]
+            for row in reader:
+                yield tuple(row.get(key) for key in keys)
+        else:
+            checked = False
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise click.UsageError(
+                        "Con varias columnas cada línea JSONL debe ser un objeto."
+                    )
+                if not checked:
+                    check_columns(list(record), columns)
+                    checked = True
+                first = next(iter(record), None)
+                yield tuple(
+                    record.get(first if key is None else key) for key in columns
+                )
+
+
+def check_columns(available: list[str], columns: list[str | None]) -> None:
+    """Falla con un error de uso si alguna columna pedida no existe."""
+    missing = [key for key in columns if key is not None and key not in available]
+    if missing:
+        raise click.UsageError(
+            f"No existen las columnas: {', '.join(missing)}. Disponibles: {', '.join(available)}"
+        )
+
+
+def is_array_file(path: str | None) -> bool:
+    """Indica si la ruta es un array de NumPy (.npy/.npz), sin importar NumPy."""
+    return path is not None and path.lower().endswith((".npy", ".npz"))
+
+
+def iter_input_chunks(
+    data: tuple,
+    input_path: str | None,
+    input_format: str = "lines",
+    column: str | None = None,
+    parse: bool = True,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[list]:
+    """
+    Devuelve los datos de entrada por bloques, desde los argumentos o --input.
+
+    Un --input .npy/.npz se lee con memmap en bloques de ARRAY_CHUNK_SIZE
+    valores (vistas del fichero, sin pasar por texto); con un .npz, --column
+    elige el array.
+
+    Args:
+        data (tuple): Valores pasados como argumentos.
+        input_path (str | None): Fichero de entrada ('-' para stdin).
+        input_format (str): 'lines', 'csv' o 'jsonl'.
+        column (str | None): Columna a leer en CSV/JSONL.
+        parse (bool): Si es True, convierte los strings con process_input_list.
+        chunk_size (int): Tamaño de cada bloque.
+
+    Returns:
+        Iterator[list]: Bloques de valores (np.ndarray con .npy/.npz).
+    """
+    if input_path is not None and is_array_file(input_path):
+        yield from array_io.iter_array_chunks(input_path, key=column)
+        return
+
+    raw = (
+        iter(data)
+        if input_path is None
+        else iter_raw_values(input_path, input_format, column)
+    )
+    for chunk in iter_chunks(raw, chunk_size):
+        if parse and input_format != "jsonl":
+            chunk = process_input_list(chunk)
+        yield chunk
+
+
+def format_output_value(value: Any, output_format: str = "lines") -> str:
+    """Convierte un resultado a una línea de texto de salida."""
+    if output_format == "jsonl" or isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def write_output(
+    values: Iterable, output_path: str | None, output_format: str = "lines"
+) -> None:
+    """Escribe los resultados de forma incremental, uno por línea."""
+    output_format = "jsonl" if output_format == "jsonl" else "lines"
+    with click.open_file(output_path or "-", "w", encoding="utf-8") as handle:
+        for value in values:
+            handle.write(format_output_value(value, output_format) + "\n")
+
+
+def stream_chunks(
+    func: Callable[[list], Iterable],
+    data: tuple,
+    input_path: str | None,
+    output_path: str | None,
+    input_format: str,
+    column: str | None,
+    parse: bool = True,
+    workers: int = 1,
+) -> None:
+    """
+    Aplica 'func' bloque a bloque y escribe los resultados al vuelo.
+
+    Con workers > 1 los bloques se procesan en un pool de procesos, así que
+    'func' debe poder serializarse (función de módulo o functools.partial).
+    Con un --output .npy los bloques se escriben como array, sin pasar a texto.
+    """
+    chunks = iter_input_chunks(data, input_path, input_format, column, parse)
+    write_chunks(pp.parallel_imap(func, chunks, workers), output_path, input_format)
+
+
+def write_chunks(
+    results: Iterable[Iterable], output_path: str | None, output_format: str = "lines"
+) -> None:
+    """Escribe bloques de resultados: como array si --output es .npy, si no como texto."""
+    if is_array_file(output_path):
+        if output_path.lower().endswith(".npz"):
+            raise click.UsageError(
+                "Los resultados en bloques se escriben como .npy; usa --output salida.npy."
+            )
+        array_io.write_npy(results, output_path)
+        return
+    write_output(
+        (item for result in results for item in result), output_path, output_format
+    )
+
+
+@contextmanager
+def rereadable_input(input_path: str | None):
+    """
+    Garantiza que la entrada se puede leer varias veces.
+
+    Los comandos que necesitan estadísticas globales recorren la entrada dos
+    veces; si la entrada es stdin se vuelca primero a un fichero temporal.
+    """
+    if input_path != "-":
+        yield input_path
+        return
+
+    import shutil  # Imports diferidos: solo se usan al leer de stdin
+    import tempfile
+
+    with (
+        click.open_file("-", "r", encoding="utf-8") as stdin,
+        tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", suffix=".txt", delete=False
+        ) as tmp,
+    ):
+        shutil.copyfileobj(stdin, tmp)
+    try:
+        yield tmp.name
+    finally:
+        os.remove(tmp.name)
+
+
+def stream_scaler(
+    scaler: "pp._Scaler | pp.MissingImputer",
+    data: tuple,
+    input_path: str | None,
+    output_path: str | None,
+    input_format: str,
+    column: str | None,
+    fit: bool = True,
+    workers: int = 1,
+) -> None:
+    """
+    Ajusta (opcionalmente) un escalador o imputador por bloques y transforma la entrada.
+
+    Con fit=True se hace una pasada para las estadísticas y otra para
+    transformar; con fit=False solo la de transformación. Con workers > 1
+    ambas pasadas reparten los bloques entre procesos (reduce en dos fases).
+    """
+    with rereadable_input(input_path) as path:
+        if fit:
+            chunks = iter_input_chunks(data, path, input_format, column)
+            pp.parallel_fit(scaler, chunks, workers)
+        stream_chunks(
+            scaler.transform,
+            data,
+            path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+
+
+def load_bloom_filter(state_file: str | None, capacity: int, fp_rate: float):
+    """
+    Carga el filtro de Bloom de --state-file o crea uno nuevo.
+
+    Args:
+        state_file (str | None): Fichero de estado (puede no existir aún).
+        capacity (int): Capacidad del filtro nuevo.
+        fp_rate (float): Tasa de falsos positivos del filtro nuevo.
+
+    Returns:
+        BloomFilter: El filtro listo para usar.
+    """
+    if state_file and os.path.exists(state_file):
+        try:
+            return pp.BloomFilter.load(state_file)
+        except (OSError, ValueError, KeyError) as error:
+            raise click.ClickException(
+                f"No se pudo leer el estado '{state_file}': {error}"
+            )
+    return pp.BloomFilter(capacity, fp_rate)
+
+
+def save_bloom_filter(bloom, state_file: str | None):
+    """Guarda el filtro en --state-file y avisa si se ha superado su capacidad."""
+    if bloom.count > bloom.capacity:
+        click.echo(
+            f"Aviso: el filtro tiene {bloom.count} valores para una capacidad de "
+            f"{bloom.capacity}; la tasa de falsos positivos supera {bloom.fp_rate}.",
+            err=True,
+        )
+    if state_file:
+        bloom.save(state_file)
 
 
 # 2. Grupo Principal 'cli'
@@ -62,60 +469,261 @@ def clean():
 
 
 @clean.command(help="Elimina valores faltantes (None, '', nan) de una lista.")
-@click.argument(
-    "data", nargs=-1, required=True
-)  # nargs=-1 = acepta múltiples argumentos
-def remove_missing(data: tuple):
+@click.argument("data", nargs=-1)  # nargs=-1 = acepta múltiples argumentos
+@input_options
+@workers_option
+def remove_missing(
+    data: tuple,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Elimina valores faltantes (None, '', nan) de una lista.
 
     EJEMPLO:
     uv run python src/cli.py clean remove-missing 10 20.5 None "" 30 nan text
+    uv run python src/cli.py clean remove-missing --input datos.txt
     """
-    processed_data = process_input_list(data)
+    if is_streaming(input_path, output_path):
+        stream_chunks(
+            pp.remove_missing_values,
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
     result = pp.remove_missing_values(processed_data)
     click.echo(f"Resultado: {result}")
 
 
 @clean.command(help="Rellena valores faltantes con un valor específico.")
-@click.argument(
-    "data", nargs=-1, required=True
-)  # Aqui pasamos los argumentos de la funcion
+@click.argument("data", nargs=-1)  # Aqui pasamos los argumentos de la funcion
 @click.option(
     "--fill-value",
     default="0",  # El default es 0, pero lo pasamos como string
     type=str,
     help="Valor para rellenar los faltantes.",
 )
-def fill_missing(data: tuple, fill_value: str):
+@click.option(
+    "--strategy",
+    default="constant",
+    type=click.Choice(FILL_STRATEGIES),
+    help="Cómo calcular el relleno (default: constant, el de --fill-value).",
+)
+@input_options
+@workers_option
+def fill_missing(
+    data: tuple,
+    fill_value: str,
+    strategy: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Rellena valores faltantes (None, '', nan) con un valor (default 0).
 
     EJEMPLO:
     uv run python src/cli.py clean fill-missing 10 20 None --fill-value -1
     uv run python src/cli.py clean fill-missing 10 20 None --fill-value "NA"
+
+    Con --strategy el relleno se calcula con los datos: mean, median
+    (t-digest) y mode (count-min sketch) se ajustan en una pasada por
+    bloques y rellenan en otra; ffill, bfill e interpolate usan los valores
+    vecinos y se recorren en orden. --fill-value queda para los huecos sin
+    de dónde calcular el relleno.
+
+    EJEMPLO:
+    uv run python src/cli.py clean fill-missing 10 None 30 --strategy interpolate
+    uv run python src/cli.py clean fill-missing --input datos.txt --strategy median --workers 4
     """
-    processed_data = process_input_list(data)
     processed_fill_value = process_input_value(
         fill_value
     )  # Procesamos el valor de relleno
 
-    result = pp.filling_missing_values(processed_data, processed_fill_value)
+    if is_streaming(input_path, output_path):
+        if strategy in ("mean", "median", "mode"):
+            imputer = pp.MissingImputer(strategy, processed_fill_value)
+            stream_scaler(
+                imputer,
+                data,
+                input_path,
+                output_path,
+                input_format,
+                column,
+                workers=workers,
+            )
+        elif strategy in ("ffill", "bfill", "interpolate"):
+            # Los huecos dependen de los vecinos: los bloques van en orden
+            filler = pp.GapFiller(strategy, processed_fill_value)
+            chunks = iter_input_chunks(data, input_path, input_format, column)
+            write_chunks(filler.iter_fill(chunks), output_path, input_format)
+        else:
+            stream_chunks(
+                partial(pp.filling_missing_values, fill_value=processed_fill_value),
+                data,
+                input_path,
+                output_path,
+                input_format,
+                column,
+                workers=workers,
+            )
+        return
+
+    processed_data = process_input_list(require_data(data))
+    result = pp.filling_missing_values(
+        processed_data, processed_fill_value, strategy=strategy
+    )
+    click.echo(f"Resultado: {result}")
+
+
+@clean.command(
+    "missing-mask", help="Marca los valores faltantes (None, '', nan) de una lista."
+)
+@click.argument("data", nargs=-1)
+@input_options
+@workers_option
+def missing_mask(
+    data: tuple,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
+    """
+    Devuelve la máscara de valores faltantes: True en cada posición faltante.
+
+    Con un --output .npy la máscara se guarda como array de bool (1 byte por
+    valor) para reutilizarla sin volver a detectar los faltantes.
+
+    EJEMPLO:
+    uv run python src/cli.py clean missing-mask 10 None "" 30 nan
+    uv run python src/cli.py clean missing-mask --input datos.txt --output mascara.npy
+    """
+    if is_streaming(input_path, output_path):
+        stream_chunks(
+            pp.missing_mask,
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
+    result = pp.missing_mask(processed_data).tolist()
     click.echo(f"Resultado: {result}")
 
 
 @clean.command(help="Elimina valores duplicados de una lista.")
-@click.argument("data", nargs=-1, required=True)
-def unique(data: tuple):
+@click.argument("data", nargs=-1)
+@click.option(
+    "--memory-mb",
+    default=512.0,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Memoria para los valores vistos antes de volcar a disco (default: 512).",
+)
+@click.option(
+    "--spill-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Directorio para el volcado a disco (default: el temporal del sistema).",
+)
+@click.option(
+    "--approximate",
+    is_flag=True,
+    help="Usa un filtro de Bloom: memoria fija, pero algún valor nuevo puede descartarse.",
+)
+@click.option(
+    "--fp-rate",
+    default=0.001,
+    type=click.FloatRange(min=0, max=1, min_open=True, max_open=True),
+    help="Tasa de falsos positivos con --approximate (default: 0.001).",
+)
+@click.option(
+    "--capacity",
+    default=10_000_000,
+    type=click.IntRange(min=1),
+    help="Valores distintos previstos con --approximate (default: 10000000).",
+)
+@click.option(
+    "--state-file",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Estado del filtro de Bloom: se carga si existe y se guarda al terminar.",
+)
+@input_options
+@workers_option
+def unique(
+    data: tuple,
+    memory_mb: float,
+    spill_dir: str,
+    approximate: bool,
+    fp_rate: float,
+    capacity: int,
+    state_file: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Devuelve una lista con valores únicos, conservando el orden.
 
+    Con --input la deduplicación es en streaming: si los valores distintos
+    no caben en --memory-mb se reparten en particiones en disco y el
+    resultado sigue siendo exacto y en el orden de primera aparición.
+
     EJEMPLO:
     uv run python src/cli.py clean unique 10 20 10 30 20 10
+    uv run python src/cli.py clean unique --input ids.txt --output unicos.txt --memory-mb 1024
+
+    Con --approximate se usa un filtro de Bloom de tamaño fijo: nunca deja
+    pasar un duplicado, pero con probabilidad --fp-rate descarta un valor
+    nuevo. Con --state-file el filtro se conserva entre ejecuciones, así que
+    solo se emiten los valores no vistos en ninguna ejecución anterior.
+
+    EJEMPLO:
+    uv run python src/cli.py clean unique --input hoy.txt --approximate --state-file vistos.npz
     """
-    processed_data = process_input_list(data)
-    result = pp.remove_duplicated_values(processed_data)
-    click.echo(f"Resultado: {result}")
+    bloom = load_bloom_filter(state_file, capacity, fp_rate) if approximate else None
+
+    if is_streaming(input_path, output_path):
+        # Fase 1 (en paralelo si hay workers): únicos de cada bloque.
+        # Fase 2: se descartan los ya vistos (con volcado a disco si hace falta).
+        chunks = iter_input_chunks(data, input_path, input_format, column)
+        chunk_uniques = pp.parallel_imap(pp.remove_duplicated_values, chunks, workers)
+        if bloom is None:
+            unique_values = pp.merge_unique_chunks(chunk_uniques, memory_mb, spill_dir)
+        else:
+            unique_values = (
+                item for values in chunk_uniques for item in bloom.filter_new(values)
+            )
+        write_output(unique_values, output_path, input_format)
+    else:
+        processed_data = process_input_list(require_data(data))
+        if bloom is None:
+            result = pp.remove_duplicated_values(processed_data)
+        else:
+            result = bloom.filter_new(pp.remove_duplicated_values(processed_data))
+        click.echo(f"Resultado: {result}")
+
+    if bloom is not None:
+        save_bloom_filter(bloom, state_file)
 
 
 # 4. Subgrupo 'numeric'
@@ -125,76 +733,514 @@ def numeric():
 
 
 @numeric.command(help="Normaliza valores numéricos (Min-Max).")
-@click.argument("data", nargs=-1, required=True)
+@click.argument("data", nargs=-1)
 @click.option("--min-val", default=0.0, type=float, help="Nuevo mínimo (default: 0.0).")
 @click.option("--max-val", default=1.0, type=float, help="Nuevo máximo (default: 1.0).")
-def normalize(data: tuple, min_val: float, max_val: float):
+@input_options
+@workers_option
+def normalize(
+    data: tuple,
+    min_val: float,
+    max_val: float,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Normaliza una lista de números al rango [min, max].
 
+    Con --input se hacen dos pasadas por bloques: una para calcular el
+    mínimo y el máximo, y otra para transformar.
+
     EJEMPLO:
     uv run python src/cli.py numeric normalize 10 20 30 40 50 --min-val 0 --max-val 1
     """
-    processed_data = process_input_list(data)
+    if is_streaming(input_path, output_path):
+        stream_scaler(
+            pp.MinMaxScaler(min_val, max_val),
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
     result = pp.normalize_min_max(processed_data, min_val, max_val)
     click.echo(f"Resultado: {result}")
 
 
 @numeric.command(help="Estandariza valores numéricos (Z-Score).")
-@click.argument("data", nargs=-1, required=True)
-def standardize(data: tuple):
+@click.argument("data", nargs=-1)
+@input_options
+@workers_option
+def standardize(
+    data: tuple,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Estandariza una lista de números usando Z-score.
 
+    Con --input se hacen dos pasadas por bloques: una para la media y la
+    desviación estándar, y otra para transformar.
+
     EJEMPLO:
     uv run python src/cli.py numeric standardize 10 20 30 40 50
     """
-    processed_data = process_input_list(data)
+    if is_streaming(input_path, output_path):
+        stream_scaler(
+            pp.ZScoreScaler(),
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
     result = pp.standardize_z_score(processed_data)
     click.echo(f"Resultado: {result}")
 
 
+@numeric.command(
+    "robust-scale", help="Escala con la mediana y el rango intercuartílico."
+)
+@click.argument("data", nargs=-1)
+@percentile_option("--lower-pct", 25.0, "Percentil inferior del rango (default: 25).")
+@percentile_option("--upper-pct", 75.0, "Percentil superior del rango (default: 75).")
+@input_options
+@workers_option
+def robust_scale(
+    data: tuple,
+    lower_pct: float,
+    upper_pct: float,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
+    """
+    Escala una lista de números: (X - mediana) / (P_upper - P_lower).
+
+    Los valores extremos no cambian la escala del resto, a diferencia de
+    normalize. Con --input se hacen dos pasadas por bloques: una para el
+    t-digest (combinando los de cada bloque) y otra para transformar.
+
+    EJEMPLO:
+    uv run python src/cli.py numeric robust-scale 1 2 3 4 5 1000
+    uv run python src/cli.py numeric robust-scale --input datos.txt --workers 4
+    """
+    if lower_pct > upper_pct:
+        raise click.BadParameter(
+            "--lower-pct no puede ser mayor que --upper-pct.", param_hint="--lower-pct"
+        )
+    if is_streaming(input_path, output_path):
+        stream_scaler(
+            pp.RobustScaler(lower_pct, upper_pct),
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
+    result = pp.robust_scale(processed_data, lower_pct, upper_pct)
+    click.echo(f"Resultado: {result}")
+
+
+@numeric.command(help="Calcula media, desviación, mínimo y máximo en una pasada.")
+@click.argument("data", nargs=-1)
+@click.option(
+    "--merge",
+    "merge_files",
+    multiple=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Estadísticas parciales (JSON de --save) a combinar; usar varias veces.",
+)
+@click.option(
+    "--save",
+    "save_path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Guarda las estadísticas en JSON para combinarlas después.",
+)
+@input_options
+def stats(
+    data: tuple,
+    merge_files: tuple,
+    save_path: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
+    """
+    Calcula estadísticas con un acumulador en streaming (Welford/Chan).
+
+    Cada bloque de la entrada se combina con el acumulado, así que la
+    columna nunca se carga completa. Las estadísticas de bloques procesados
+    por separado (p. ej. en paralelo) se combinan con --merge.
+
+    EJEMPLO:
+    uv run python src/cli.py numeric stats --input parte1.txt --save parte1.json
+    uv run python src/cli.py numeric stats --merge parte1.json --merge parte2.json
+    """
+    if input_path is None and not merge_files:
+        require_data(data)
+
+    running = pp.RunningStats()
+    for path in merge_files:
+        with open(path, encoding="utf-8") as handle:
+            running.merge(pp.RunningStats.from_dict(json.load(handle)))
+    for chunk in iter_input_chunks(data, input_path, input_format, column):
+        running.update_many(chunk)
+
+    if save_path is not None:
+        with open(save_path, "w", encoding="utf-8") as handle:
+            json.dump(running.to_dict(), handle)
+
+    state = running.to_dict()
+    summary = {
+        "count": running.count,
+        "mean": running.mean,
+        "std": running.std,
+        "min": state["min"],
+        "max": state["max"],
+    }
+    if output_path is not None:
+        write_output([summary], output_path, "jsonl")
+        return
+    click.echo(f"Resultado: {summary}")
+
+
+@numeric.command(help="Calcula y guarda las estadísticas de un escalador.")
+@click.argument("data", nargs=-1)
+@click.option(
+    "--method",
+    type=click.Choice(["minmax", "zscore", "robust", "percentile-clip"]),
+    default="minmax",
+    help="Escalador a ajustar (default: minmax).",
+)
+@click.option(
+    "--min-val",
+    default=0.0,
+    type=float,
+    help="Nuevo mínimo para minmax (default: 0.0).",
+)
+@click.option(
+    "--max-val",
+    default=1.0,
+    type=float,
+    help="Nuevo máximo para minmax (default: 1.0).",
+)
+@percentile_option(
+    "--lower-pct",
+    None,
+    "Percentil inferior para robust (default: 25) o percentile-clip (default: 1).",
+)
+@percentile_option(
+    "--upper-pct",
+    None,
+    "Percentil superior para robust (default: 75) o percentile-clip (default: 99).",
+)
+@click.option(
+    "--stats-file",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Fichero JSON donde se guardan las estadísticas.",
+)
+@input_options
+def fit(
+    data: tuple,
+    method: str,
+    min_val: float,
+    max_val: float,
+    lower_pct: float,
+    upper_pct: float,
+    stats_file: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
+    """
+    Ajusta un escalador (min-max, z-score, robusto o recorte a percentiles)
+    y guarda sus estadísticas.
+
+    EJEMPLO:
+    uv run python src/cli.py numeric fit 10 20 30 --method zscore --stats-file stats.json
+    uv run python src/cli.py numeric fit --input datos.txt --method percentile-clip --upper-pct 95 --stats-file clip.json
+    """
+    if input_path is None:
+        require_data(data)
+
+    if method in ("robust", "percentile-clip"):
+        scaler_class = pp.RobustScaler if method == "robust" else pp.PercentileClipper
+        percentiles = {
+            name: value
+            for name, value in (("lower_pct", lower_pct), ("upper_pct", upper_pct))
+            if value is not None
+        }
+        try:
+            scaler = scaler_class(**percentiles)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="--lower-pct") from error
+    elif method == "zscore":
+        scaler = pp.ZScoreScaler()
+    else:
+        scaler = pp.MinMaxScaler(min_val, max_val)
+
+    for chunk in iter_input_chunks(data, input_path, input_format, column):
+        scaler.partial_fit(chunk)
+    scaler.save(stats_file)
+    click.echo(f"Estadísticas guardadas en {stats_file}: {scaler.to_dict()}")
+
+
+@numeric.command(help="Aplica un escalador guardado con 'numeric fit'.")
+@click.argument("data", nargs=-1)
+@click.option(
+    "--stats-file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Fichero JSON generado por 'numeric fit'.",
+)
+@input_options
+@workers_option
+def apply(
+    data: tuple,
+    stats_file: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
+    """
+    Transforma valores con las estadísticas guardadas (sin recalcularlas).
+
+    EJEMPLO:
+    uv run python src/cli.py numeric apply 15 25 --stats-file stats.json
+    """
+    try:
+        scaler = pp.load_scaler(stats_file)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--stats-file") from error
+
+    try:
+        if is_streaming(input_path, output_path):
+            stream_scaler(
+                scaler,
+                data,
+                input_path,
+                output_path,
+                input_format,
+                column,
+                fit=False,
+                workers=workers,
+            )
+            return
+
+        processed_data = process_input_list(require_data(data))
+        result = scaler.transform(processed_data)
+    except ValueError as error:
+        raise click.ClickException(str(error)) from error
+    click.echo(f"Resultado: {result}")
+
+
 @numeric.command(help="Recorta valores numéricos a un rango.")
-@click.argument("data", nargs=-1, required=True)
+@click.argument("data", nargs=-1)
 @click.option("--min-val", default=0.0, type=float, help="Valor mínimo (default: 0.0).")
 @click.option("--max-val", default=1.0, type=float, help="Valor máximo (default: 1.0).")
-def clip(data: tuple, min_val: float, max_val: float):
+@percentile_option(
+    "--lower-pct", None, "Recorta al percentil inferior (0-100) en lugar de --min-val."
+)
+@percentile_option(
+    "--upper-pct", None, "Recorta al percentil superior (0-100) en lugar de --max-val."
+)
+@input_options
+@workers_option
+def clip(
+    data: tuple,
+    min_val: float,
+    max_val: float,
+    lower_pct: float | None,
+    upper_pct: float | None,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Recorta valores numéricos a un rango [min, max].
 
+    Con --lower-pct/--upper-pct los límites son percentiles de los datos,
+    estimados con un t-digest (una pasada, sin ordenar la columna; con
+    --input los resúmenes de cada bloque se combinan). Si solo se da uno,
+    el otro es 0 o 100.
+
     EJEMPLO:
     uv run python src/cli.py numeric clip 5 10 15 20 25 --min-val 10 --max-val 20
+    uv run python src/cli.py numeric clip --input datos.txt --lower-pct 1 --upper-pct 99
     """
-    processed_data = process_input_list(data)
+    if lower_pct is not None or upper_pct is not None:
+        lower_pct = 0.0 if lower_pct is None else lower_pct
+        upper_pct = 100.0 if upper_pct is None else upper_pct
+        if lower_pct > upper_pct:
+            raise click.BadParameter(
+                "--lower-pct no puede ser mayor que --upper-pct.",
+                param_hint="--lower-pct",
+            )
+        if is_streaming(input_path, output_path):
+            stream_scaler(
+                pp.PercentileClipper(lower_pct, upper_pct),
+                data,
+                input_path,
+                output_path,
+                input_format,
+                column,
+                workers=workers,
+            )
+            return
+        processed_data = process_input_list(require_data(data))
+        result = pp.clip_percentiles(processed_data, lower_pct, upper_pct)
+        click.echo(f"Resultado: {result}")
+        return
+
+    if is_streaming(input_path, output_path):
+        stream_chunks(
+            partial(pp.clip_values, min_val=min_val, max_val=max_val),
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
     result = pp.clip_values(processed_data, min_val, max_val)
     click.echo(f"Resultado: {result}")
 
 
+def parse_integer_chunk(as_array: bool, chunk: Any) -> tuple[Any, list[int], list]:
+    """Convierte un bloque a enteros y devuelve también los valores rechazados."""
+    values, rejected = pp.parse_integers(chunk, as_array)
+    return values, rejected, [chunk[position] for position in rejected]
+
+
+def report_rejected(results: Iterable[tuple], report_path: str | None) -> Iterator:
+    """Devuelve los enteros de cada bloque y escribe los rechazados en un CSV."""
+    report = (
+        nullcontext()
+        if report_path is None
+        else open(report_path, "w", newline="", encoding="utf-8")
+    )
+    with report as handle:
+        writer = None if handle is None else csv.writer(handle)
+        if writer is not None:
+            writer.writerow(["position", "value"])
+        offset = 0
+        for values, rejected, raw_values in results:
+            if writer is not None:
+                writer.writerows(
+                    zip((offset + position for position in rejected), raw_values)
+                )
+            offset += len(values) + len(rejected)
+            yield values
+
+
 @numeric.command(help="Convierte strings a enteros.")
-@click.argument("data", nargs=-1, required=True)
-def to_integers(data: tuple):
+@click.argument("data", nargs=-1)
+@click.option(
+    "--report",
+    "report_path",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="CSV con la posición y el valor de cada valor rechazado.",
+)
+@input_options
+@workers_option
+def to_integers(
+    data: tuple,
+    report_path: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Convierte una lista de strings a enteros, ignorando no numéricos.
 
+    Los enteros grandes se leen de forma exacta. Con --report los valores
+    descartados se anotan (posición en la entrada y valor) para poder
+    revisar columnas sucias. Con un --output .npy el resultado es int64 y
+    los enteros que no caben también se rechazan.
+
     EJEMPLO:
     uv run python src/cli.py numeric to-integers 10.5 "20" 30.0 "texto"
+    uv run python src/cli.py numeric to-integers --input ids.txt --output ids.npy --report rechazados.csv
     """
-    # La función 'convert_to_integers' espera strings,
+    # La función 'parse_integers' espera strings,
     # así que no usamos el helper 'process_input_list'.
-    result = pp.convert_to_integers(list(data))
+    convert = partial(parse_integer_chunk, is_array_file(output_path))
+    if is_streaming(input_path, output_path):
+        chunks = iter_input_chunks(data, input_path, input_format, column, parse=False)
+        results = pp.parallel_imap(convert, chunks, workers)
+        write_chunks(report_rejected(results, report_path), output_path, input_format)
+        return
+
+    (result,) = report_rejected([convert(list(require_data(data)))], report_path)
     click.echo(f"Resultado: {result}")
 
 
 @numeric.command(help="Aplica transformación logarítmica.")
-@click.argument("data", nargs=-1, required=True)
-def log_transform(data: tuple):
+@click.argument("data", nargs=-1)
+@input_options
+@workers_option
+def log_transform(
+    data: tuple,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Aplica logaritmo natural a números positivos.
 
     EJEMPLO:
     uv run python src/cli.py numeric log-transform 1 10 100 -5 0
     """
-    processed_data = process_input_list(data)
+    if is_streaming(input_path, output_path):
+        stream_chunks(
+            pp.logarithmic_transform,
+            data,
+            input_path,
+            output_path,
+            input_format,
+            column,
+            workers=workers,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
     result = pp.logarithmic_transform(processed_data)
     click.echo(f"Resultado: {result}")
 
@@ -205,22 +1251,102 @@ def text():
     pass
 
 
+def map_documents(func: Callable[[str], str], chunk: list) -> list:
+    """Aplica una función de texto a cada documento de un bloque."""
+    return [func(doc) for doc in chunk]
+
+
+def stream_documents(
+    chunk_func: Callable[[list], list],
+    text_input: str | None,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int = 1,
+) -> bool:
+    """
+    Procesa un documento por línea (o por fila CSV/JSONL) en modo streaming.
+
+    'chunk_func' recibe un bloque de documentos y devuelve un resultado por
+    documento.
+
+    Returns:
+        bool: True si se ha usado el modo streaming.
+    """
+    if not is_streaming(input_path, output_path):
+        if text_input is None:
+            raise click.UsageError("Indica el texto como argumento o usa --input.")
+        return False
+
+    data = () if text_input is None else (text_input,)
+    stream_chunks(
+        chunk_func,
+        data,
+        input_path,
+        output_path,
+        input_format,
+        column,
+        parse=False,
+        workers=workers,
+    )
+    return True
+
+
 @text.command(help="Tokeniza texto (alfanuméricos y minúsculas).")
-@click.argument("text_input", type=str)
-def tokenize(text_input: str):
+@click.argument("text_input", type=str, required=False)
+@click.option(
+    "--as-list",
+    is_flag=True,
+    help="Devuelve la lista de tokens en lugar del texto unido por espacios.",
+)
+@input_options
+@workers_option
+def tokenize(
+    text_input: str,
+    as_list: bool,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Tokeniza texto: solo alfanuméricos y convierte a minúsculas.
 
+    Con --input se tokenizan los documentos por lotes con el Tokenizer.
+
     EJEMPLO:
     uv run python src/cli.py text tokenize "Hola, mundo! Esto es 1 prueba."
+    uv run python src/cli.py text tokenize --input docs.txt --as-list
     """
-    result = pp.tokenize_text(text_input)
+    if stream_documents(
+        partial(pp.tokenize_many, join=not as_list),
+        text_input,
+        input_path,
+        output_path,
+        input_format,
+        column,
+        workers,
+    ):
+        return
+
+    result = pp.tokenize_many([text_input], join=not as_list)[0]
     click.echo(f"Resultado: {result}")
 
 
 @text.command(help="Selecciona solo alfanuméricos y espacios.")
-@click.argument("text_input", type=str)
-def remove_punctuation(text_input: str):
+@click.argument("text_input", type=str, required=False)
+@input_options
+@workers_option
+def remove_punctuation(
+    text_input: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Elimina puntuación, conservando solo alfanuméricos y espacios.
     (Nota: El lab nombra este comando 'Remove punctuation')
@@ -228,87 +1354,930 @@ def remove_punctuation(text_input: str):
     EJEMPLO:
     uv run python src/cli.py text remove-punctuation "Test... con acentos? Sí!"
     """
+    if stream_documents(
+        partial(map_documents, pp.select_alphanumeric_spaces),
+        text_input,
+        input_path,
+        output_path,
+        input_format,
+        column,
+        workers,
+    ):
+        return
+
     result = pp.select_alphanumeric_spaces(text_input)
     click.echo(f"Resultado: {result}")
 
 
 @text.command(help="Elimina stop-words de un texto.")
-@click.argument("text_input", type=str)
+@click.argument("text_input", type=str, required=False)
 @click.option(
     "--stop-word",
     "stop_words",  # Nombre de la variable en la función
     multiple=True,  # Permite usar la opción varias veces
     help="Palabra a eliminar (usar varias veces para una lista).",
 )
-def remove_stops(text_input: str, stop_words: tuple):
+@click.option(
+    "--stop-words-file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Fichero con una stop word (o frase) por línea; se compila una vez.",
+)
+@input_options
+@workers_option
+def remove_stops(
+    text_input: str,
+    stop_words: tuple,
+    stop_words_file: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+    workers: int,
+):
     """
     Elimina una lista de stop-words de un texto.
 
+    Las entradas con varias palabras ('por lo tanto') se eliminan como frase.
+
     EJEMPLO:
     uv run python src/cli.py text remove-stops "este es un texto de prueba" --stop-word "un" --stop-word "de"
+    uv run python src/cli.py text remove-stops --input docs.txt --stop-words-file stops.txt
     """
-    # 'stop_words' es una tupla, la convertimos a lista para la lógica
-    result = pp.remove_stop_words(text_input, list(stop_words))
+    # El filtro se compila una sola vez y se reutiliza para todos los documentos
+    entries = list(stop_words)
+    if stop_words_file is not None:
+        entries.extend(pp.read_stop_words(stop_words_file))
+    stop_filter = pp.StopWordFilter(entries)
+
+    if stream_documents(
+        partial(map_documents, stop_filter.filter),
+        text_input,
+        input_path,
+        output_path,
+        input_format,
+        column,
+        workers,
+    ):
+        return
+
+    result = pp.remove_stop_words(text_input, stop_filter)
     click.echo(f"Resultado: {result}")
 
 
+def matrix_rows(matrix: Any, feature_names: list[str] | None = None) -> Iterator[dict]:
+    """Cada fila de una CSRMatrix como dict columna (o token) -> valor."""
+    data, indices, indptr = (
+        matrix.data.tolist(),
+        matrix.indices.tolist(),
+        matrix.indptr.tolist(),
+    )
+    for start, end in zip(indptr, indptr[1:]):
+        columns = indices[start:end]
+        keys = (
+            columns
+            if feature_names is None
+            else [feature_names[column] for column in columns]
+        )
+        yield dict(zip(keys, data[start:end]))
+
+
+@text.command(help="Convierte documentos en una matriz dispersa de recuentos.")
+@click.argument("text_input", type=str, required=False)
+@click.option(
+    "--method",
+    type=click.Choice(["hashing", "count"]),
+    default="hashing",
+    help="hashing: columnas fijas, sin vocabulario; count: una columna por token (default: hashing).",
+)
+@click.option(
+    "--n-features",
+    default=2**20,
+    type=click.IntRange(min=1),
+    help="Número de columnas con --method hashing (default: 1048576).",
+)
+@click.option(
+    "--binary",
+    is_flag=True,
+    help="Marca con 1 los tokens presentes en lugar de contarlos.",
+)
+@click.option(
+    "--stop-words-file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Fichero con una stop word (o frase) por línea, que no se cuentan.",
+)
+@click.option(
+    "--vocabulary",
+    "vocabulary_dir",
+    default=None,
+    type=click.Path(exists=True, file_okay=False),
+    help="Con --method count, vocabulario fijo guardado con 'text vocabulary' (se abre con mmap).",
+)
+@click.option(
+    "--vocabulary-output",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Con --method count, fichero con un token por línea (la línea i es la columna i).",
+)
+@input_options
+def vectorize(
+    text_input: str,
+    method: str,
+    n_features: int,
+    binary: bool,
+    stop_words_file: str,
+    vocabulary_dir: str,
+    vocabulary_output: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
+    """
+    Tokeniza documentos y cuenta sus tokens en una matriz dispersa (CSR).
+
+    Con un --output .npz la matriz (una fila por documento) se guarda en el
+    formato de scipy.sparse.save_npz; si no, cada documento se escribe como
+    un objeto JSON columna -> recuento. Los bloques se vectorizan según se
+    leen, así que la memoria crece con los valores distintos de cero.
+
+    EJEMPLO:
+    uv run python src/cli.py text vectorize "Hola mundo, hola" --method count
+    uv run python src/cli.py text vectorize --input docs.txt --output X.npz --n-features 262144
+    uv run python src/cli.py text vectorize --input docs.txt --output X.npz --method count --vocabulary-output vocab.txt
+    uv run python src/cli.py text vectorize --input docs.txt --output X.npz --method count --vocabulary vocab/
+    """
+    if method != "count" and (
+        vocabulary_output is not None or vocabulary_dir is not None
+    ):
+        raise click.UsageError(
+            "--vocabulary y --vocabulary-output solo se usan con --method count."
+        )
+    stop_filter = (
+        None
+        if stop_words_file is None
+        else pp.StopWordFilter.from_file(stop_words_file)
+    )
+    if method == "hashing":
+        vectorizer = pp.HashingVectorizer(n_features, binary)
+        vectorize_chunk, feature_names = vectorizer.transform, None
+    elif vocabulary_dir is not None:
+        # Vocabulario fijo: los nombres de las columnas no cambian entre bloques
+        vectorizer = pp.CountVectorizer(pp.Vocabulary.load(vocabulary_dir), binary)
+        vectorize_chunk, feature_names = vectorizer.transform, cache(
+            vectorizer.feature_names
+        )
+    else:
+        vectorizer = pp.CountVectorizer(binary=binary)
+        vectorize_chunk, feature_names = (
+            vectorizer.fit_transform,
+            vectorizer.feature_names,
+        )
+
+    def to_matrix(chunk: list):
+        tokens = pp.tokenize_many(chunk)
+        if stop_filter is not None:
+            tokens = [stop_filter.filter_tokens(doc) for doc in tokens]
+        return vectorize_chunk(tokens)
+
+    if not is_streaming(input_path, output_path):
+        if text_input is None:
+            raise click.UsageError("Indica el texto como argumento o usa --input.")
+        matrix = to_matrix([text_input])
+        row = next(matrix_rows(matrix, feature_names and feature_names()))
+        click.echo(f"Resultado: {row}")
+        return
+
+    data = () if text_input is None else (text_input,)
+    matrices = map(
+        to_matrix,
+        iter_input_chunks(data, input_path, input_format, column, parse=False),
+    )
+    if output_path is not None and output_path.lower().endswith(".npz"):
+        pp.CSRMatrix.vstack(matrices).save(output_path)
+    else:
+        # El vocabulario crece según se lee: cada bloque usa los nombres de su momento
+        rows = (
+            row
+            for matrix in matrices
+            for row in matrix_rows(matrix, feature_names and feature_names())
+        )
+        write_output(rows, output_path, "jsonl")
+
+    if vocabulary_output is not None:
+        with open(vocabulary_output, "w", encoding="utf-8") as handle:
+            handle.writelines(f"{token}\n" for token in vectorizer.feature_names())
+
+
+def parse_df_limit(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> float | None:
+    """--min-df/--max-df: un entero es un número de documentos y un decimal una proporción."""
+    if value is None:
+        return None
+    try:
+        limit = int(value) if value.strip().isdigit() else float(value)
+    except ValueError:
+        raise click.BadParameter(
+            f"'{value}' no es un número de documentos ni una proporción."
+        )
+    if isinstance(limit, float) and not 0 <= limit <= 1:
+        raise click.BadParameter("Una proporción de documentos debe estar entre 0 y 1.")
+    return limit
+
+
+@text.command(
+    help="Construye un vocabulario persistente con poda por frecuencia de documento."
+)
+@click.argument("text_input", type=str, required=False)
+@click.option(
+    "--vocabulary",
+    "vocabulary_dir",
+    required=True,
+    type=click.Path(file_okay=False),
+    help="Directorio donde se guarda el índice del vocabulario.",
+)
+@click.option(
+    "--min-df",
+    default="1",
+    callback=parse_df_limit,
+    help="Documentos mínimos (entero) o proporción mínima (decimal) de un token (default: 1).",
+)
+@click.option(
+    "--max-df",
+    default="1.0",
+    callback=parse_df_limit,
+    help="Documentos máximos (entero) o proporción máxima (decimal) de un token (default: 1.0).",
+)
+@click.option(
+    "--max-size",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Conserva solo los tokens en más documentos (default: sin límite).",
+)
+@click.option(
+    "--stop-words-file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Fichero con una stop word (o frase) por línea, que no entran en el vocabulario.",
+)
+@click.option(
+    "--memory-mb",
+    default=512.0,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Memoria para los recuentos antes de volcar a disco (default: 512).",
+)
+@click.option(
+    "--spill-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Directorio para el volcado a disco (default: el temporal del sistema).",
+)
+@input_options
+def vocabulary(
+    text_input: str,
+    vocabulary_dir: str,
+    min_df: float,
+    max_df: float,
+    max_size: int,
+    stop_words_file: str,
+    memory_mb: float,
+    spill_dir: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
+    """
+    Cuenta en cuántos documentos aparece cada token y guarda el vocabulario podado.
+
+    Los recuentos se vuelcan a disco por particiones si no caben en
+    --memory-mb. El índice guardado se abre con mmap desde 'text vectorize
+    --vocabulary', sin leerlo entero. Con --output se escribe además un
+    token por línea (la línea i es la columna i).
+
+    EJEMPLO:
+    uv run python src/cli.py text vocabulary --input docs.txt --vocabulary vocab/ --min-df 5 --max-df 0.5
+    uv run python src/cli.py text vocabulary --input docs.txt --vocabulary vocab/ --max-size 100000 --memory-mb 256
+    """
+    if input_path is None and text_input is None:
+        raise click.UsageError("Indica el texto como argumento o usa --input.")
+    stop_filter = (
+        None
+        if stop_words_file is None
+        else pp.StopWordFilter.from_file(stop_words_file)
+    )
+
+    def iter_tokens() -> Iterator[list]:
+        data = () if text_input is None else (text_input,)
+        for chunk in iter_input_chunks(
+            data, input_path, input_format, column, parse=False
+        ):
+            tokens = pp.tokenize_many(chunk)
+            if stop_filter is not None:
+                tokens = [stop_filter.filter_tokens(doc) for doc in tokens]
+            yield from tokens
+
+    try:
+        index = pp.Vocabulary.fit(
+            iter_tokens(), min_df, max_df, max_size, memory_mb, spill_dir
+        )
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    index.save(vocabulary_dir)
+    if output_path is not None:
+        write_output(index, output_path, "lines")
+    click.echo(
+        f"Vocabulario: {len(index)} tokens de {index.n_docs} documentos en '{vocabulary_dir}'.",
+        err=True,
+    )
+
+
 # 6. Subgrupo 'struct'
 @cli.group(help="Funciones relacionadas con la estructura de datos.")
 def struct():
     pass
 
 
+def parse_json_value(text: Any) -> Any:
+    """Lee un valor como JSON (p. ej. '[1, [2, 3]]'); si no lo es, como valor suelto."""
+    if not isinstance(text, str):
+        return text
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return pp.parse_value(text)
+
+
 @struct.command(help="Aplana una lista de listas.")
-@click.argument("data", nargs=-1, required=True)
-def flatten(data: tuple):
+@click.argument("data", nargs=-1)
+@click.option(
+    "--depth",
+    default=1,
+    type=click.IntRange(min=0),
+    help="Niveles a aplanar (default: 1).",
+)
+@click.option("--full", is_flag=True, help="Aplana todos los niveles (ignora --depth).")
+@input_options
+def flatten(
+    data: tuple,
+    depth: int,
+    full: bool,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
     """
     Aplana una lista mixta de elementos y listas.
 
-    NOTA: Para pasar una lista anidada, usamos una sintaxis
-    especial de 'click' o la simulamos. Click no soporta
-    listas anidadas fácilmente. Este comando asume que la entrada
-    ya es una lista (procesada por nuestro helper).
-    Para probarlo, simulamos la estructura desde la lógica.
-
-    Este comando es difícil de probar desde CLI.
-    La función 'process_input_list' aplana la entrada por defecto.
-    uv run python src/cli.py struct flatten 1 2 3
-    """
-    # Este comando es problemático para un CLI simple, ya que
-    # 'click' no puede recibir una "lista de listas" fácilmente.
-    # El test de integración (test_cli.py) será clave aquí.
-    # Simulamos el aplanamiento de lo que recibimos.
-    processed_data = process_input_list(data)
-    # Como process_input_list ya aplana, llamamos a flatten
-    # con una lista que *contiene* la lista procesada, para simular
-    # una lista anidada.
-    simulated_nested_list = [processed_data[:2], processed_data[2:]]
-    click.echo(f"(Entrada simulada: {simulated_nested_list})")
-
-    result = pp.flatten_list(simulated_nested_list)
+    Cada argumento (o cada línea con --input) se lee como JSON, así que se
+    pueden pasar listas anidadas reales; lo que no es JSON se lee como un
+    valor suelto. Los niveles se aplanan sin recursión, sin límite de
+    profundidad con --full.
+
+    EJEMPLO:
+    uv run python src/cli.py struct flatten "[1, [2, 3]]" 4 "[[5], 6]"
+    uv run python src/cli.py struct flatten "[1, [2, [3, [4]]]]" --full
+    uv run python src/cli.py struct flatten --input anidados.jsonl --format jsonl --depth 2
+    """
+    flatten_depth = None if full else depth
+
+    def flatten_chunk(chunk: list) -> list:
+        return pp.flatten_list(
+            [parse_json_value(value) for value in chunk], flatten_depth
+        )
+
+    if is_streaming(input_path, output_path):
+        # Los bloques se aplanan por separado: el resultado es el mismo
+        chunks = iter_input_chunks(data, input_path, input_format, column, parse=False)
+        write_chunks(map(flatten_chunk, chunks), output_path, input_format)
+        return
+
+    result = flatten_chunk(list(require_data(data)))
     click.echo(f"Resultado: {result}")
 
 
 @struct.command(help="Mezcla aleatoriamente una lista.")
-@click.argument("data", nargs=-1, required=True)
+@click.argument("data", nargs=-1)
 @click.option(
     "--seed",
     default=None,  # El default es None
     type=int,
     help="Semilla para reproducibilidad (default: None).",
 )
-def shuffle(data: tuple, seed: int):
+@click.option(
+    "--buffer-mb",
+    default=512.0,
+    type=click.FloatRange(min=0, min_open=True),
+    help="Memoria para los valores antes de mezclar en disco (default: 512).",
+)
+@click.option(
+    "--spill-dir",
+    default=None,
+    type=click.Path(file_okay=False),
+    help="Directorio para las particiones en disco (default: el temporal del sistema).",
+)
+@input_options
+def shuffle(
+    data: tuple,
+    seed: int,
+    buffer_mb: float,
+    spill_dir: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
     """
     Mezcla aleatoriamente una lista, con una semilla opcional.
 
+    Con --input, si los valores no caben en --buffer-mb se reparten al azar
+    en particiones en disco que luego se mezclan una a una, así que se
+    pueden mezclar ficheros más grandes que la memoria.
+
     EJEMPLO:
     uv run python src/cli.py struct shuffle 1 2 3 4 5 --seed 42
+    uv run python src/cli.py struct shuffle --input grande.txt --output mezclado.txt --buffer-mb 512
     """
-    processed_data = process_input_list(data)
+    if is_streaming(input_path, output_path):
+        # Sin parsear: solo se reordenan las líneas, "007" no pasa a 7
+        items = (
+            item
+            for chunk in iter_input_chunks(
+                data, input_path, input_format, column, parse=False
+            )
+            for item in chunk
+        )
+        write_output(
+            pp.external_shuffle(items, buffer_mb, seed, spill_dir),
+            output_path,
+            input_format,
+        )
+        return
+
+    processed_data = process_input_list(require_data(data))
     result = pp.shuffle_list(processed_data, seed)
     click.echo(f"Resultado: {result}")
 
 
-# 7. Punto de Entrada
+@struct.command(help="Toma una muestra aleatoria de una lista.")
+@click.argument("data", nargs=-1)
+@click.option(
+    "--k",
+    "k",
+    default=None,
+    type=click.IntRange(min=1),
+    help="Tamaño de la muestra (por estrato).",
+)
+@click.option(
+    "--fraction",
+    default=None,
+    type=click.FloatRange(0, 1),
+    help="Proporción de valores a conservar, sin pesos ni estratos.",
+)
+@click.option(
+    "--seed",
+    default=None,
+    type=int,
+    help="Semilla para reproducibilidad (default: None).",
+)
+@click.option(
+    "--weight-column",
+    default=None,
+    help="Columna con el peso de cada fila (CSV/JSONL, con --k).",
+)
+@click.option(
+    "--stratify-column",
+    default=None,
+    help="Columna con el estrato de cada fila (CSV/JSONL, con --k).",
+)
+@input_options
+def sample(
+    data: tuple,
+    k: int,
+    fraction: float,
+    seed: int,
+    weight_column: str,
+    stratify_column: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
+    """
+    Toma una muestra aleatoria en una sola pasada, conservando el orden.
+
+    Con --k se eligen k valores (k por estrato con --stratify-column) con
+    memoria O(k); con --weight-column la probabilidad de cada fila es
+    proporcional a su peso. Con --fraction cada valor se conserva con esa
+    probabilidad y se escribe al vuelo.
+
+    EJEMPLO:
+    uv run python src/cli.py struct sample 1 2 3 4 5 6 7 8 --k 3 --seed 42
+    uv run python src/cli.py struct sample --input grande.txt --fraction 0.01 --output muestra.txt
+    uv run python src/cli.py struct sample --input ventas.csv --format csv --column id --k 100 --stratify-column pais
+    """
+    if (k is None) == (fraction is None):
+        raise click.UsageError("Indica --k o --fraction (solo uno).")
+    by_row = weight_column is not None or stratify_column is not None
+    if by_row and (
+        fraction is not None
+        or input_path is None
+        or input_format == "lines"
+        or is_array_file(input_path)
+    ):
+        raise click.UsageError(
+            "--weight-column y --stratify-column necesitan --k y un --input CSV o JSONL."
+        )
+
+    if not is_streaming(input_path, output_path):
+        result = pp.sample_list(
+            process_input_list(require_data(data)), k, fraction, seed
+        )
+        click.echo(f"Resultado: {result}")
+        return
+
+    # En streaming los valores se escriben tal cual se leen ("007" no pasa a 7)
+    if fraction is not None:
+        items = (
+            item
+            for chunk in iter_input_chunks(
+                data, input_path, input_format, column, parse=False
+            )
+            for item in chunk
+        )
+        write_output(
+            pp.bernoulli_sample(items, fraction, seed), output_path, input_format
+        )
+        return
+
+    if not by_row:
+        sampler = pp.ReservoirSampler(k, seed)
+        for chunk in iter_input_chunks(
+            data, input_path, input_format, column, parse=False
+        ):
+            sampler.update(chunk)
+        write_output(sampler.sample(), output_path, input_format)
+        return
+
+    weighted = weight_column is not None
+    sampler = (
+        pp.StratifiedSampler(k, seed, weighted)
+        if stratify_column is not None
+        else pp.ReservoirSampler(k, seed, weighted)
+    )
+    rows = iter_raw_rows(
+        input_path, input_format, [column, weight_column, stratify_column]
+    )
+    try:
+        for chunk in iter_chunks(rows):
+            values, weights, strata = (list(cells) for cells in zip(*chunk))
+            # Las filas sin peso no pueden salir en la muestra
+            weights = (
+                [0.0 if weight in (None, "") else float(weight) for weight in weights]
+                if weighted
+                else None
+            )
+            if stratify_column is None:
+                sampler.update(values, weights)
+            else:
+                sampler.update(values, strata, weights)
+    except (TypeError, ValueError) as error:
+        raise click.BadParameter(str(error), param_hint="--weight-column") from error
+    write_output(sampler.sample(), output_path, input_format)
+
+
+# 7. Comando 'pipeline'
+@cli.command(help="Encadena varios pasos de preprocesamiento en un solo recorrido.")
+@click.argument("data", nargs=-1)
+@click.option(
+    "--steps",
+    required=True,
+    help="Pasos separados por comas, con argumentos tras ':' "
+    "(p. ej. clean.remove-missing,numeric.clip:0:100,numeric.normalize).",
+)
+@input_options
+def pipeline(
+    data: tuple,
+    steps: str,
+    input_path: str,
+    output_path: str,
+    input_format: str,
+    column: str,
+):
+    """
+    Ejecuta una cadena de pasos fusionando los que son elemento a elemento.
+
+    Con --input la columna no se carga en memoria: cada paso con
+    estadísticas globales (normalize, standardize) añade una pasada extra
+    por el fichero.
+
+    EJEMPLO:
+    uv run python src/cli.py pipeline 5 None 250 50 --steps clean.remove-missing,numeric.clip:0:100,numeric.normalize
+    """
+    try:
+        chain = pp.Pipeline.from_spec(steps, CHUNK_SIZE)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--steps") from error
+
+    if is_streaming(input_path, output_path):
+        with rereadable_input(input_path) as path:
+
+            def source() -> Iterator:
+                chunks = iter_input_chunks(data, path, input_format, column)
+                return (item for chunk in chunks for item in chunk)
+
+            write_output(chain.stream(source), output_path, input_format)
+        return
+
+    processed_data = process_input_list(require_data(data))
+    result = chain.run(processed_data)
+    click.echo(f"Resultado: {result}")
+
+
+# 8. Comando 'bench'
+@cli.command(help="Ejecuta la suite de benchmarks (funciones y comandos).")
+@click.option(
+    "--min-size",
+    default=10,
+    type=click.IntRange(min=1),
+    help="Tamaño mínimo (default: 10).",
+)
+@click.option(
+    "--max-size",
+    default=10**7,
+    type=click.IntRange(min=1),
+    help="Tamaño máximo; se usan las potencias de 10 hasta él (default: 10^7).",
+)
+@click.option(
+    "--case",
+    "cases",
+    multiple=True,
+    help="Patrón (fnmatch) de los casos a ejecutar, p. ej. 'normalize*' o 'cli *'.",
+)
+@click.option(
+    "--mix",
+    "mixes",
+    multiple=True,
+    help="Mezcla de datos a usar (numeric, array, missing, mixed, strings, nested, text).",
+)
+@click.option(
+    "--repeat",
+    default=3,
+    type=click.IntRange(min=1),
+    help="Repeticiones por medida (default: 3).",
+)
+@click.option("--no-cli", is_flag=True, help="No medir los comandos de la CLI.")
+@click.option(
+    "--save",
+    "save_path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Guarda los resultados como baseline JSON.",
+)
+@click.option(
+    "--compare",
+    "compare_path",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Baseline JSON con la que comparar; sale con código 1 si hay regresiones.",
+)
+@click.option(
+    "--threshold",
+    default=0.2,
+    type=float,
+    help="Aumento de tiempo tolerado al comparar (default: 0.2 = +20%).",
+)
+@click.option(
+    "--startup",
+    is_flag=True,
+    help="Mide solo el arranque de la CLI; sale con código 1 si supera el presupuesto.",
+)
+@click.option(
+    "--budget",
+    default=None,
+    type=click.FloatRange(min=0),
+    help="Presupuesto de arranque en segundos (default: STARTUP_BUDGET_SECONDS).",
+)
+def bench(
+    min_size: int,
+    max_size: int,
+    cases: tuple,
+    mixes: tuple,
+    repeat: int,
+    no_cli: bool,
+    save_path: str,
+    compare_path: str,
+    threshold: float,
+    startup: bool,
+    budget: float,
+):
+    """
+    Mide tiempo, throughput y pico de memoria de cada función y comando.
+
+    EJEMPLO:
+    uv run python src/cli.py bench --max-size 100000 --save baseline.json
+    uv run python src/cli.py bench --max-size 100000 --compare baseline.json
+    uv run python src/cli.py bench --startup
+    """
+    if startup:
+        bench_startup(repeat, budget)
+        return
+
+    from benchmarks import suite  # Import diferido: solo lo necesita 'bench'
+
+    sizes = [
+        10**exponent
+        for exponent in range(len(str(max_size)))
+        if min_size <= 10**exponent <= max_size
+    ]
+    results = suite.run_benchmarks(
+        sizes=sizes,
+        cases=cases,
+        mixes=mixes,
+        repeat=repeat,
+        include_cli=not no_cli,
+        progress=lambda r: click.echo(
+            f"  {r['case']} [{r['mix']}] n={r['size']}: {r['seconds']:.6f}s", err=True
+        ),
+    )
+    click.echo(suite.format_report(results))
+
+    if save_path is not None:
+        suite.save_baseline(results, save_path)
+        click.echo(f"Baseline guardada en {save_path}")
+
+    if compare_path is not None:
+        baseline = suite.load_baseline(compare_path)["results"]
+        regressions = suite.compare(baseline, results, threshold)
+        for reg in regressions:
+            click.echo(
+                f"REGRESIÓN {reg['case']} [{reg['mix']}] n={reg['size']}: "
+                f"{reg['baseline']:.6f}s -> {reg['current']:.6f}s (x{reg['ratio']:.2f})"
+            )
+        if regressions:
+            raise SystemExit(1)
+        click.echo("Sin regresiones respecto a la baseline.")
+
+
+def bench_startup(repeat: int, budget: float | None = None):
+    """Mide el arranque de la CLI y falla si supera el presupuesto o carga módulos pesados."""
+    from benchmarks import startup
+
+    budget = startup.STARTUP_BUDGET_SECONDS if budget is None else budget
+    timing = startup.measure_startup(repeat=repeat)
+    click.echo(
+        f"cli --help: mediana {timing['median']:.4f}s, mejor {timing['best']:.4f}s (presupuesto {budget:.4f}s)"
+    )
+    for name, seconds in startup.import_profile(top=5):
+        click.echo(f"  import {name}: {seconds:.4f}s")
+
+    heavy = startup.loaded_heavy_modules()
+    if heavy:
+        click.echo(f"FALLO: 'import src.cli' carga módulos pesados: {', '.join(heavy)}")
+    if timing["median"] > budget:
+        click.echo("FALLO: el arranque supera el presupuesto.")
+    if heavy or timing["median"] > budget:
+        raise SystemExit(1)
+    click.echo("Arranque dentro del presupuesto.")
+
+
+# 9. Comando 'serve'
+@cli.command(
+    help="Sirve las funciones de preprocesamiento como API JSON (HTTP o socket Unix)."
+)
+@click.option("--host", default="127.0.0.1", help="Host TCP (default: 127.0.0.1).")
+@click.option(
+    "--port",
+    default=8765,
+    type=click.IntRange(min=0, max=65535),
+    help="Puerto TCP (default: 8765).",
+)
+@click.option(
+    "--unix-socket",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Escucha en un socket Unix en lugar de TCP.",
+)
+@click.option(
+    "--batch-delay-ms",
+    default=0.5,
+    type=click.FloatRange(min=0),
+    help="Espera máxima para agrupar peticiones en un lote (default: 0.5 ms).",
+)
+@click.option(
+    "--max-batch",
+    default=256,
+    type=click.IntRange(min=1),
+    help="Peticiones máximas por lote (default: 256).",
+)
+def serve(
+    host: str, port: int, unix_socket: str, batch_delay_ms: float, max_batch: int
+):
+    """
+    Arranca un servidor asyncio de larga duración.
+
+    Las peticiones concurrentes a la misma operación se agrupan en un solo
+    lote vectorizado; GET /stats devuelve la latencia por endpoint.
+
+    EJEMPLO:
+    uv run python src/cli.py serve --port 8765
+    curl -d '{"data": [5, 250], "args": [0, 100]}' localhost:8765/numeric/clip
+    """
+    import asyncio
+
+    from src.server import (
+        PreprocessingServer,
+    )  # Import diferido: solo lo necesita 'serve'
+
+    server = PreprocessingServer(batch_delay=batch_delay_ms / 1000, max_batch=max_batch)
+    try:
+        asyncio.run(
+            server.serve_forever(
+                host,
+                port,
+                unix_socket,
+                on_ready=lambda address: click.echo(
+                    f"Sirviendo en {address}", err=True
+                ),
+            )
+        )
+    except KeyboardInterrupt:
+        click.echo("Servidor detenido.", err=True)
+
+
+# 10. Comando 'table'
+@cli.command(help="Aplica una cadena de pasos por columna a una tabla CSV o Parquet.")
+@click.argument("input_path", type=click.Path(dir_okay=False, allow_dash=True))
+@click.option(
+    "--spec",
+    "specs",
+    multiple=True,
+    help="Pasos de una columna, p. ej. 'age: fill-missing 0 | clip 0 120 | normalize' (repetible).",
+)
+@click.option(
+    "--spec-file",
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help="Fichero con una especificación de columna por línea.",
+)
+@click.option(
+    "--output",
+    "output_path",
+    default="-",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="Fichero de salida (.csv o .parquet); por defecto CSV por stdout.",
+)
+@click.option(
+    "--chunk-rows",
+    default=10_000,
+    type=click.IntRange(min=1),
+    help="Filas por bloque (default: 10000).",
+)
+@workers_option
+def table(
+    input_path: str,
+    specs: tuple,
+    spec_file: str,
+    output_path: str,
+    chunk_rows: int,
+    workers: int,
+):
+    """
+    Procesa cada columna de la especificación y copia el resto sin cambios.
+
+    La tabla se lee por bloques de filas; los pasos con estadísticas
+    globales (normalize, standardize) añaden una pasada por el fichero.
+    Los valores que un paso descarta quedan como celdas vacías.
+
+    EJEMPLO:
+    uv run python src/cli.py table datos.csv --spec "age: fill-missing 0 | clip 0 120 | normalize" --spec "comment: tokenize | remove-stops"
+    """
+    from src import table as tb  # Import diferido: solo lo necesita 'table'
+
+    spec = ";".join(specs)
+    if spec_file is not None:
+        with open(spec_file, encoding="utf-8") as handle:
+            spec += "\n" + handle.read()
+    try:
+        chain = tb.TablePipeline.from_spec(spec)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="--spec") from error
+
+    try:
+        with rereadable_input(input_path) as path:
+            chunks = chain.run(lambda: tb.read_table_chunks(path, chunk_rows), workers)
+            if output_path == "-":
+                with click.open_file("-", "w", encoding="utf-8") as handle:
+                    tb.write_table(chunks, handle)
+            else:
+                tb.write_table(chunks, output_path)
+    except (ValueError, ImportError) as error:
+        raise click.ClickException(str(error)) from error
+
+
+# 11. Punto de Entrada
 if __name__ == "__main__":
     cli()
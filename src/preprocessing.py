@@ -1,47 +1,118 @@
 # Imports
+import hashlib
+import heapq
+import json
 import math
+import os
+import pickle
 import random
 import re
-from typing import Any 
+import shutil
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from functools import lru_cache, partial
+from itertools import chain, compress, islice, repeat
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator
 
+import numpy as np
 
-def remove_missing_values(data: list) -> list:
+# Tipos que se consideran numéricos al filtrar listas (bool es subclase de int)
+_NUMERIC_TYPES = (int, float, np.integer, np.floating)
+
+
+def is_missing(item: Any) -> bool:
     """
-    Elimina los valores faltantes (None, "", nan) de una lista.
+    Indica si un valor es faltante (None, "" o nan).
 
     Args:
-        data (list): Lista de valores, incluyendo posibles faltantes.
+        item (Any): Valor a comprobar.
 
     Returns:
-        list: Lista de valores sin los elementos faltantes.
+        bool: True si el valor es faltante.
     """
+    if item is None:
+        return True
+    if isinstance(item, str):
+        return item == ""
+    return isinstance(item, (float, np.floating)) and math.isnan(item)
 
-    missing_values = {None, ""}
-    cleaned_data = []
 
-    for item in data:
-        # 1. Chequea si es None o ""
-        if item in missing_values:
-            continue
+def _materialize(data: Any) -> Any:
+    """Pasa a lista los iterables sin longitud (generadores), que solo se pueden recorrer una vez."""
+    return data if hasattr(data, "__len__") else list(data)
 
-        # 2. Chequea si es nan (requiere math.isnan)
-        is_nan = False
-        try:
-            if isinstance(item, float) and math.isnan(item):
-                is_nan = True
-        except TypeError:
-            pass  # No era un tipo compatible con isnan
 
-        if is_nan:
-            continue
+def _missing_mask_array(data: Any) -> tuple[np.ndarray, np.ndarray]:
+    """Devuelve los datos como array 1-D junto con su máscara de faltantes."""
+    data = _materialize(data)
+    if _is_array_like(data):
+        arr = np.asarray(data).ravel()
+        if arr.dtype.kind in "fc":
+            return arr, np.isnan(arr)
+        if arr.dtype.kind in "US":
+            return arr, arr == arr.dtype.type()
+        if arr.dtype.kind != "O":
+            return arr, np.zeros(arr.size, dtype=bool)
+    else:
+        arr = np.fromiter(data, dtype=object, count=len(data))
+    try:
+        return arr, np.equal(arr, None) | np.equal(arr, "") | np.not_equal(arr, arr)
+    except (TypeError, ValueError):
+        # Algún valor no se compara como escalar (p. ej. un array anidado)
+        return arr, np.fromiter(map(is_missing, arr), dtype=bool, count=arr.size)
+
+
+def missing_mask(data: Any) -> np.ndarray:
+    """
+    Calcula en una sola pasada la máscara de valores faltantes (None, "", nan).
+
+    Con arrays numéricos o de texto la comprobación es vectorizada; las
+    listas se pasan a un array 'object' y se comparan con ufuncs (nan es el
+    único valor distinto de sí mismo). La máscara se puede reutilizar en
+    remove_missing_values y filling_missing_values para no volver a
+    detectar los faltantes.
+
+    Args:
+        data (Any): Lista, array o array-like de valores.
+
+    Returns:
+        np.ndarray: Array 1-D de bool, True en las posiciones faltantes.
+    """
+    return _missing_mask_array(data)[1]
+
+
+def remove_missing_values(data: list, mask: np.ndarray | None = None) -> list:
+    """
+    Elimina los valores faltantes (None, "", nan) de una lista.
 
-        # 3. Si no es faltante, se añade
-        cleaned_data.append(item)
+    Args:
+        data (list): Lista de valores, incluyendo posibles faltantes.
+        mask (np.ndarray | None, optional): Máscara de missing_mask(data),
+            si ya se ha calculado. Por defecto se calcula aquí.
 
-    return cleaned_data
+    Returns:
+        list: Lista de valores sin los elementos faltantes (np.ndarray si
+        la entrada era un array).
+    """
+    data = _materialize(data)
+    if mask is None:
+        arr, mask = _missing_mask_array(data)
+    elif _is_array_like(data):
+        arr = np.asarray(data).ravel()
+    else:
+        return list(compress(data, (~mask).tolist()))
+    return _as_output(arr[~mask], data)
 
 
-def filling_missing_values(data: list, fill_value: any = 0) -> list:
+def filling_missing_values(
+    data: list,
+    fill_value: any = 0,
+    mask: np.ndarray | None = None,
+    strategy: str = "constant",
+) -> list:
     """
     Rellena los valores faltantes (None, "", nan) de una lista
     con un valor específico.
@@ -50,49 +121,827 @@ def filling_missing_values(data: list, fill_value: any = 0) -> list:
         data (list): Lista de valores, incluyendo posibles faltantes.
         fill_value (any, optional): Valor con el que rellenar los faltantes.
                                      Por defecto es 0. [cite: 40]
+        mask (np.ndarray | None, optional): Máscara de missing_mask(data),
+            si ya se ha calculado. Por defecto se calcula aquí.
+        strategy (str, optional): "constant" (fill_value), "mean",
+            "median", "mode" (ver MissingImputer), "ffill", "bfill" o
+            "interpolate" (ver GapFiller). Con las demás estrategias,
+            fill_value se usa cuando no hay de dónde calcular el relleno.
 
     Returns:
-        list: Lista con los valores faltantes reemplazados.
+        list: Lista con los valores faltantes reemplazados (np.ndarray si
+        la entrada era un array).
     """
-    missing_values = {None, ""}
-    cleaned_data = []
-
-    for item in data:
-        # 1. Chequea si es None o ""
-        if item in missing_values:
-            cleaned_data.append(fill_value)  # <-- Usamos el argumento
-            continue
+    data = _materialize(data)
+    if strategy in _STAT_STRATEGIES:
+        if mask is None:
+            mask = missing_mask(data)
+        return (
+            MissingImputer(strategy, fill_value).fit(data, mask).transform(data, mask)
+        )
+    if strategy in _SEQUENTIAL_STRATEGIES:
+        filler = GapFiller(strategy, fill_value)
+        filled = filler.fill(data, mask)
+        tail = filler.flush()
+        if not tail:
+            return filled
+        if _is_array_like(filled):
+            return np.concatenate([filled, np.asarray(tail, dtype=filled.dtype)])
+        return filled + tail
+    if strategy != "constant":
+        raise ValueError(
+            f"Estrategia no válida: '{strategy}'. Usa una de: {', '.join(FILL_STRATEGIES)}"
+        )
 
-        # 2. Chequea si es nan (requiere math.isnan)
-        is_nan = False
-        try:
-            if isinstance(item, float) and math.isnan(item):
-                is_nan = True
-        except TypeError:
-            pass  # No era un tipo compatible con isnan
+    if mask is None:
+        arr, mask = _missing_mask_array(data)
+    else:
+        arr = np.asarray(data).ravel() if _is_array_like(data) else None
 
-        if is_nan:
-            cleaned_data.append(fill_value)  # <-- Usamos el argumento
-        else:
-            # 3. Si no es faltante, se añade el original
-            cleaned_data.append(item)
+    if (
+        arr is not None
+        and arr.dtype.kind in "fc"
+        and isinstance(fill_value, _NUMERIC_TYPES)
+    ):
+        return np.where(mask, fill_value, arr)
+    if arr is not None and np.ndim(fill_value) == 0:
+        # Con arrays se copia para no modificar la entrada
+        filled = arr.astype(object, copy=_is_array_like(data))
+        filled[mask] = fill_value
+        return _as_output(filled, data)
 
-    return cleaned_data
+    # Valores de relleno que son secuencias (p. ej. una lista)
+    filled = list(data)
+    for position in np.flatnonzero(mask).tolist():
+        filled[position] = fill_value
+    return (
+        _as_output(np.array(filled, dtype=object), data)
+        if _is_array_like(data)
+        else filled
+    )
 
 
-def remove_duplicated_values(data: list) -> list:
+def remove_duplicated_values(
+    data: list,
+    approximate: bool = False,
+    fp_rate: float = 0.001,
+    capacity: int | None = None,
+) -> list:
     """
     Elimina los valores duplicados de una lista, conservando el orden.
 
     Args:
         data (list): Lista de valores.
+        approximate (bool, optional): Si es True se usa un filtro de Bloom:
+            memoria fija, pero un valor nuevo puede descartarse por error
+            con probabilidad 'fp_rate'. Por defecto False (exacto).
+        fp_rate (float, optional): Tasa de falsos positivos del modo aproximado.
+        capacity (int | None, optional): Valores distintos previstos en el
+            modo aproximado. Por defecto, len(data).
 
     Returns:
         list: Lista con valores únicos.
     """
+    if approximate:
+        bloom = BloomFilter(capacity or max(len(data), 1), fp_rate)
+        return bloom.filter_new(data if isinstance(data, np.ndarray) else list(data))
+
     # dict.fromkeys() es una forma rápida de eliminar duplicados
     # y conserva el orden de aparición (en Python 3.7+).
-    return list(dict.fromkeys(data))
+    try:
+        return list(dict.fromkeys(data))
+    except TypeError:
+        # Valores no hashables (p. ej. listas anidadas): claves canónicas
+        return list(StreamingDeduplicator().iter_unique(data))
+
+
+# 1.1 Deduplicación en streaming (con volcado a disco)
+
+# Clave común para los nan: al pasar por pickle cada bloque recibe su propio
+# objeto nan y dict.fromkeys (que compara por identidad) ya no los uniría
+_NAN_KEY = ("__nan__",)
+
+# Memoria aproximada que ocupa cada clave en el conjunto de vistos (bytes)
+_BYTES_PER_KEY = 100
+
+# Registros que se acumulan por partición antes de escribirlos a disco
+_SPILL_BATCH = 4096
+
+
+def _canonical_key(item: Any) -> Any:
+    """
+    Devuelve una clave hashable que identifica al valor.
+
+    Los valores hashables son su propia clave (así 1 y 1.0 coinciden, como en
+    dict.fromkeys), los nan comparten una clave y las listas, dicts y
+    conjuntos se convierten recursivamente a tuplas/frozensets etiquetados.
+    """
+    if isinstance(item, float) and math.isnan(item):
+        return _NAN_KEY
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+    if isinstance(item, (list, tuple)):
+        return ("__list__", tuple(_canonical_key(value) for value in item))
+    if isinstance(item, dict):
+        return (
+            "__dict__",
+            frozenset((key, _canonical_key(value)) for key, value in item.items()),
+        )
+    if isinstance(item, (set, frozenset)):
+        return ("__set__", frozenset(_canonical_key(value) for value in item))
+    return ("__pickle__", pickle.dumps(item))
+
+
+def _iter_pickled(path: str) -> Iterator:
+    """Recorre los lotes de registros escritos con pickle.dump en un fichero."""
+    with open(path, "rb") as handle:
+        while True:
+            try:
+                yield from pickle.load(handle)
+            except EOFError:
+                return
+
+
+class StreamingDeduplicator:
+    """
+    Elimina duplicados de un flujo conservando la primera aparición.
+
+    Mientras las claves vistas caben en 'memory_mb', los valores nuevos se
+    devuelven al vuelo. Si se supera el presupuesto, las claves se vuelcan
+    a 'partitions' ficheros según su hash y el resto del flujo se reparte
+    igual; al final cada partición se deduplica por separado en memoria y
+    los supervivientes se mezclan por su posición original, así que el
+    resultado es exacto y en el mismo orden que sin volcado.
+
+    Los valores no hashables (listas, dicts, conjuntos) se comparan por una
+    clave canónica y los nan se consideran todos iguales.
+
+    EJEMPLO:
+        StreamingDeduplicator(memory_mb=256).iter_unique(valores)
+    """
+
+    def __init__(
+        self, memory_mb: float = 512, partitions: int = 64, spill_dir: str | None = None
+    ):
+        if partitions < 1:
+            raise ValueError("El número de particiones debe ser al menos 1.")
+        self.max_keys = max(1, int(memory_mb * 2**20 / _BYTES_PER_KEY))
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.spilled = False
+
+    def iter_unique(self, items: Iterable, batch_size: int = _SPILL_BATCH) -> Iterator:
+        """
+        Devuelve los valores únicos de 'items' en orden de primera aparición.
+
+        Args:
+            items (Iterable): Valores de entrada (se recorren una sola vez).
+            batch_size (int, optional): Valores que se leen por adelantado y
+                se deduplican juntos. Con 1 la entrada se consume de uno en uno.
+
+        Returns:
+            Iterator: Primeras apariciones de cada valor.
+        """
+        seen = set()
+        iterator = iter(items)
+        consumed = 0
+        for chunk in _iter_chunks(iterator, batch_size):
+            consumed += len(chunk)
+            yield from self._unique_chunk(chunk, seen)
+            if len(seen) > self.max_keys:
+                yield from self._spill_and_finish(seen, iterator, consumed)
+                return
+
+    @staticmethod
+    def _unique_chunk(chunk: list, seen: set) -> list:
+        """Valores nuevos de un bloque (y los añade a 'seen')."""
+        try:
+            candidates = dict.fromkeys(chunk)
+        except TypeError:
+            candidates = None
+        if candidates is not None:
+            # Camino rápido (todo hashable): dedup del bloque en C y filtro por 'seen'
+            fresh = [item for item in candidates if item not in seen]
+            if not any(item != item for item in fresh):
+                seen.update(fresh)
+                return fresh
+            chunk = fresh  # Hay nan: se resuelven con las claves canónicas
+
+        fresh = []
+        for item in chunk:
+            key = _canonical_key(item)
+            if key not in seen:
+                seen.add(key)
+                fresh.append(item)
+        return fresh
+
+    def _spill_and_finish(self, seen: set, iterator: Iterator, start: int) -> Iterator:
+        """Vuelca las claves vistas, reparte el resto del flujo y lo deduplica por particiones."""
+        self.spilled = True
+        spill_dir = tempfile.mkdtemp(prefix="dedup-", dir=self.spill_dir)
+        try:
+            paths = [
+                os.path.join(spill_dir, f"part-{i}.pkl") for i in range(self.partitions)
+            ]
+            handles = [open(path, "wb") for path in paths]
+            buffers: list[list] = [[] for _ in paths]
+
+            def add(partition: int, record: tuple):
+                buffer = buffers[partition]
+                buffer.append(record)
+                if len(buffer) >= _SPILL_BATCH:
+                    pickle.dump(buffer, handles[partition], pickle.HIGHEST_PROTOCOL)
+                    buffer.clear()
+
+            try:
+                # Las claves ya devueltas van primero (posición -1): solo descartan
+                for key in seen:
+                    add(hash(key) % self.partitions, (-1, key, None))
+                seen.clear()
+                for index, item in enumerate(iterator, start):
+                    key = _canonical_key(item)
+                    add(hash(key) % self.partitions, (index, key, item))
+                for buffer, handle in zip(buffers, handles):
+                    if buffer:
+                        pickle.dump(buffer, handle, pickle.HIGHEST_PROTOCOL)
+            finally:
+                for handle in handles:
+                    handle.close()
+
+            # Fase 2: cada partición cabe en memoria y sus supervivientes quedan en orden
+            survivor_paths = []
+            for path in paths:
+                partition_seen = set()
+                survivors = []
+                for index, key, item in _iter_pickled(path):
+                    if key in partition_seen:
+                        continue
+                    partition_seen.add(key)
+                    if index >= 0:
+                        survivors.append((index, item))
+                os.remove(path)
+                survivor_path = path + ".out"
+                with open(survivor_path, "wb") as handle:
+                    for start_at in range(0, len(survivors), _SPILL_BATCH):
+                        pickle.dump(
+                            survivors[start_at : start_at + _SPILL_BATCH],
+                            handle,
+                            pickle.HIGHEST_PROTOCOL,
+                        )
+                survivor_paths.append(survivor_path)
+
+            # Fase 3: mezcla por posición original
+            merged = heapq.merge(
+                *(_iter_pickled(path) for path in survivor_paths), key=itemgetter(0)
+            )
+            for _, item in merged:
+                yield item
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+# 1.2 Deduplicación aproximada (filtro de Bloom)
+
+
+def _key_bytes(key: Any) -> bytes:
+    """
+    Serializa una clave canónica de forma estable entre ejecuciones.
+
+    hash() de Python cambia en cada proceso para los strings, así que el
+    filtro de Bloom (que se puede guardar y seguir usando) hashea estos
+    bytes. Los números iguales (1, 1.0, True) dan los mismos bytes.
+    """
+    if isinstance(key, (bool, int)) or (isinstance(key, float) and key.is_integer()):
+        return b"i" + str(int(key)).encode()
+    if isinstance(key, float):
+        return b"f" + repr(key).encode()
+    if isinstance(key, str):
+        return b"s" + key.encode("utf-8", "surrogatepass")
+    if isinstance(key, bytes):
+        return b"b" + key
+    if key is None:
+        return b"n"
+    if isinstance(key, (tuple, frozenset)):
+        parts = [_key_bytes(value) for value in key]
+        if isinstance(key, frozenset):
+            parts.sort()  # El orden de un frozenset depende del hash del proceso
+        body = b"".join(len(part).to_bytes(4, "little") + part for part in parts)
+        return (b"t" if isinstance(key, tuple) else b"z") + body
+    return b"p" + pickle.dumps(key)
+
+
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """Mezclador splitmix64 vectorizado (uint64 -> uint64)."""
+    z = values + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _int_hashes(values: np.ndarray) -> np.ndarray:
+    """Hashes (n, 2) uint64 de enteros int64, sin pasar por Python valor a valor."""
+    h1 = _splitmix64(values.astype(np.int64, copy=False).view(np.uint64))
+    return np.column_stack((h1, _splitmix64(h1)))
+
+
+# Se mezcla con los bits de los float no enteros para separarlos de los enteros
+_FLOAT_TWEAK = np.uint64(0x5851F42D4C957F2D)
+
+
+def _float_hashes(values: np.ndarray) -> np.ndarray:
+    """
+    Hashes (n, 2) uint64 de float64, sin pasar por Python valor a valor.
+
+    Los float enteros tienen el hash de su entero (1.0 y 1 son el mismo
+    valor) y los nan el de _stable_hashes(nan).
+    """
+    values = values.astype(np.float64, copy=False)
+    hashes = np.empty((values.size, 2), dtype=np.uint64)
+    integral = (
+        (values == np.trunc(values)) & (values >= _INT64_MIN) & (values < 2.0**63)
+    )
+    hashes[integral] = _int_hashes(values[integral].astype(np.int64))
+    rest = ~integral
+    h1 = _splitmix64(values[rest].view(np.uint64) ^ _FLOAT_TWEAK)
+    hashes[rest] = np.column_stack((h1, _splitmix64(h1)))
+    nan = np.isnan(values)
+    if nan.any():
+        hashes[nan] = np.frombuffer(_stable_hashes(math.nan), dtype="<u8")
+    return hashes
+
+
+def _stable_hashes(item: Any) -> bytes:
+    """
+    Hash de 128 bits de un valor, igual en todas las ejecuciones.
+
+    Los enteros y los float usan el mismo hash que los caminos vectorizados
+    (_int_hashes y _float_hashes); el resto, blake2b de su clave.
+    """
+    key = _canonical_key(item)
+    if isinstance(key, float):
+        return _float_hashes(np.array([key])).tobytes()
+    if isinstance(key, (bool, int)) and _INT64_MIN <= key <= _INT64_MAX:
+        return _int_hashes(np.array([int(key)], dtype=np.int64)).tobytes()
+    return hashlib.blake2b(_key_bytes(key), digest_size=16).digest()
+
+
+def _as_int64_array(items: Any) -> np.ndarray | None:
+    """Convierte un bloque de enteros a int64; None si hay otros tipos o no caben."""
+    if isinstance(items, np.ndarray):
+        return (
+            items
+            if items.dtype.kind in "iu"
+            and items.dtype.itemsize <= 8
+            and items.dtype != np.uint64
+            else None
+        )
+    if not items or not all(type(item) is int for item in items):
+        return None
+    try:
+        return np.array(items, dtype=np.int64)
+    except OverflowError:
+        return None
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom para deduplicación aproximada con memoria fija.
+
+    Con 'capacity' valores distintos la probabilidad de tomar un valor nuevo
+    por repetido es 'fp_rate' (unos 1.8 bytes por valor con 0.001). Nunca
+    deja pasar un duplicado. Las posiciones de los bits se calculan con
+    doble hashing sobre un hash estable de 128 bits, de forma vectorizada
+    por bloques, y el estado se puede guardar para seguir en otra ejecución.
+
+    EJEMPLO:
+        bloom = BloomFilter(capacity=10_000_000, fp_rate=0.001)
+        nuevos = bloom.filter_new(bloque)
+    """
+
+    def __init__(self, capacity: int = 10_000_000, fp_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("La capacidad debe ser al menos 1.")
+        if not 0 < fp_rate < 1:
+            raise ValueError("La tasa de falsos positivos debe estar entre 0 y 1.")
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        """Posiciones de los bits (n, num_hashes) de cada hash (n, 2)."""
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        # Doble hashing: h1 + i * h2 (los desbordamientos de uint64 dan la vuelta)
+        return (hashes[:, :1] + steps * (hashes[:, 1:] | np.uint64(1))) % np.uint64(
+            self.num_bits
+        )
+
+    def _test_and_set(self, hashes: np.ndarray) -> np.ndarray:
+        """Marca los hashes en el filtro y devuelve cuáles ya estaban."""
+        if not len(hashes):
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(hashes)
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        present = np.all(self.bits[positions >> np.uint64(3)] & masks, axis=1)
+        new = positions[~present]
+        np.bitwise_or.at(self.bits, new >> np.uint64(3), masks[~present])
+        self.count += int((~present).sum())
+        return present
+
+    def filter_new(self, items: list) -> list:
+        """
+        Devuelve los valores (probablemente) no vistos y los añade al filtro.
+
+        Dentro del bloque los repetidos se detectan de forma exacta, así que
+        se conserva el orden de primera aparición. Los bloques de enteros (y
+        los arrays de float) se hashean de forma vectorizada; el resto, valor
+        a valor.
+
+        Args:
+            items (list): Bloque de valores (lista o array de enteros).
+
+        Returns:
+            list: Los valores nuevos, en orden.
+        """
+        values = _as_int64_array(items)
+        if values is None and isinstance(items, np.ndarray) and items.dtype.kind == "f":
+            values = items
+        if values is not None:
+            _, first = np.unique(values, return_index=True)
+            first.sort()
+            present = self._test_and_set(_hash_matrix(values[first]))
+            return [items[index] for index in first[~present].tolist()]
+
+        positions: dict[bytes, int] = {}
+        for index, item in enumerate(items):
+            positions.setdefault(_stable_hashes(item), index)
+        hashes = np.frombuffer(b"".join(positions), dtype="<u8").reshape(-1, 2)
+        present = self._test_and_set(hashes)
+        return [
+            items[index] for index, seen in zip(positions.values(), present) if not seen
+        ]
+
+    def add(self, item: Any) -> bool:
+        """Añade un valor; devuelve True si (probablemente) ya estaba."""
+        hashes = np.frombuffer(_stable_hashes(item), dtype="<u8").reshape(1, 2)
+        return bool(self._test_and_set(hashes)[0])
+
+    def __contains__(self, item: Any) -> bool:
+        hashes = np.frombuffer(_stable_hashes(item), dtype="<u8").reshape(1, 2)
+        positions = self._positions(hashes)[0]
+        masks = np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        return bool(np.all(self.bits[positions >> np.uint64(3)] & masks))
+
+    def save(self, path: str) -> None:
+        """
+        Guarda el estado del filtro (.npz sin comprimir).
+
+        Args:
+            path (str): Ruta del fichero de salida.
+        """
+        with open(path, "wb") as handle:
+            np.savez(
+                handle,
+                bits=self.bits,
+                params=np.array(
+                    [self.capacity, self.num_bits, self.num_hashes, self.count],
+                    dtype=np.int64,
+                ),
+                fp_rate=np.array(self.fp_rate),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """
+        Carga un filtro guardado con save().
+
+        Args:
+            path (str): Ruta del fichero.
+
+        Returns:
+            BloomFilter: El filtro con sus bits y parámetros.
+        """
+        with np.load(path, allow_pickle=False) as state:
+            capacity, num_bits, num_hashes, count = (
+                int(value) for value in state["params"]
+            )
+            bloom = cls(capacity, float(state["fp_rate"]))
+            if (bloom.num_bits, bloom.num_hashes) != (num_bits, num_hashes):
+                raise ValueError(f"Fichero de filtro de Bloom no válido: {path}")
+            bloom.bits = state["bits"].copy()
+            bloom.count = count
+        return bloom
+
+
+#
+# 1.3 Imputación de faltantes (estrategias de relleno)
+#
+
+# Estrategias de filling_missing_values
+FILL_STRATEGIES = (
+    "constant",
+    "mean",
+    "median",
+    "mode",
+    "ffill",
+    "bfill",
+    "interpolate",
+)
+# Las que necesitan una estadística de toda la columna (se ajustan por bloques)
+_STAT_STRATEGIES = ("mean", "median", "mode")
+# Las que miran los valores vecinos (se recorren en orden)
+_SEQUENTIAL_STRATEGIES = ("ffill", "bfill", "interpolate")
+
+# Marca de "todavía no hay valor anterior" (None podría ser un valor real)
+_NO_VALUE = object()
+
+
+class MissingImputer:
+    """
+    Calcula por bloques el valor de relleno de una estrategia estadística.
+
+    'mean' acumula un RunningStats, 'median' un TDigest y 'mode' un
+    CountMinSketch con un conjunto acotado de candidatos, así que una
+    columna enorme se ajusta en una pasada sin ordenarla ni copiarla. Dos
+    imputadores ajustados con bloques distintos se combinan con merge()
+    (compatible con parallel_fit). Si no hay valores con los que calcular
+    la estadística se usa 'fill_value'.
+
+    EJEMPLO:
+        imputer = MissingImputer("median")
+        for chunk in chunks:
+            imputer.partial_fit(chunk)
+        rellenos = imputer.transform(chunk)
+    """
+
+    def __init__(self, strategy: str = "mean", fill_value: Any = 0, top_k: int = 32):
+        if strategy not in _STAT_STRATEGIES:
+            raise ValueError(
+                f"Estrategia no válida: '{strategy}'. Usa una de: {', '.join(_STAT_STRATEGIES)}"
+            )
+        self.strategy = strategy
+        self.fill_value = fill_value
+        self.top_k = top_k
+        self._reset()
+
+    def _reset(self) -> None:
+        self.stats = RunningStats()
+        self.digest = TDigest()
+        self.sketch = CountMinSketch()
+        # Clave canónica -> primer valor original visto con esa clave
+        self.candidates: dict = {}
+
+    def fit(self, data: list, mask: np.ndarray | None = None) -> "MissingImputer":
+        """Calcula la estadística desde cero con los datos dados."""
+        self._reset()
+        return self.partial_fit(data, mask)
+
+    def partial_fit(
+        self, data: list, mask: np.ndarray | None = None
+    ) -> "MissingImputer":
+        """
+        Actualiza la estadística con un nuevo bloque de datos.
+
+        Args:
+            data (list): Lista o array de valores.
+            mask (np.ndarray | None, optional): Máscara de missing_mask(data).
+
+        Returns:
+            MissingImputer: El propio imputador, para encadenar llamadas.
+        """
+        arr, detected = _missing_mask_array(data)
+        present = arr[~(detected if mask is None else mask)]
+        if self.strategy == "mean":
+            self.stats.update_many(present)
+        elif self.strategy == "median":
+            self.digest.update(present)
+        else:
+            self._count_modes(present)
+        return self
+
+    def _count_modes(self, present: np.ndarray) -> None:
+        numbers = present
+        if present.dtype.kind == "O":
+            values = present.tolist()
+            numbers = (
+                np.array(values)
+                if all(type(value) in (int, float) for value in values)
+                else None
+            )
+        if numbers is not None and numbers.dtype.kind in "iuf":
+            # Columna numérica: se cuenta de forma vectorizada
+            keys, counts = np.unique(numbers, return_counts=True)
+            self.sketch.add(keys, counts)
+            top = np.sort(np.argsort(-counts, kind="stable")[: self.top_k])
+            for key in keys[top].tolist():
+                self.candidates.setdefault(key, key)
+            self._trim_candidates()
+            return
+
+        values = present.tolist()
+        try:
+            counts = Counter(values)
+            originals = {}
+        except TypeError:
+            # Valores no hashables: se cuentan por su clave canónica
+            keys = [_canonical_key(value) for value in values]
+            counts = Counter(keys)
+            originals = dict(zip(reversed(keys), reversed(values)))
+        if not counts:
+            return
+        self.sketch.add(counts)
+        for key, _ in counts.most_common(self.top_k):
+            self.candidates.setdefault(key, originals.get(key, key))
+        self._trim_candidates()
+
+    def _trim_candidates(self) -> None:
+        """Se queda con los top_k candidatos de mayor frecuencia estimada."""
+        keys = list(self.candidates)
+        if len(keys) <= self.top_k:
+            return
+        estimates = self.sketch.estimate(keys)
+        # Orden estable: a igual frecuencia gana el que apareció antes
+        keep = sorted(np.argsort(-estimates, kind="stable")[: self.top_k].tolist())
+        self.candidates = {keys[i]: self.candidates[keys[i]] for i in keep}
+
+    def merge(self, other: "MissingImputer") -> "MissingImputer":
+        """
+        Combina la estadística de otro imputador ajustado con otros datos.
+
+        Args:
+            other (MissingImputer): Imputador ajustado sobre otro bloque.
+
+        Returns:
+            MissingImputer: El propio imputador, ya combinado.
+        """
+        self.stats.merge(other.stats)
+        self.digest.merge(other.digest)
+        self.sketch.merge(other.sketch)
+        for key, original in other.candidates.items():
+            self.candidates.setdefault(key, original)
+        self._trim_candidates()
+        return self
+
+    @property
+    def fill_value_(self) -> Any:
+        """Valor de relleno calculado (o fill_value si no hay datos)."""
+        if self.strategy == "mean":
+            return self.stats.mean if self.stats.count else self.fill_value
+        if self.strategy == "median":
+            return self.digest.quantile(0.5) if self.digest.count else self.fill_value
+        if not self.candidates:
+            return self.fill_value
+        keys = list(self.candidates)
+        return self.candidates[keys[int(np.argmax(self.sketch.estimate(keys)))]]
+
+    def transform(self, data: list, mask: np.ndarray | None = None) -> list:
+        """Rellena los faltantes con el valor calculado."""
+        return filling_missing_values(data, self.fill_value_, mask)
+
+
+class GapFiller:
+    """
+    Rellena los huecos con los valores vecinos, bloque a bloque y en orden.
+
+    'ffill' usa el último valor presente, 'bfill' el siguiente e
+    'interpolate' interpola linealmente entre ambos (si los dos son
+    numéricos; en los extremos usa el más cercano). Los huecos que cruzan
+    el final de un bloque se guardan hasta el bloque siguiente, así que el
+    resultado no depende de cómo se parta la columna. Los huecos sin vecino
+    del que copiar se rellenan con 'fill_value'.
+
+    EJEMPLO:
+        filler = GapFiller("interpolate")
+        for filled in filler.iter_fill(chunks):
+            escribir(filled)
+    """
+
+    def __init__(self, strategy: str = "ffill", fill_value: Any = 0):
+        if strategy not in _SEQUENTIAL_STRATEGIES:
+            raise ValueError(
+                f"Estrategia no válida: '{strategy}'. Usa una de: {', '.join(_SEQUENTIAL_STRATEGIES)}"
+            )
+        self.strategy = strategy
+        self.fill_value = fill_value
+        self._previous = _NO_VALUE
+        self._pending = 0
+
+    def fill(self, chunk: list, mask: np.ndarray | None = None) -> list:
+        """
+        Rellena un bloque; los faltantes del final pueden quedar pendientes.
+
+        Args:
+            chunk (list): Bloque de valores (lista o array).
+            mask (np.ndarray | None, optional): Máscara de missing_mask(chunk).
+
+        Returns:
+            list: Los valores ya resueltos (incluidos los pendientes de
+            bloques anteriores), en orden.
+        """
+        arr, detected = _missing_mask_array(chunk)
+        missing = detected if mask is None else mask
+        has_previous = self._previous is not _NO_VALUE
+        # Valores extendidos: [anterior] + [huecos pendientes] + bloque
+        start = 1 + self._pending
+        values = np.empty(start + arr.size, dtype=object)
+        values[0] = self._previous if has_previous else None
+        values[start:] = arr.astype(object)
+        present = np.zeros(values.size, dtype=bool)
+        present[0] = has_previous
+        present[start:] = ~missing
+
+        positions = np.arange(values.size)
+        before = np.maximum.accumulate(np.where(present, positions, -1))
+        after = np.minimum.accumulate(np.where(present, positions, values.size)[::-1])[
+            ::-1
+        ]
+        present_positions = np.flatnonzero(present)
+        last = int(present_positions[-1]) if present_positions.size else -1
+
+        if self.strategy == "ffill":
+            end = values.size
+            self._pending = 0
+        else:
+            # Lo que va detrás del último presente espera al bloque siguiente
+            end = last + 1
+            self._pending = values.size - max(end, 1)
+        if last >= 0:
+            self._previous = values[last]
+
+        filled = values[1:end]
+        holes = np.flatnonzero(~present[1:end]) + 1
+        if holes.size:
+            filled[holes - 1] = self._fill_holes(
+                values, holes, before[holes], after[holes]
+            )
+        return self._output(filled, chunk)
+
+    def _fill_holes(
+        self,
+        values: np.ndarray,
+        holes: np.ndarray,
+        before: np.ndarray,
+        after: np.ndarray,
+    ) -> np.ndarray:
+        """Valores de relleno de los huecos a partir de sus vecinos presentes."""
+        filled = np.empty(holes.size, dtype=object)
+        if self.strategy == "ffill":
+            filled[:] = self.fill_value
+            found = before >= 0
+            filled[found] = values[before[found]]
+            return filled
+
+        # bfill/interpolate: siempre hay un presente detrás (los demás esperan)
+        filled[:] = values[after]
+        if self.strategy == "interpolate":
+            inner = np.flatnonzero(before >= 0)
+            low, high = values[before[inner]], values[after[inner]]
+            numeric = np.fromiter(
+                (
+                    isinstance(a, _NUMERIC_TYPES) and isinstance(b, _NUMERIC_TYPES)
+                    for a, b in zip(low, high)
+                ),
+                dtype=bool,
+                count=inner.size,
+            )
+            filled[inner[~numeric]] = low[~numeric]
+            inner = inner[numeric]
+            low = low[numeric].astype(np.float64)
+            high = high[numeric].astype(np.float64)
+            step = (holes[inner] - before[inner]) / (after[inner] - before[inner])
+            filled[inner] = (low + (high - low) * step).tolist()
+        return filled
+
+    def flush(self) -> list:
+        """Resuelve los huecos pendientes del final de la columna."""
+        pending, self._pending = self._pending, 0
+        if self.strategy == "interpolate" and self._previous is not _NO_VALUE:
+            return [self._previous] * pending
+        return [self.fill_value] * pending
+
+    def iter_fill(self, chunks: Iterable) -> Iterator[list]:
+        """Rellena una secuencia de bloques; el último resultado es el de flush()."""
+        for chunk in chunks:
+            yield self.fill(chunk)
+        yield self.flush()
+
+    @staticmethod
+    def _output(filled: np.ndarray, chunk: Any) -> Any:
+        if not _is_array_like(chunk):
+            return filled.tolist()
+        if np.asarray(chunk).dtype.kind in "fc":
+            return filled.astype(np.float64)
+        return filled
 
 
 #
@@ -100,97 +949,158 @@ def remove_duplicated_values(data: list) -> list:
 #
 
 
+def _is_array_like(data: Any) -> bool:
+    """
+    Indica si los datos deben tratarse como array de NumPy (y no como lista).
+
+    Args:
+        data (Any): Datos de entrada.
+
+    Returns:
+        bool: True si es un np.ndarray u otro objeto con interfaz __array__.
+    """
+    if isinstance(data, np.ndarray):
+        return True
+    return not isinstance(data, (list, tuple, str)) and hasattr(data, "__array__")
+
+
+def _numeric_array(data: Any) -> np.ndarray:
+    """
+    Convierte los datos a un array 1-D float64 con solo los valores numéricos.
+
+    Los arrays con dtype numérico se convierten sin recorrerlos en Python;
+    las listas y los arrays de tipo 'object' se filtran elemento a elemento
+    igual que hacía la versión basada en listas.
+
+    Args:
+        data (Any): Lista, array o array-like de valores.
+
+    Returns:
+        np.ndarray: Array float64 con los valores numéricos.
+    """
+    if _is_array_like(data):
+        arr = np.asarray(data).ravel()
+        if arr.dtype.kind in "biuf":
+            return arr.astype(np.float64, copy=False)
+        if arr.dtype.kind == "O":
+            mask = np.fromiter(
+                (isinstance(x, _NUMERIC_TYPES) for x in arr),
+                dtype=bool,
+                count=arr.size,
+            )
+            return arr[mask].astype(np.float64)
+        # Arrays de strings, bytes, fechas... no contienen valores numéricos
+        return np.empty(0, dtype=np.float64)
+
+    return np.fromiter(
+        (x for x in data if isinstance(x, (int, float))), dtype=np.float64
+    )
+
+
+def _as_output(result: np.ndarray, data: Any) -> Any:
+    """
+    Devuelve el resultado con el mismo tipo de contenedor que la entrada.
+
+    Args:
+        result (np.ndarray): Resultado calculado de forma vectorizada.
+        data (Any): Datos de entrada originales.
+
+    Returns:
+        Any: np.ndarray si la entrada era array-like, list en otro caso.
+    """
+    if _is_array_like(data):
+        return result
+    return result.tolist()
+
+
 def normalize_min_max(data: list, new_min: float = 0.0, new_max: float = 1.0) -> list:
     """
     Normaliza valores numéricos usando el método min-max.
 
+    Acepta listas (devuelve lista) o np.ndarray/array-likes (devuelve un
+    np.ndarray 1-D). El cálculo se hace en una sola pasada vectorizada.
+
     Args:
-        data (list): Lista de valores numéricos.
+        data (list): Lista o array de valores numéricos.
         new_min (float, optional): Nuevo mínimo del rango. Por defecto 0.0.
         new_max (float, optional): Nuevo máximo del rango. Por defecto 1.0.
 
     Returns:
-        list: Lista de valores normalizados.
+        list: Lista (o array) de valores normalizados.
     """
-    if not data:
-        return []
-
     # Filtra solo valores numéricos (int/float)
-    numeric_data = [x for x in data if isinstance(x, (int, float))]
-    if not numeric_data:
-        return []
-
-    min_val = min(numeric_data)
-    max_val = max(numeric_data)
-    range_val = max_val - min_val
+    values = _numeric_array(data)
 
-    if range_val == 0:
-        # Si todos los valores son iguales, devuelve el nuevo mínimo
-        return [new_min for _ in numeric_data]
-
-    # Fórmula de normalización Min-Max
-    # X_norm = new_min + ((X - X_min) * (new_max - new_min)) / (X_max - X_min)
-    return [
-        new_min + ((x - min_val) * (new_max - new_min)) / range_val
-        for x in numeric_data
-    ]
+    # Calcula mínimo y máximo y aplica la fórmula con un MinMaxScaler
+    scaler = MinMaxScaler(new_min, new_max)
+    scaler._update(values)
+    return _as_output(scaler._transform_array(values), data)
 
 
 def standardize_z_score(data: list) -> list:
     """
     Estandariza valores numéricos usando el método z-score.
 
+    Acepta listas (devuelve lista) o np.ndarray/array-likes (devuelve un
+    np.ndarray 1-D). La media y la desviación se obtienen con RunningStats
+    en una única pasada numéricamente estable.
+
     Args:
-        data (list): Lista de valores numéricos.
+        data (list): Lista o array de valores numéricos.
 
     Returns:
-        list: Lista de valores estandarizados.
+        list: Lista (o array) de valores estandarizados.
     """
-    if not data:
-        return []
-
     # Filtra solo valores numéricos
-    numeric_data = [x for x in data if isinstance(x, (int, float))]
-    if not numeric_data:
-        return []
-
-    n = len(numeric_data)
-    if n == 0:
-        return []
+    values = _numeric_array(data)
 
-    # 1. Calcular la media (μ)
-    mean = sum(numeric_data) / n
+    # Calcula media y desviación estándar y aplica Z = (X - μ) / σ
+    scaler = ZScoreScaler()
+    scaler._update(values)
+    return _as_output(scaler._transform_array(values), data)
 
-    # 2. Calcular la desviación estándar (σ)
-    variance = sum((x - mean) ** 2 for x in numeric_data) / n
-    std_dev = math.sqrt(variance)
 
-    if std_dev == 0:
-        # Si la desviación es 0, todos los valores son iguales (a la media)
-        # El Z-score es 0 para todos.
-        return [0.0 for _ in numeric_data]
-
-    # 3. Aplicar fórmula Z-score: Z = (X - μ) / σ
-    return [(x - mean) / std_dev for x in numeric_data]
+def _integer_clip_bounds(
+    dtype: np.dtype, min_val: float, max_val: float
+) -> tuple[int, int] | None:
+    """Límites de np.clip en el dtype entero, o None si el resultado no cabe en él."""
+    info = np.iinfo(dtype)
+    low, high = max(min_val, info.min), min(max_val, info.max)
+    if not (low <= high and float(low).is_integer() and float(high).is_integer()):
+        return None
+    return int(low), int(high)
 
 
 def clip_values(data: list, min_val: float, max_val: float) -> list:
     """
     Recorta valores numéricos a un rango (clipping).
 
+    Con un np.ndarray/array-like se usa np.clip y se devuelve un array 1-D:
+    un array de enteros conserva su dtype si los límites son enteros (o
+    infinitos) y el resultado cabe en él; si no, se promueve a float64.
+    Con listas se conserva el tipo de cada elemento no recortado.
+
     Args:
-        data (list): Lista de valores numéricos.
+        data (list): Lista o array de valores numéricos.
         min_val (float): Valor mínimo para recortar.
         max_val (float): Valor máximo para recortar.
 
     Returns:
-        list: Lista de valores recortados.
+        list: Lista (o array) de valores recortados.
     """
     if min_val > max_val:
         raise ValueError(
             "El valor mínimo (min_val) no puede ser mayor que el valor máximo (max_val)."
         )
 
+    if _is_array_like(data):
+        arr = np.asarray(data).ravel()
+        if arr.dtype.kind in "iu":
+            bounds = _integer_clip_bounds(arr.dtype, min_val, max_val)
+            if bounds is not None:
+                return np.clip(arr, *bounds)
+        return np.clip(_numeric_array(arr), min_val, max_val)
+
     clipped_data = []
     for item in data:
         if not isinstance(item, (int, float)):
@@ -210,6 +1120,10 @@ def convert_to_integers(data: list) -> list:
     """
     Convierte una lista de strings a enteros.
 
+    Los enteros se leen de forma exacta (sin pasar por float) y los
+    decimales se truncan. Ver parse_integers para obtener también las
+    posiciones de los valores rechazados o un np.ndarray int64.
+
     Args:
         data (list): Lista de strings.
 
@@ -217,143 +1131,3105 @@ def convert_to_integers(data: list) -> list:
         list: Lista de valores convertidos a enteros.
               Los no numéricos se excluyen.
     """
-    int_values = []
-    for item in data:
-        try:
-            # Intenta convertir el string a float primero (para "10.0")
-            # y luego a int.
-            int_val = int(float(item))
-            int_values.append(int_val)
-        except (ValueError, TypeError):
-            # Si falla (ej. "texto" o None), se excluye
-            continue
-    return int_values
+    return parse_integers(data)[0]
 
 
 def logarithmic_transform(data: list) -> list:
     """
     Aplica una transformación logarítmica (log natural).
 
+    Acepta listas (devuelve lista) o np.ndarray/array-likes (devuelve un
+    np.ndarray 1-D).
+
     Args:
-        data (list): Lista de valores.
+        data (list): Lista o array de valores.
 
     Returns:
-        list: Lista de valores transformados (solo números positivos originales).
+        list: Lista (o array) de valores transformados
+              (solo números positivos originales).
     """
-    transformed_data = []
-    for item in data:
-        # Comprueba si es numérico (int o float) Y positivo
-        if isinstance(item, (int, float)) and item > 0:
-            transformed_data.append(math.log(item))
-    return transformed_data
-
-
-#
-# 3. FUNCIONES DE TEXTO (Text)
-#
+    values = _numeric_array(data)
+    # Solo se transforman los valores positivos
+    return _as_output(np.log(values[values > 0]), data)
 
 
-def tokenize_text(text: str) -> str:
+def clip_percentiles(
+    data: list, lower_pct: float = 1.0, upper_pct: float = 99.0
+) -> list:
     """
-    Tokeniza texto en palabras, seleccionando solo alfanuméricos y
-    convirtiendo a minúsculas.
+    Recorta valores numéricos a sus percentiles (p. ej. del 1 al 99).
+
+    Los percentiles se estiman con un TDigest en una pasada, sin ordenar la
+    columna (ver PercentileClipper). Se ignoran los valores no numéricos.
 
     Args:
-        text (str): Texto a procesar.
+        data (list): Lista o array de valores numéricos.
+        lower_pct (float, optional): Percentil inferior (0-100). Por defecto 1.
+        upper_pct (float, optional): Percentil superior (0-100). Por defecto 99.
 
     Returns:
-        str: Texto procesado (palabras alfanuméricas en minúsculas unidas por espacio).
+        list: Lista (o array) de valores recortados.
     """
-    if not isinstance(text, str):
-        return ""
-
-    # 1. Convertir a minúsculas
-    text = text.lower()
-    # 2. Buscar todas las secuencias de caracteres alfanuméricos (palabras)
-    words = re.findall(r"\b\w+\b", text)
-    # 3. Unir de nuevo como "Texto procesado"
-    return " ".join(words)
+    return PercentileClipper(lower_pct, upper_pct).fit_transform(data)
 
 
-def select_alphanumeric_spaces(text: str) -> str:
+def robust_scale(data: list, lower_pct: float = 25.0, upper_pct: float = 75.0) -> list:
     """
-    Selecciona solo caracteres alfanuméricos y espacios del texto.
+    Escala valores numéricos con la mediana y el rango intercuartílico.
+
+    X_robust = (X - mediana) / (P_upper - P_lower). A diferencia de
+    normalize_min_max, unos pocos valores extremos no cambian la escala del
+    resto. Los cuantiles se estiman con un TDigest (ver RobustScaler).
 
     Args:
-        text (str): Texto a procesar.
+        data (list): Lista o array de valores numéricos.
+        lower_pct (float, optional): Percentil inferior del rango. Por defecto 25.
+        upper_pct (float, optional): Percentil superior del rango. Por defecto 75.
 
     Returns:
-        str: Texto procesado.
+        list: Lista (o array) de valores escalados.
     """
-    if not isinstance(text, str):
-        return ""
-    # Reemplaza todo lo que NO sea alfanumérico o espacio
-    return re.sub(r"[^a-zA-Z0-9\s]", "", text)
+    return RobustScaler(lower_pct, upper_pct).fit_transform(data)
 
 
-def remove_stop_words(text: str, stop_words: list) -> str:
-    """
-    Elimina stop-words de un texto (debe estar en minúsculas).
+#
+# 2.1 Escaladores con estado (fit / transform)
+#
 
-    Args:
-        text (str): Texto a procesar.
-        stop_words (list): Lista de stop words a eliminar.
 
-    Returns:
-        str: Texto procesado sin las stop words.
+class _Scaler:
     """
-    if not isinstance(text, str):
-        return ""
+    Base común de los escaladores: ajuste incremental y persistencia.
 
-    words = text.lower().split()
-    stop_words_set = set(stop_words)
-    cleaned_words = [word for word in words if word not in stop_words_set]
-    return " ".join(cleaned_words)
+    Las subclases implementan '_reset', '_update', '_transform_array',
+    '_is_fitted', 'merge' y la conversión de sus estadísticas a/desde un dict.
+    """
 
+    kind = ""
 
-#
-# --- 4. FUNCIONES DE ESTRUCTURA (Struct) ---
-#
+    def fit(self, data: list) -> "_Scaler":
+        """
+        Calcula las estadísticas desde cero con los datos dados.
 
+        Args:
+            data (list): Lista o array de valores (se ignoran los no numéricos).
 
-def flatten_list(data: list) -> list:
-    """
-    Aplana una lista de listas.
+        Returns:
+            _Scaler: El propio escalador, para encadenar llamadas.
+        """
+        self._reset()
+        return self.partial_fit(data)
 
-    Args:
-        data (list): Una lista de listas.
+    def partial_fit(self, data: list) -> "_Scaler":
+        """
+        Actualiza las estadísticas con un nuevo bloque de datos.
 
-    Returns:
+        Args:
+            data (list): Lista o array de valores (se ignoran los no numéricos).
+
+        Returns:
+            _Scaler: El propio escalador, para encadenar llamadas.
+        """
+        self._update(_numeric_array(data))
+        return self
+
+    def transform(self, data: list) -> list:
+        """
+        Aplica la transformación con las estadísticas ya calculadas.
+
+        Args:
+            data (list): Lista o array de valores.
+
+        Returns:
+            list: Lista (o array) de valores transformados.
+
+        Raises:
+            ValueError: Si el escalador todavía no se ha ajustado.
+        """
+        if not self._is_fitted():
+            raise ValueError("El escalador no está ajustado: llama antes a fit().")
+        return _as_output(self._transform_array(_numeric_array(data)), data)
+
+    def fit_transform(self, data: list) -> list:
+        """
+        Ajusta el escalador y transforma los mismos datos.
+
+        Args:
+            data (list): Lista o array de valores.
+
+        Returns:
+            list: Lista (o array) de valores transformados.
+        """
+        values = _numeric_array(data)
+        self._reset()
+        self._update(values)
+        return _as_output(self._transform_array(values), data)
+
+    def save(self, path: str) -> None:
+        """
+        Guarda las estadísticas del escalador en un fichero JSON.
+
+        Args:
+            path (str): Ruta del fichero de salida.
+        """
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"kind": self.kind, **self.to_dict()}, handle)
+
+    @staticmethod
+    def load(path: str) -> "_Scaler":
+        """
+        Carga un escalador guardado con save().
+
+        Args:
+            path (str): Ruta del fichero JSON.
+
+        Returns:
+            _Scaler: El escalador indicado en el fichero (MinMaxScaler, ZScoreScaler, ...).
+        """
+        with open(path, encoding="utf-8") as handle:
+            state = json.load(handle)
+        # Escaladores por su 'kind', incluidas las subclases de subclases
+        scaler_classes, pending = {}, list(_Scaler.__subclasses__())
+        while pending:
+            cls = pending.pop()
+            scaler_classes[cls.kind] = cls
+            pending.extend(cls.__subclasses__())
+        scaler_class = scaler_classes.get(state.pop("kind", None) or None)
+        if scaler_class is None:
+            raise ValueError(f"Fichero de estadísticas no válido: {path}")
+        return scaler_class.from_dict(state)
+
+
+class MinMaxScaler(_Scaler):
+    """
+    Escalador min-max con estadísticas persistentes.
+
+    Equivale a normalize_min_max, pero el mínimo y el máximo se calculan una
+    vez (fit/partial_fit) y se reutilizan en cada llamada a transform.
+    """
+
+    kind = "minmax"
+
+    def __init__(self, new_min: float = 0.0, new_max: float = 1.0):
+        self.new_min = new_min
+        self.new_max = new_max
+        self._reset()
+
+    def _reset(self) -> None:
+        self.min_ = None
+        self.max_ = None
+        self.n_samples_ = 0
+
+    def _is_fitted(self) -> bool:
+        return self.n_samples_ > 0
+
+    def _update(self, values: np.ndarray) -> None:
+        if values.size == 0:
+            return
+        self._combine(float(values.min()), float(values.max()), int(values.size))
+
+    def _combine(self, low: float, high: float, count: int) -> None:
+        if self.min_ is None:
+            self.min_, self.max_ = low, high
+        else:
+            # np.minimum/np.maximum propagan nan igual que values.min()/max()
+            self.min_ = float(np.minimum(self.min_, low))
+            self.max_ = float(np.maximum(self.max_, high))
+        self.n_samples_ += count
+
+    def _transform_array(self, values: np.ndarray) -> np.ndarray:
+        if values.size == 0:
+            return values
+        range_val = self.max_ - self.min_
+        if range_val == 0:
+            # Si todos los valores son iguales, devuelve el nuevo mínimo
+            return np.full(values.shape, self.new_min, dtype=np.float64)
+        # X_norm = new_min + ((X - X_min) * (new_max - new_min)) / (X_max - X_min)
+        return (
+            self.new_min
+            + ((values - self.min_) * (self.new_max - self.new_min)) / range_val
+        )
+
+    def merge(self, other: "MinMaxScaler") -> "MinMaxScaler":
+        """
+        Combina las estadísticas de otro MinMaxScaler ajustado con otros datos.
+
+        Args:
+            other (MinMaxScaler): Escalador ajustado sobre otro bloque.
+
+        Returns:
+            MinMaxScaler: El propio escalador, ya combinado.
+        """
+        if other.n_samples_:
+            self._combine(other.min_, other.max_, other.n_samples_)
+        return self
+
+    def to_dict(self) -> dict:
+        """Devuelve las estadísticas y parámetros como un dict serializable."""
+        return {
+            "new_min": self.new_min,
+            "new_max": self.new_max,
+            "min": self.min_,
+            "max": self.max_,
+            "n_samples": self.n_samples_,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "MinMaxScaler":
+        """Reconstruye el escalador desde el dict de to_dict()."""
+        scaler = cls(state["new_min"], state["new_max"])
+        scaler.min_ = state["min"]
+        scaler.max_ = state["max"]
+        scaler.n_samples_ = state["n_samples"]
+        return scaler
+
+
+class RunningStats:
+    """
+    Acumulador de estadísticas en una sola pasada (Welford / Chan).
+
+    Mantiene el número de valores, la media, la suma de cuadrados de las
+    desviaciones (M2), el mínimo y el máximo. Es numéricamente estable y
+    dos acumuladores calculados sobre bloques distintos se pueden combinar
+    con merge() sin volver a leer los datos.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @property
+    def variance(self) -> float:
+        """Varianza poblacional (0.0 si no hay datos)."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Desviación estándar poblacional (0.0 si no hay datos)."""
+        return math.sqrt(self.variance)
+
+    def update(self, value: float) -> None:
+        """
+        Añade un único valor (algoritmo de Welford).
+
+        Args:
+            value (float): Valor numérico.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = float(np.minimum(self.min, value))
+        self.max = float(np.maximum(self.max, value))
+
+    def update_many(self, data: list) -> "RunningStats":
+        """
+        Añade un bloque de valores de forma vectorizada.
+
+        Las estadísticas del bloque se calculan con NumPy y se combinan con
+        las acumuladas (fórmula de Chan). Se ignoran los valores no numéricos.
+
+        Args:
+            data (list): Lista o array de valores.
+
+        Returns:
+            RunningStats: El propio acumulador, para encadenar llamadas.
+        """
+        values = _numeric_array(data)
+        if values.size == 0:
+            return self
+        block = RunningStats()
+        block.count = int(values.size)
+        block.mean = float(values.mean())
+        block.m2 = float(np.square(values - block.mean).sum())
+        block.min = float(values.min())
+        block.max = float(values.max())
+        return self.merge(block)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """
+        Combina las estadísticas de otro acumulador (fórmula de Chan).
+
+        Args:
+            other (RunningStats): Acumulador calculado sobre otros datos.
+
+        Returns:
+            RunningStats: El propio acumulador, ya combinado.
+        """
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        # np.minimum/np.maximum propagan nan igual que values.min()/max()
+        self.min = float(np.minimum(self.min, other.min))
+        self.max = float(np.maximum(self.max, other.max))
+        return self
+
+    def to_dict(self) -> dict:
+        """Devuelve las estadísticas como un dict serializable en JSON."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RunningStats":
+        """Reconstruye el acumulador desde el dict de to_dict()."""
+        stats = cls()
+        stats.count = state["count"]
+        stats.mean = state["mean"]
+        stats.m2 = state["m2"]
+        if stats.count:
+            stats.min = state["min"]
+            stats.max = state["max"]
+        return stats
+
+
+class ZScoreScaler(_Scaler):
+    """
+    Escalador z-score con estadísticas persistentes.
+
+    Equivale a standardize_z_score (desviación estándar poblacional). Las
+    estadísticas se acumulan con RunningStats, de modo que el resultado no
+    depende de cómo se haya partido la columna en partial_fit.
+    """
+
+    kind = "zscore"
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self) -> None:
+        self.stats = RunningStats()
+
+    def _is_fitted(self) -> bool:
+        return self.stats.count > 0
+
+    @property
+    def n_samples_(self) -> int:
+        """Número de valores numéricos vistos."""
+        return self.stats.count
+
+    @property
+    def mean_(self) -> float:
+        """Media de los datos vistos."""
+        return self.stats.mean
+
+    @property
+    def std_(self) -> float:
+        """Desviación estándar poblacional de los datos vistos."""
+        return self.stats.std
+
+    def _update(self, values: np.ndarray) -> None:
+        self.stats.update_many(values)
+
+    def _transform_array(self, values: np.ndarray) -> np.ndarray:
+        if values.size == 0:
+            return values
+        std_dev = self.std_
+        if std_dev == 0:
+            # Si la desviación es 0, el Z-score es 0 para todos
+            return np.zeros(values.shape, dtype=np.float64)
+        return (values - self.mean_) / std_dev
+
+    def merge(self, other: "ZScoreScaler") -> "ZScoreScaler":
+        """
+        Combina las estadísticas de otro ZScoreScaler ajustado con otros datos.
+
+        Args:
+            other (ZScoreScaler): Escalador ajustado sobre otro bloque.
+
+        Returns:
+            ZScoreScaler: El propio escalador, ya combinado.
+        """
+        self.stats.merge(other.stats)
+        return self
+
+    def to_dict(self) -> dict:
+        """Devuelve las estadísticas como un dict serializable."""
+        return self.stats.to_dict()
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ZScoreScaler":
+        """Reconstruye el escalador desde el dict de to_dict()."""
+        scaler = cls()
+        scaler.stats = RunningStats.from_dict(state)
+        return scaler
+
+
+def load_scaler(path: str) -> _Scaler:
+    """
+    Carga un escalador (MinMaxScaler, ZScoreScaler, RobustScaler o
+    PercentileClipper) desde un fichero JSON.
+
+    Args:
+        path (str): Ruta del fichero guardado con save().
+
+    Returns:
+        _Scaler: El escalador con sus estadísticas.
+    """
+    return _Scaler.load(path)
+
+
+#
+# 2.2 Resúmenes aproximados (t-digest y count-min) y escaladores por cuantiles
+#
+
+# Valores que se acumulan en un TDigest antes de comprimirlos en centroides
+_TDIGEST_BUFFER = 100_000
+
+
+def _merge_centroids(
+    means: np.ndarray, weights: np.ndarray, compression: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Agrupa centroides (o valores sueltos, con peso 1) en como mucho
+    ~compression/2 centroides.
+
+    Cada centroide cubre como mucho una unidad de la función de escala
+    k(q) = compression / (2 pi) * asin(2q - 1), que da centroides pequeños
+    en las colas y grandes en el centro. Todo es vectorizado.
+    """
+    order = np.argsort(means, kind="stable")
+    means, weights = means[order], weights[order]
+    cumulative = np.cumsum(weights)
+    quantiles = (cumulative - weights / 2) / cumulative[-1]
+    scale = compression / (2 * math.pi) * np.arcsin(np.clip(2 * quantiles - 1, -1, 1))
+    groups = np.floor(scale).astype(np.int64)
+    groups -= groups[0]
+    merged_weights = np.bincount(groups, weights=weights)
+    merged_sums = np.bincount(groups, weights=weights * means)
+    used = merged_weights > 0
+    return merged_sums[used] / merged_weights[used], merged_weights[used]
+
+
+class TDigest:
+    """
+    Resumen t-digest de una distribución para calcular cuantiles.
+
+    Guarda unos pocos centroides (media, peso) en lugar de los datos, así que
+    la mediana o cualquier cuantil de una columna enorme se calcula en una
+    pasada sin ordenarla. El error es menor en las colas. Dos resúmenes de
+    bloques distintos se combinan con merge(). Se ignoran los valores no
+    numéricos y los nan; con unas decenas de valores el resultado es exacto.
+
+    EJEMPLO:
+        digest = TDigest()
+        for chunk in chunks:
+            digest.update(chunk)
+        mediana = digest.quantile(0.5)
+    """
+
+    def __init__(self, compression: float = 200.0):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: list[np.ndarray] = []
+        self._buffered = 0
+
+    def update(self, data: Any) -> "TDigest":
+        """
+        Añade un bloque de valores.
+
+        Args:
+            data (Any): Lista o array de valores.
+
+        Returns:
+            TDigest: El propio resumen, para encadenar llamadas.
+        """
+        values = _numeric_array(data)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += values.size
+        if self._buffered >= _TDIGEST_BUFFER:
+            self._compress()
+        return self
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means, *self._buffer])
+        weights = np.concatenate([self.weights, np.ones(self._buffered)])
+        self._buffer, self._buffered = [], 0
+        self.means, self.weights = _merge_centroids(means, weights, self.compression)
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """
+        Combina otro resumen calculado sobre otros datos.
+
+        Args:
+            other (TDigest): Resumen de otro bloque.
+
+        Returns:
+            TDigest: El propio resumen, ya combinado.
+        """
+        other._compress()
+        if other.count == 0:
+            return self
+        self._compress()
+        self.means, self.weights = _merge_centroids(
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+            self.compression,
+        )
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        """
+        Cuantil aproximado (0 <= q <= 1), interpolando entre centroides.
+
+        Args:
+            q (float | np.ndarray): Cuantil o array de cuantiles.
+
+        Returns:
+            float | np.ndarray: El valor (nan si el resumen está vacío).
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        self._compress()
+        # Posición (en peso acumulado) del centro de cada centroide
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate(([0.0], centers, [float(self.count)]))
+        values = np.concatenate(([self.min], self.means, [self.max]))
+        # Con centroides de peso 1 coincide con np.quantile (interpolación lineal)
+        targets = np.asarray(q, dtype=np.float64) * (self.count - 1) + 0.5
+        result = np.interp(targets, positions, values)
+        return float(result) if np.ndim(q) == 0 else result
+
+    def to_dict(self) -> dict:
+        """Devuelve el resumen como un dict serializable en JSON."""
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "TDigest":
+        """Reconstruye el resumen desde el dict de to_dict()."""
+        digest = cls(state["compression"])
+        digest.means = np.asarray(state["means"], dtype=np.float64)
+        digest.weights = np.asarray(state["weights"], dtype=np.float64)
+        digest.count = state["count"]
+        if digest.count:
+            digest.min = state["min"]
+            digest.max = state["max"]
+        return digest
+
+
+def _hash_matrix(keys: Any) -> np.ndarray:
+    """Hashes estables (n, 2) uint64 de una lista (o array) de claves."""
+    if isinstance(keys, np.ndarray) and keys.dtype.kind == "f":
+        return _float_hashes(keys)
+    integers = _as_int64_array(keys)
+    if integers is not None:
+        return _int_hashes(integers)
+    return np.frombuffer(b"".join(map(_stable_hashes, keys)), dtype="<u8").reshape(
+        -1, 2
+    )
+
+
+class CountMinSketch:
+    """
+    Frecuencias aproximadas con memoria fija (count-min sketch).
+
+    Una tabla depth x width de contadores: cada valor suma en una columna
+    por fila y su frecuencia estimada es el mínimo de esas columnas. Nunca
+    subestima; el exceso es como mucho ~e/width del total con probabilidad
+    1 - e^-depth. Las tablas de bloques distintos se suman con merge().
+
+    EJEMPLO:
+        sketch = CountMinSketch()
+        sketch.add(Counter(chunk))
+        sketch.estimate(["a", "b"])
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, keys: Any) -> np.ndarray:
+        hashes = _hash_matrix(keys)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return (
+            (hashes[:, 0] + rows * (hashes[:, 1] | np.uint64(1)))
+            % np.uint64(self.width)
+        ).astype(np.intp)
+
+    def add(self, keys: Any, counts: np.ndarray | None = None) -> "CountMinSketch":
+        """
+        Suma las frecuencias de un bloque.
+
+        Args:
+            keys (Any): Dict valor -> número de apariciones (p. ej. un
+                Counter), o lista/array de valores distintos.
+            counts (np.ndarray | None, optional): Apariciones de cada valor
+                cuando 'keys' no es un dict.
+
+        Returns:
+            CountMinSketch: El propio sketch, para encadenar llamadas.
+        """
+        if isinstance(keys, dict):
+            keys, counts = list(keys), np.fromiter(
+                keys.values(), dtype=np.int64, count=len(keys)
+            )
+        if not len(keys):
+            return self
+        columns = self._columns(keys)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(
+                columns[row], weights=counts, minlength=self.width
+            ).astype(np.int64)
+        return self
+
+    def estimate(self, keys: Any) -> np.ndarray:
+        """Frecuencia estimada (nunca por debajo de la real) de cada clave."""
+        if not len(keys):
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(keys if isinstance(keys, np.ndarray) else list(keys))
+        return self.table[np.arange(self.depth)[:, None], columns].min(axis=0)
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """Suma las frecuencias de otro sketch del mismo tamaño."""
+        if self.table.shape != other.table.shape:
+            raise ValueError("Solo se pueden combinar sketches del mismo tamaño.")
+        self.table += other.table
+        return self
+
+
+class _QuantileScaler(_Scaler):
+    """
+    Base de los escaladores que usan cuantiles: acumulan un TDigest, así que
+    se ajustan en una pasada por bloques y se combinan con merge().
+    """
+
+    def __init__(self, lower_pct: float, upper_pct: float):
+        if not 0 <= lower_pct <= upper_pct <= 100:
+            raise ValueError(
+                "Los percentiles deben cumplir 0 <= lower_pct <= upper_pct <= 100."
+            )
+        self.lower_pct = lower_pct
+        self.upper_pct = upper_pct
+        self._reset()
+
+    def _reset(self) -> None:
+        self.digest = TDigest()
+
+    def _is_fitted(self) -> bool:
+        return self.digest.count > 0
+
+    @property
+    def n_samples_(self) -> int:
+        """Número de valores numéricos vistos."""
+        return self.digest.count
+
+    def _update(self, values: np.ndarray) -> None:
+        self.digest.update(values)
+
+    def merge(self, other: "_QuantileScaler") -> "_QuantileScaler":
+        """
+        Combina el resumen de otro escalador ajustado con otros datos.
+
+        Args:
+            other (_QuantileScaler): Escalador del mismo tipo ajustado sobre otro bloque.
+
+        Returns:
+            _QuantileScaler: El propio escalador, ya combinado.
+        """
+        self.digest.merge(other.digest)
+        return self
+
+    def to_dict(self) -> dict:
+        """Devuelve los percentiles y el resumen como un dict serializable."""
+        return {
+            "lower_pct": self.lower_pct,
+            "upper_pct": self.upper_pct,
+            "digest": self.digest.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "_QuantileScaler":
+        """Reconstruye el escalador desde el dict de to_dict()."""
+        scaler = cls(state["lower_pct"], state["upper_pct"])
+        scaler.digest = TDigest.from_dict(state["digest"])
+        return scaler
+
+
+class PercentileClipper(_QuantileScaler):
+    """
+    Recorte a percentiles con estadísticas persistentes.
+
+    Como clip_values, pero los límites son los percentiles lower_pct y
+    upper_pct de los datos ajustados (p. ej. 1 y 99).
+    """
+
+    kind = "percentile-clip"
+
+    def __init__(self, lower_pct: float = 1.0, upper_pct: float = 99.0):
+        super().__init__(lower_pct, upper_pct)
+
+    @property
+    def bounds_(self) -> tuple[float, float]:
+        """Límites (inferior, superior) del recorte."""
+        low, high = self.digest.quantile(
+            np.array([self.lower_pct, self.upper_pct]) / 100
+        )
+        return float(low), float(high)
+
+    def _transform_array(self, values: np.ndarray) -> np.ndarray:
+        return np.clip(values, *self.bounds_)
+
+
+class RobustScaler(_QuantileScaler):
+    """
+    Escalador robusto (mediana y rango intercuartílico) con estadísticas
+    persistentes.
+    """
+
+    kind = "robust"
+
+    def __init__(self, lower_pct: float = 25.0, upper_pct: float = 75.0):
+        super().__init__(lower_pct, upper_pct)
+
+    @property
+    def center_(self) -> float:
+        """Mediana de los datos vistos."""
+        return self.digest.quantile(0.5)
+
+    @property
+    def scale_(self) -> float:
+        """Rango entre percentiles; 1.0 si es 0 (solo se centra)."""
+        low, high = self.digest.quantile(
+            np.array([self.lower_pct, self.upper_pct]) / 100
+        )
+        return float(high - low) or 1.0
+
+    def _transform_array(self, values: np.ndarray) -> np.ndarray:
+        if values.size == 0:
+            return values
+        return (values - self.center_) / self.scale_
+
+
+#
+# 3. FUNCIONES DE TEXTO (Text)
+#
+
+
+class Tokenizer:
+    """
+    Tokenizador con los patrones compilados una sola vez.
+
+    Ofrece versiones por lotes (tokenize_many, strip_punctuation_many) que
+    recorren un iterable de documentos sin coste por llamada y pueden
+    devolver listas de tokens en lugar de strings unidos por espacios.
+    """
+
+    # \w+ encuentra las mismas palabras que \b\w+\b (cada secuencia máxima de
+    # \w ya está delimitada por fronteras de palabra) y es más rápido
+    WORD_PATTERN = r"\w+"
+    NON_ALPHANUMERIC_PATTERN = r"[^a-zA-Z0-9\s]"
+
+    def __init__(self, lowercase: bool = True, pattern: str = WORD_PATTERN):
+        self.lowercase = lowercase
+        self._word_re = re.compile(pattern)
+        self._non_alphanumeric_re = re.compile(self.NON_ALPHANUMERIC_PATTERN)
+
+    def tokenize(self, text: str) -> list[str]:
+        """
+        Divide un texto en tokens (en minúsculas si lowercase=True).
+
+        Args:
+            text (str): Texto a procesar.
+
+        Returns:
+            list[str]: Lista de tokens ([] si no es un string).
+        """
+        if not isinstance(text, str):
+            return []
+        if self.lowercase:
+            text = text.lower()
+        return self._word_re.findall(text)
+
+    def tokenize_many(self, docs: Iterable[str], join: bool = False) -> Iterator:
+        """
+        Tokeniza muchos documentos de forma perezosa.
+
+        Args:
+            docs (Iterable[str]): Documentos a procesar.
+            join (bool, optional): Si es True devuelve cada documento como
+                                   string unido por espacios (como
+                                   tokenize_text). Por defecto False.
+
+        Returns:
+            Iterator: Una lista de tokens (o un string) por documento.
+        """
+        # Se enlazan los métodos a variables locales para evitar búsquedas
+        findall = self._word_re.findall
+        lowercase = self.lowercase
+        for doc in docs:
+            if not isinstance(doc, str):
+                tokens = []
+            else:
+                tokens = findall(doc.lower() if lowercase else doc)
+            yield " ".join(tokens) if join else tokens
+
+    def strip_punctuation(self, text: str) -> str:
+        """
+        Elimina todo lo que no sea alfanumérico (ASCII) o espacio.
+
+        Args:
+            text (str): Texto a procesar.
+
+        Returns:
+            str: Texto procesado ("" si no es un string).
+        """
+        if not isinstance(text, str):
+            return ""
+        return self._non_alphanumeric_re.sub("", text)
+
+    def strip_punctuation_many(self, docs: Iterable[str]) -> Iterator[str]:
+        """
+        Elimina la puntuación de muchos documentos de forma perezosa.
+
+        Args:
+            docs (Iterable[str]): Documentos a procesar.
+
+        Returns:
+            Iterator[str]: Un texto procesado por documento.
+        """
+        sub = self._non_alphanumeric_re.sub
+        for doc in docs:
+            yield sub("", doc) if isinstance(doc, str) else ""
+
+
+# Tokenizador compartido por las funciones de texto
+_DEFAULT_TOKENIZER = Tokenizer()
+
+
+def tokenize_text(text: str) -> str:
+    """
+    Tokeniza texto en palabras, seleccionando solo alfanuméricos y
+    convirtiendo a minúsculas.
+
+    Args:
+        text (str): Texto a procesar.
+
+    Returns:
+        str: Texto procesado (palabras alfanuméricas en minúsculas unidas por espacio).
+    """
+    # Minúsculas + secuencias alfanuméricas con el patrón precompilado
+    words = _DEFAULT_TOKENIZER.tokenize(text)
+    # Unir de nuevo como "Texto procesado"
+    return " ".join(words)
+
+
+def tokenize_many(docs: Iterable[str], join: bool = False) -> list:
+    """
+    Tokeniza una lista de documentos con el tokenizador compartido.
+
+    Args:
+        docs (Iterable[str]): Documentos a procesar.
+        join (bool, optional): Si es True cada documento se devuelve como
+                               string (igual que tokenize_text). Por defecto False.
+
+    Returns:
+        list: Una lista de tokens (o un string) por documento.
+    """
+    return list(_DEFAULT_TOKENIZER.tokenize_many(docs, join=join))
+
+
+def select_alphanumeric_spaces(text: str) -> str:
+    """
+    Selecciona solo caracteres alfanuméricos y espacios del texto.
+
+    Args:
+        text (str): Texto a procesar.
+
+    Returns:
+        str: Texto procesado.
+    """
+    # Reemplaza todo lo que NO sea alfanumérico o espacio
+    return _DEFAULT_TOKENIZER.strip_punctuation(text)
+
+
+def read_stop_words(path: str) -> list[str]:
+    """
+    Lee un fichero de stop words: una palabra o frase por línea.
+
+    Las líneas vacías y las que empiezan por '#' se ignoran.
+
+    Args:
+        path (str): Ruta del fichero (UTF-8).
+
+    Returns:
+        list[str]: Stop words y frases del fichero.
+    """
+    with open(path, encoding="utf-8") as handle:
+        return [
+            line.strip()
+            for line in handle
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class StopWordFilter:
+    """
+    Filtro de stop words compilado una vez y reutilizable.
+
+    Las entradas de una palabra se guardan en un frozenset. Las entradas de
+    varias palabras ('de la', 'por lo tanto') son frases: se compilan en un
+    autómata Aho-Corasick sobre tokens, que encuentra todas las frases en
+    una sola pasada por el documento.
+    """
+
+    def __init__(self, stop_words: Iterable[str]):
+        words = set()
+        phrases = []
+        for entry in stop_words:
+            parts = entry.split()
+            if len(parts) == 1:
+                words.add(parts[0])
+            elif parts:
+                phrases.append(parts)
+        self.words = frozenset(words)
+        self.phrases = [" ".join(parts) for parts in phrases]
+        self._build_automaton(phrases)
+
+    @classmethod
+    def from_file(cls, path: str) -> "StopWordFilter":
+        """
+        Crea el filtro desde un fichero con una stop word (o frase) por línea.
+
+        Args:
+            path (str): Ruta del fichero (UTF-8).
+
+        Returns:
+            StopWordFilter: El filtro compilado.
+        """
+        return cls(read_stop_words(path))
+
+    def _build_automaton(self, phrases: list[list[str]]) -> None:
+        """Construye las tablas goto/fail/salida del autómata Aho-Corasick."""
+        self._goto: list[dict[str, int]] = [{}]
+        # Longitud de la frase más larga que termina en cada estado
+        self._match_len: list[int] = [0]
+        for parts in phrases:
+            state = 0
+            for token in parts:
+                if token not in self._goto[state]:
+                    self._goto.append({})
+                    self._match_len.append(0)
+                    self._goto[state][token] = len(self._goto) - 1
+                state = self._goto[state][token]
+            self._match_len[state] = max(self._match_len[state], len(parts))
+
+        # Enlaces de fallo por niveles (BFS)
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._match_len[child] = max(
+                    self._match_len[child], self._match_len[self._fail[child]]
+                )
+
+    def filter_tokens(self, tokens: list[str]) -> list[str]:
+        """
+        Elimina de una lista de tokens las stop words y las frases.
+
+        Args:
+            tokens (list[str]): Tokens del documento.
+
+        Returns:
+            list[str]: Tokens que no forman parte de ninguna stop word.
+        """
+        words = self.words
+        if len(self._goto) == 1:
+            return [token for token in tokens if token not in words]
+
+        goto, fail, match_len = self._goto, self._fail, self._match_len
+        removed = [False] * len(tokens)
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            length = match_len[state]
+            if length:
+                removed[position - length + 1 : position + 1] = [True] * length
+        return [
+            token
+            for token, is_removed in zip(tokens, removed)
+            if not is_removed and token not in words
+        ]
+
+    def filter(self, text: str) -> str:
+        """
+        Elimina las stop words de un texto (se pasa a minúsculas).
+
+        Args:
+            text (str): Texto a procesar.
+
+        Returns:
+            str: Texto sin stop words ("" si no es un string).
+        """
+        if not isinstance(text, str):
+            return ""
+        return " ".join(self.filter_tokens(text.lower().split()))
+
+    def filter_many(self, docs: Iterable[str]) -> Iterator[str]:
+        """
+        Filtra muchos documentos de forma perezosa.
+
+        Args:
+            docs (Iterable[str]): Documentos a procesar.
+
+        Returns:
+            Iterator[str]: Un texto filtrado por documento.
+        """
+        for doc in docs:
+            yield self.filter(doc)
+
+
+@lru_cache(maxsize=32)
+def _cached_stop_word_filter(stop_words: tuple) -> StopWordFilter:
+    """Reutiliza el filtro compilado cuando se repite la misma lista."""
+    return StopWordFilter(stop_words)
+
+
+def remove_stop_words(text: str, stop_words: list) -> str:
+    """
+    Elimina stop-words de un texto (debe estar en minúsculas).
+
+    Args:
+        text (str): Texto a procesar.
+        stop_words (list): Lista de stop words (o frases de varias palabras)
+                           a eliminar, o un StopWordFilter ya compilado.
+
+    Returns:
+        str: Texto procesado sin las stop words.
+    """
+    if not isinstance(text, str):
+        return ""
+
+    if not isinstance(stop_words, StopWordFilter):
+        # El filtro se compila una vez por lista distinta
+        stop_words = _cached_stop_word_filter(tuple(stop_words))
+    return stop_words.filter(text)
+
+
+#
+# 3.1 Vectorización (bolsa de palabras y hashing)
+#
+
+
+class CSRMatrix:
+    """
+    Matriz dispersa en formato CSR, sin depender de scipy.
+
+    La fila i tiene sus columnas en indices[indptr[i]:indptr[i + 1]] y sus
+    valores en data[...]; solo se guardan los valores distintos de cero, así
+    que la memoria crece con ellos y no con filas x columnas. save() escribe
+    un .npz con las mismas claves que scipy.sparse.save_npz, así que se
+    puede abrir con scipy.sparse.load_npz.
+    """
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        indices: np.ndarray,
+        indptr: np.ndarray,
+        shape: tuple[int, int],
+    ):
+        self.data = np.asarray(data)
+        self.indices = np.asarray(indices)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.shape = (int(shape[0]), int(shape[1]))
+        if len(self.indptr) != self.shape[0] + 1 or len(self.indices) != len(self.data):
+            raise ValueError(
+                "indptr, indices y data no corresponden a una matriz CSR de esa forma."
+            )
+
+    @property
+    def nnz(self) -> int:
+        """Número de valores guardados (distintos de cero)."""
+        return len(self.data)
+
+    @classmethod
+    def vstack(cls, matrices: Iterable["CSRMatrix"]) -> "CSRMatrix":
+        """
+        Une matrices por filas (p. ej. los bloques de un recorrido en streaming).
+
+        El número de columnas es el mayor de todas, así que vale para bloques
+        transformados con un vocabulario que ha ido creciendo.
+        """
+        matrices = list(matrices)
+        if not matrices:
+            return cls(
+                np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), [0], (0, 0)
+            )
+        offsets = np.cumsum([0] + [matrix.nnz for matrix in matrices[:-1]])
+        indptr = np.concatenate(
+            [[0]]
+            + [matrix.indptr[1:] + offset for matrix, offset in zip(matrices, offsets)]
+        )
+        n_cols = max(matrix.shape[1] for matrix in matrices)
+        return cls(
+            np.concatenate([matrix.data for matrix in matrices]),
+            np.concatenate([matrix.indices for matrix in matrices]).astype(
+                _index_dtype(n_cols), copy=False
+            ),
+            indptr,
+            (sum(matrix.shape[0] for matrix in matrices), n_cols),
+        )
+
+    def toarray(self) -> np.ndarray:
+        """Matriz densa equivalente (solo para matrices pequeñas)."""
+        dense = np.zeros(self.shape, dtype=self.data.dtype)
+        rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+        dense[rows, self.indices] = self.data
+        return dense
+
+    def save(self, path: str, compressed: bool = True):
+        """Guarda la matriz en un .npz compatible con scipy.sparse.load_npz."""
+        savez = np.savez_compressed if compressed else np.savez
+        savez(
+            path,
+            indices=self.indices,
+            indptr=self.indptr,
+            format=np.array(b"csr"),
+            shape=np.array(self.shape),
+            data=self.data,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CSRMatrix":
+        """Lee una matriz guardada con save() (o con scipy.sparse.save_npz en CSR)."""
+        with np.load(path) as archive:
+            matrix_format = archive["format"].item()
+            if isinstance(matrix_format, bytes):
+                matrix_format = matrix_format.decode("ascii")
+            if matrix_format != "csr":
+                raise ValueError(
+                    f"Formato disperso no soportado: '{matrix_format}' (solo 'csr')."
+                )
+            return cls(
+                archive["data"],
+                archive["indices"],
+                archive["indptr"],
+                tuple(archive["shape"]),
+            )
+
+    def to_scipy(self):
+        """Convierte a scipy.sparse.csr_matrix (scipy es una dependencia opcional)."""
+        try:
+            from scipy import sparse
+        except ImportError as error:
+            raise ImportError("to_scipy requiere scipy (pip install scipy).") from error
+        return sparse.csr_matrix(
+            (self.data, self.indices, self.indptr), shape=self.shape
+        )
+
+
+def _index_dtype(n_cols: int) -> type:
+    """dtype de los índices de columna: int32 si caben (como en scipy)."""
+    return np.int32 if n_cols <= np.iinfo(np.int32).max else np.int64
+
+
+def _document_tokens(doc: Any) -> list[str]:
+    """Tokens de un documento: lista de tokenize_many o string de tokenize_text."""
+    if isinstance(doc, list):
+        return doc
+    if isinstance(doc, str):
+        return doc.split()
+    return [] if doc is None else list(doc)
+
+
+def _count_matrix(
+    docs: Iterable,
+    columns_of: Callable[[list[str]], np.ndarray],
+    n_cols: Callable[[], int],
+    binary: bool,
+) -> CSRMatrix:
+    """
+    Construye la matriz de recuentos de un bloque de documentos.
+
+    Todos los tokens del bloque se convierten a columnas de una vez
+    ('columns_of', -1 para los que se ignoran) y los repetidos de cada fila
+    se suman con np.unique sobre la clave fila * columnas + columna, que
+    además deja las columnas de cada fila ordenadas.
+    """
+    token_lists = [_document_tokens(doc) for doc in docs]
+    lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+    columns = columns_of(list(chain.from_iterable(token_lists)))
+    width = max(n_cols(), 1)
+
+    rows = np.repeat(np.arange(len(token_lists), dtype=np.int64), lengths)
+    known = columns >= 0
+    keys, counts = np.unique(rows[known] * width + columns[known], return_counts=True)
+    indptr = np.zeros(len(token_lists) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys // width, minlength=len(token_lists)), out=indptr[1:])
+    data = np.ones(len(keys), dtype=np.int64) if binary else counts.astype(np.int64)
+    return CSRMatrix(
+        data,
+        (keys % width).astype(_index_dtype(n_cols())),
+        indptr,
+        (len(token_lists), n_cols()),
+    )
+
+
+# Tokens cuya columna se recuerda en un HashingVectorizer (se vacía al llenarse)
+_HASH_CACHE_SIZE = 1_000_000
+
+
+class _HashedColumns(dict):
+    """Dict token -> columna que calcula (y recuerda) la de cada token nuevo."""
+
+    def __init__(self, n_features: int):
+        super().__init__()
+        self.n_features = n_features
+
+    def __missing__(self, token: str) -> int:
+        column = self[token] = (
+            int.from_bytes(_stable_hashes(token)[:8], "little") % self.n_features
+        )
+        return column
+
+
+class _GrowingVocabulary(dict):
+    """Dict token -> columna que da la siguiente columna a cada token nuevo."""
+
+    def __missing__(self, token: str) -> int:
+        column = self[token] = len(self)
+        return column
+
+
+class HashingVectorizer:
+    """
+    Bolsa de palabras con el truco del hashing: sin vocabulario ni ajuste.
+
+    Cada token va a la columna hash(token) % n_features, con el mismo hash
+    estable que el filtro de Bloom, así que el resultado no depende del
+    proceso ni de la ejecución y los bloques se pueden transformar por
+    separado (o en paralelo). Dos tokens pueden compartir columna.
+
+    EJEMPLO:
+        vectorizer = HashingVectorizer(n_features=2**18)
+        matrix = vectorizer.transform(tokenize_many(docs))
+    """
+
+    def __init__(self, n_features: int = 2**20, binary: bool = False):
+        if n_features < 1:
+            raise ValueError("n_features debe ser al menos 1.")
+        self.n_features = n_features
+        self.binary = binary
+        self._columns = _HashedColumns(n_features)
+
+    def _columns_of(self, tokens: list[str]) -> np.ndarray:
+        # El dict calcula en __missing__ la columna de los tokens nuevos, así
+        # que los ya vistos se resuelven en un bucle de C
+        if len(self._columns) > _HASH_CACHE_SIZE:
+            self._columns.clear()
+        return np.fromiter(
+            map(self._columns.__getitem__, tokens), dtype=np.int64, count=len(tokens)
+        )
+
+    def transform(self, docs: Iterable) -> CSRMatrix:
+        """
+        Convierte documentos tokenizados en una matriz de recuentos.
+
+        Args:
+            docs (Iterable): Listas de tokens (tokenize_many) o strings de
+                tokens separados por espacios (tokenize_text).
+
+        Returns:
+            CSRMatrix: Una fila por documento y n_features columnas.
+        """
+        return _count_matrix(
+            docs, self._columns_of, lambda: self.n_features, self.binary
+        )
+
+    def transform_many(self, chunks: Iterable[Iterable]) -> Iterator[CSRMatrix]:
+        """Transforma bloques de documentos de forma perezosa (ver CSRMatrix.vstack)."""
+        for docs in chunks:
+            yield self.transform(docs)
+
+
+class CountVectorizer:
+    """
+    Bolsa de palabras con vocabulario: una columna por token distinto.
+
+    El vocabulario se puede ajustar antes (fit/partial_fit) o construir
+    mientras se transforma (fit_transform), en una sola pasada: cada token
+    nuevo recibe la siguiente columna, así que los bloques ya transformados
+    siguen siendo válidos y se unen con CSRMatrix.vstack. Con un vocabulario
+    fijo los tokens desconocidos se ignoran. Un Vocabulary (ver 3.2) se usa
+    tal cual, sin copiarlo en memoria, y no crece al transformar.
+
+    EJEMPLO:
+        vectorizer = CountVectorizer()
+        matrix = CSRMatrix.vstack(vectorizer.fit_transform(chunk) for chunk in chunks)
+        vectorizer.feature_names()
+    """
+
+    def __init__(
+        self,
+        vocabulary: "Iterable[str] | Vocabulary | None" = None,
+        binary: bool = False,
+    ):
+        self.binary = binary
+        self.vocabulary_: "dict[str, int] | Vocabulary" = _GrowingVocabulary()
+        if isinstance(vocabulary, Vocabulary):
+            self.vocabulary_ = vocabulary
+        elif vocabulary is not None:
+            self.partial_fit([list(vocabulary)])
+
+    def partial_fit(self, docs: Iterable) -> "CountVectorizer":
+        """Añade al vocabulario los tokens nuevos de un bloque de documentos."""
+        if isinstance(self.vocabulary_, Vocabulary):
+            raise TypeError(
+                "Un Vocabulary persistente no admite tokens nuevos: usa fit para reemplazarlo."
+            )
+        lookup = self.vocabulary_.__getitem__
+        for doc in docs:
+            deque(map(lookup, _document_tokens(doc)), maxlen=0)
+        return self
+
+    def fit(self, docs: Iterable) -> "CountVectorizer":
+        """Construye el vocabulario desde cero."""
+        self.vocabulary_ = _GrowingVocabulary()
+        return self.partial_fit(docs)
+
+    def _known_columns(self, tokens: list[str]) -> np.ndarray:
+        if isinstance(self.vocabulary_, Vocabulary):
+            return self.vocabulary_.get_many(tokens)
+        return np.fromiter(
+            map(self.vocabulary_.get, tokens, repeat(-1)),
+            dtype=np.int64,
+            count=len(tokens),
+        )
+
+    def _growing_columns(self, tokens: list[str]) -> np.ndarray:
+        if isinstance(self.vocabulary_, Vocabulary):
+            return self.vocabulary_.get_many(tokens)
+        return np.fromiter(
+            map(self.vocabulary_.__getitem__, tokens), dtype=np.int64, count=len(tokens)
+        )
+
+    def transform(self, docs: Iterable) -> CSRMatrix:
+        """
+        Convierte documentos en recuentos con el vocabulario actual.
+
+        Args:
+            docs (Iterable): Listas de tokens o strings de tokens separados por espacios.
+
+        Returns:
+            CSRMatrix: Una fila por documento y una columna por token del
+            vocabulario (los desconocidos se ignoran).
+        """
+        return _count_matrix(
+            docs, self._known_columns, lambda: len(self.vocabulary_), self.binary
+        )
+
+    def fit_transform(self, docs: Iterable) -> CSRMatrix:
+        """Como transform, pero añadiendo antes al vocabulario los tokens nuevos."""
+        return _count_matrix(
+            docs, self._growing_columns, lambda: len(self.vocabulary_), self.binary
+        )
+
+    def feature_names(self) -> list[str]:
+        """Tokens del vocabulario, en el orden de sus columnas."""
+        return list(self.vocabulary_)
+
+
+#
+# 3.2 Vocabulario persistente (frecuencias por documento y índice en disco)
+#
+
+
+class _DocumentFrequencies:
+    """
+    Cuenta en cuántos documentos aparece cada token, con volcado a disco.
+
+    Mientras los tokens distintos caben en 'memory_mb' se cuentan en un
+    Counter. Al superarlo, los recuentos se reparten en 'partitions'
+    ficheros según el hash del token y el Counter se vacía; al final cada
+    partición se suma por separado, así que el resultado es exacto.
+    """
+
+    def __init__(
+        self, memory_mb: float = 512, partitions: int = 64, spill_dir: str | None = None
+    ):
+        if partitions < 1:
+            raise ValueError("El número de particiones debe ser al menos 1.")
+        self.max_keys = max(1, int(memory_mb * 2**20 / _BYTES_PER_KEY))
+        self.partitions = partitions
+        self.spill_dir = spill_dir
+        self.n_docs = 0
+        self.counts: Counter = Counter()
+        self._directory: str | None = None
+        self._handles: list = []
+
+    @property
+    def spilled(self) -> bool:
+        return self._directory is not None
+
+    def update(self, docs: Iterable) -> "_DocumentFrequencies":
+        """Suma un bloque de documentos (listas de tokens o strings de tokens)."""
+        counts = self.counts
+        for doc in docs:
+            counts.update(set(_document_tokens(doc)))
+            self.n_docs += 1
+        if len(counts) > self.max_keys:
+            self._spill()
+        return self
+
+    def _spill(self):
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="vocab-", dir=self.spill_dir)
+            self._handles = [
+                open(os.path.join(self._directory, f"part-{i}.pkl"), "wb")
+                for i in range(self.partitions)
+            ]
+        shards: list[dict] = [{} for _ in self._handles]
+        for token, count in self.counts.items():
+            shards[hash(token) % self.partitions][token] = count
+        for shard, handle in zip(shards, self._handles):
+            if shard:
+                # Lote de un registro (el dict entero): se suma con Counter.update en C
+                pickle.dump([shard], handle, pickle.HIGHEST_PROTOCOL)
+        self.counts.clear()
+
+    def items(self) -> Iterator[tuple[str, int]]:
+        """Devuelve (token, documentos) de todos los tokens, partición a partición."""
+        if self._directory is None:
+            yield from self.counts.items()
+            return
+        self._spill()
+        for handle in self._handles:
+            handle.close()
+        for handle in self._handles:
+            partition = Counter()
+            for shard in _iter_pickled(handle.name):
+                partition.update(shard)
+            os.remove(handle.name)
+            yield from partition.items()
+
+    def close(self):
+        """Borra los ficheros del volcado."""
+        for handle in self._handles:
+            handle.close()
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+
+def _df_limit(value: float, n_docs: int) -> float:
+    """min_df/max_df: un int es un número de documentos y un float una proporción."""
+    if isinstance(value, float):
+        if not 0 <= value <= 1:
+            raise ValueError("Una proporción de documentos debe estar entre 0 y 1.")
+        return value * n_docs
+    return value
+
+
+def _encode_token(token: str) -> bytes:
+    return token.encode("utf-8", "surrogatepass")
+
+
+def _token_hashes(encoded: list[bytes]) -> np.ndarray:
+    """
+    Hash estable de 64 bits (uint64) de tokens ya codificados.
+
+    Es el mismo valor que _stable_hashes(token)[:8] (el que usa
+    HashingVectorizer), calculado sin pasar por la clave canónica.
+    """
+    digests = b"".join(
+        hashlib.blake2b(b"s" + token, digest_size=16).digest()[:8] for token in encoded
+    )
+    return np.frombuffer(digests, dtype="<u8")
+
+
+class Vocabulary:
+    """
+    Vocabulario token -> id con un índice compacto que se abre con mmap.
+
+    Los tokens (ordenados, id = posición) se guardan como un único bloque
+    de bytes UTF-8 más sus desplazamientos, junto a una tabla hash de
+    direccionamiento abierto (sondeo lineal, ocupación <= 50 %) sobre el
+    mismo hash estable que HashingVectorizer. Buscar un token es O(1):
+    calcular su hash y leer unas pocas casillas de la tabla. save() escribe
+    un directorio de .npy y load() los abre con np.load(mmap_mode="r"), así
+    que arrancar no lee ni interpreta el vocabulario entero.
+
+    EJEMPLO:
+        vocabulary = Vocabulary.fit(tokenize_many(docs), min_df=2, max_df=0.9)
+        vocabulary.save("vocab/")
+        Vocabulary.load("vocab/")["hola"]
+    """
+
+    def __init__(
+        self, tokens: Iterable[str], df: Iterable[int] | None = None, n_docs: int = 0
+    ):
+        tokens = list(tokens)
+        if len(set(tokens)) != len(tokens):
+            raise ValueError("El vocabulario no puede tener tokens repetidos.")
+        encoded = list(map(_encode_token, tokens))
+        offsets = np.zeros(len(tokens) + 1, dtype=np.int64)
+        np.cumsum(
+            np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+            out=offsets[1:],
+        )
+        self.blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        self.offsets = offsets
+        self.hashes = _token_hashes(encoded)
+        self.df = (
+            np.zeros(len(tokens), dtype=np.int64)
+            if df is None
+            else np.asarray(list(df), dtype=np.int64)
+        )
+        self.n_docs = n_docs
+        self.table = self._build_table(self.hashes)
+
+    @staticmethod
+    def _build_table(hashes: np.ndarray) -> np.ndarray:
+        """
+        Tabla de sondeo lineal con los ids (-1 = casilla libre), construida por rondas.
+
+        En cada ronda los tokens pendientes miran su casilla actual: si está
+        libre, uno por casilla se queda en ella y el resto avanza a la
+        siguiente, igual que si se insertaran de uno en uno.
+        """
+        size = 8
+        while size < 2 * len(hashes):
+            size *= 2
+        mask = np.uint64(size - 1)
+        table = np.full(size, -1, dtype=np.int32 if len(hashes) < 2**31 else np.int64)
+        pending = np.arange(len(hashes), dtype=np.int64)
+        slots = (hashes & mask).astype(np.int64)
+        while pending.size:
+            free = table[slots] == -1
+            placed_slots, first = np.unique(slots[free], return_index=True)
+            winners = pending[free][first]
+            table[placed_slots] = winners
+            waiting = np.ones(pending.size, dtype=bool)
+            waiting[np.flatnonzero(free)[first]] = False
+            pending, slots = pending[waiting], (slots[waiting] + 1) & (size - 1)
+        return table
+
+    @classmethod
+    def fit(
+        cls,
+        docs: Iterable,
+        min_df: float = 1,
+        max_df: float = 1.0,
+        max_size: int | None = None,
+        memory_mb: float = 512,
+        spill_dir: str | None = None,
+        partitions: int = 64,
+    ) -> "Vocabulary":
+        """
+        Construye el vocabulario de un corpus en una pasada.
+
+        Los recuentos por documento se vuelcan a disco por particiones si no
+        caben en 'memory_mb', así que el corpus puede ser mayor que la
+        memoria; solo el vocabulario final (tras la poda) tiene que caber.
+
+        Args:
+            docs (Iterable): Documentos tokenizados (tokenize_many o tokenize_text).
+            min_df (float, optional): Documentos mínimos en los que aparece el
+                token (int) o proporción (float). Por defecto 1.
+            max_df (float, optional): Máximo, igual que min_df. Por defecto 1.0.
+            max_size (int | None, optional): Se conservan los tokens más
+                frecuentes (a igualdad, por orden alfabético). Por defecto sin límite.
+            memory_mb (float, optional): Memoria para los recuentos. Por defecto 512.
+            spill_dir (str | None, optional): Directorio para el volcado.
+            partitions (int, optional): Particiones del volcado. Por defecto 64.
+
+        Returns:
+            Vocabulary: Tokens en orden alfabético (id = posición).
+        """
+        counter = _DocumentFrequencies(memory_mb, partitions, spill_dir)
+        try:
+            for chunk in _iter_chunks(docs, _SPILL_BATCH):
+                counter.update(chunk)
+            low, high = _df_limit(min_df, counter.n_docs), _df_limit(
+                max_df, counter.n_docs
+            )
+            kept = (
+                (token, count)
+                for token, count in counter.items()
+                if low <= count <= high
+            )
+            if max_size is not None:
+                kept = heapq.nsmallest(
+                    max_size, kept, key=lambda item: (-item[1], item[0])
+                )
+            kept = sorted(kept)
+        finally:
+            counter.close()
+        return cls(
+            (token for token, _ in kept), (count for _, count in kept), counter.n_docs
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def token(self, index: int) -> str:
+        """Token con el id 'index'."""
+        return bytes(self.blob[self.offsets[index] : self.offsets[index + 1]]).decode(
+            "utf-8", "surrogatepass"
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        blob, offsets = memoryview(self.blob), self.offsets.tolist()
+        return (
+            str(blob[start:end], "utf-8", "surrogatepass")
+            for start, end in zip(offsets, offsets[1:])
+        )
+
+    def get(self, token: str, default: int = -1) -> int:
+        """Id del token, o 'default' si no está en el vocabulario."""
+        if not isinstance(token, str):
+            return default
+        return int(self.get_many([token], default)[0])
+
+    def __getitem__(self, token: str) -> int:
+        index = self.get(token)
+        if index < 0:
+            raise KeyError(token)
+        return index
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) >= 0
+
+    def get_many(self, tokens: list[str], default: int = -1) -> np.ndarray:
+        """
+        Ids de muchos tokens a la vez (int64, 'default' si no están).
+
+        Cada token distinto se hashea una vez y la tabla se sondea para
+        todos a la vez con NumPy; solo se comparan los bytes de los
+        candidatos con el mismo hash.
+        """
+        unique = list(dict.fromkeys(tokens))
+        encoded = list(map(_encode_token, unique))
+        targets = _token_hashes(encoded)
+        blob = memoryview(self.blob)
+        mask = len(self.table) - 1
+        found = np.full(len(unique), default, dtype=np.int64)
+        pending = np.arange(len(unique))
+        slots = (targets & np.uint64(mask)).astype(np.int64)
+        while pending.size:
+            candidates = self.table[slots].astype(np.int64)
+            resolved = candidates < 0
+            hits = np.flatnonzero(~resolved)
+            hits = hits[self.hashes[candidates[hits]] == targets[pending[hits]]]
+            starts, ends = (
+                self.offsets[candidates[hits]].tolist(),
+                self.offsets[candidates[hits] + 1].tolist(),
+            )
+            for position, start, end in zip(hits.tolist(), starts, ends):
+                if blob[start:end] == encoded[pending[position]]:
+                    found[pending[position]] = candidates[position]
+                    resolved[position] = True
+            pending, slots = pending[~resolved], (slots[~resolved] + 1) & mask
+        columns = dict(zip(unique, found.tolist()))
+        return np.fromiter(
+            map(columns.__getitem__, tokens), dtype=np.int64, count=len(tokens)
+        )
+
+    def save(self, directory: str):
+        """Guarda el índice en un directorio de .npy (más un meta.json pequeño)."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ("blob", "offsets", "hashes", "table", "df"):
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(
+            os.path.join(directory, "meta.json"), "w", encoding="utf-8"
+        ) as handle:
+            json.dump(
+                {"kind": "vocabulary", "size": len(self), "n_docs": self.n_docs}, handle
+            )
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "Vocabulary":
+        """
+        Abre un vocabulario guardado con save().
+
+        Args:
+            directory (str): Directorio del índice.
+            mmap (bool, optional): Si es True los arrays se mapean en memoria
+                (solo se leen las páginas que se usan). Por defecto True.
+
+        Returns:
+            Vocabulary: El vocabulario, listo para buscar tokens.
+        """
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        if meta.get("kind") != "vocabulary":
+            raise ValueError(f"'{directory}' no contiene un vocabulario.")
+        vocabulary = cls.__new__(cls)
+        for name in ("blob", "offsets", "hashes", "table", "df"):
+            setattr(
+                vocabulary,
+                name,
+                np.load(
+                    os.path.join(directory, f"{name}.npy"),
+                    mmap_mode="r" if mmap else None,
+                ),
+            )
+        vocabulary.n_docs = meta["n_docs"]
+        return vocabulary
+
+
+#
+# --- 4. FUNCIONES DE ESTRUCTURA (Struct) ---
+#
+
+
+# Contenedores que se aplanan (los str, bytes y dict se tratan como valores)
+_NESTED_TYPES = (list, tuple, range, np.ndarray, Iterator)
+# Tipos que se resuelven sin isinstance (el de Iterator es lento)
+_LIST_TYPES = frozenset({list, tuple})
+_SCALAR_TYPES = frozenset({int, float, str, bool, bytes, dict, type(None)})
+
+
+def _is_nested(item: Any) -> bool:
+    """Indica si un valor es un contenedor a aplanar."""
+    item_type = type(item)
+    if item_type in _LIST_TYPES:
+        return True
+    if item_type in _SCALAR_TYPES:
+        return False
+    return isinstance(item, _NESTED_TYPES) and not (
+        isinstance(item, np.ndarray) and item.ndim == 0
+    )
+
+
+def iter_flatten(data: Iterable, depth: int | None = None) -> Iterator:
+    """
+    Aplana una estructura anidada de forma perezosa.
+
+    Recorre listas, tuplas, arrays, rangos y generadores con una pila de
+    iteradores (sin recursión, así que no hay límite de profundidad) y
+    devuelve los valores según se encuentran, sin copias intermedias.
+
+    Args:
+        data (Iterable): Estructura anidada (también un generador).
+        depth (int | None, optional): Niveles a aplanar; None aplana todos.
+
+    Returns:
+        Iterator: Los valores aplanados, en orden.
+
+    EJEMPLO:
+        list(iter_flatten([1, [2, (3, [4])]], depth=1))  # [1, 2, (3, [4])]
+    """
+    if depth is not None and depth < 0:
+        raise ValueError("La profundidad (depth) no puede ser negativa.")
+    if depth == 0:
+        yield from data
+        return
+    stack = [iter(data)]
+    while stack:
+        # Al último nivel permitido los contenedores se devuelven tal cual
+        if depth is not None and len(stack) > depth:
+            yield from stack.pop()
+            continue
+        for item in stack[-1]:
+            item_type = type(item)
+            if item_type in _LIST_TYPES or (
+                item_type not in _SCALAR_TYPES and _is_nested(item)
+            ):
+                # Los arrays se recorren como listas de escalares de Python
+                stack.append(iter(item.tolist() if item_type is np.ndarray else item))
+                break
+            yield item
+        else:
+            stack.pop()
+
+
+def flatten_list(data: list, depth: int | None = 1) -> list:
+    """
+    Aplana una lista de listas.
+
+    Args:
+        data (list): Una lista de listas (o tuplas, arrays, generadores...).
+        depth (int | None, optional): Niveles a aplanar. Por defecto 1; None
+            aplana todos (ver iter_flatten).
+
+    Returns:
         list: Una lista aplanada.
     """
-    flattened = []
-    for item in data:
-        # Comprueba si el item es una lista
-        if isinstance(item, list):
-            # Si es lista, AÑADE CADA ELEMENTO (extend)
-            flattened.extend(item)
+    if depth is None and isinstance(data, np.ndarray):
+        return data.ravel().tolist()
+    if depth != 1:
+        return list(iter_flatten(data, depth))
+
+    # Un nivel: extend copia cada sublista de golpe
+    flattened = []
+    for item in data:
+        item_type = type(item)
+        if item_type in _LIST_TYPES or (
+            item_type not in _SCALAR_TYPES and _is_nested(item)
+        ):
+            flattened.extend(item.tolist() if item_type is np.ndarray else item)
+        else:
+            flattened.append(item)
+
+    return flattened
+
+
+def _make_rng(seed: int | random.Random | None = None) -> random.Random:
+    """
+    Generador aleatorio propio de cada llamada.
+
+    No toca el estado global del módulo random, así que varias llamadas (o
+    hilos) con la misma semilla dan siempre el mismo resultado. Si se pasa
+    un random.Random se usa tal cual, para encadenar varias operaciones.
+    """
+    return seed if isinstance(seed, random.Random) else random.Random(seed)
+
+
+def shuffle_list(
+    data: list, seed: int | random.Random | None = None, in_place: bool = False
+) -> list:
+    """
+    Mezcla aleatoriamente una lista de valores.
+
+    Args:
+        data (list): Lista de valores (o np.ndarray, que se mezcla con NumPy).
+        seed (int | random.Random | None, optional): Semilla para asegurar
+            reproducibilidad (o un random.Random). Por defecto es None.
+        in_place (bool, optional): Si es True se mezcla la propia lista en
+            lugar de una copia. Por defecto False.
+
+    Returns:
+        list: Lista de valores mezclados.
+    """
+    rng = _make_rng(seed)
+    if isinstance(data, np.ndarray):
+        shuffled = data if in_place else data.copy()
+        np.random.default_rng(rng.getrandbits(64)).shuffle(shuffled)
+        return shuffled
+
+    shuffled = data if in_place else list(data)
+    rng.shuffle(shuffled)
+    return shuffled
+
+
+# Memoria aproximada que ocupa cada valor en el buffer de la mezcla (bytes)
+_BYTES_PER_ITEM = 100
+
+
+def external_shuffle(
+    items: Iterable,
+    buffer_mb: float = 512,
+    seed: int | random.Random | None = None,
+    spill_dir: str | None = None,
+    partitions: int = 64,
+) -> Iterator:
+    """
+    Mezcla un flujo que puede no caber en memoria.
+
+    Si los valores caben en 'buffer_mb' se mezclan en memoria (mismo
+    resultado que shuffle_list con la misma semilla). Si no, cada valor se
+    manda a una de 'partitions' particiones en disco elegida al azar, y
+    después cada partición se mezcla en memoria y se devuelve entera; las
+    que siguen sin caber se vuelven a repartir. El resultado es una
+    permutación uniforme leyendo la entrada una sola vez.
+
+    Args:
+        items (Iterable): Valores de entrada (se recorren una sola vez).
+        buffer_mb (float, optional): Memoria para los valores. Por defecto 512.
+        seed (int | random.Random | None, optional): Semilla. Por defecto None.
+        spill_dir (str | None, optional): Directorio para las particiones.
+            Por defecto, el temporal del sistema.
+        partitions (int, optional): Particiones por reparto. Por defecto 64.
+
+    Returns:
+        Iterator: Los valores mezclados.
+    """
+    if partitions < 2:
+        raise ValueError("La mezcla externa necesita al menos 2 particiones.")
+    rng = _make_rng(seed)
+    max_items = max(1, int(buffer_mb * 2**20 / _BYTES_PER_ITEM))
+    return _shuffle_stream(iter(items), rng, max_items, spill_dir, partitions)
+
+
+def _shuffle_stream(
+    iterator: Iterator,
+    rng: random.Random,
+    max_items: int,
+    spill_dir: str | None,
+    partitions: int,
+) -> Iterator:
+    buffer = list(islice(iterator, max_items + 1))
+    if len(buffer) <= max_items:
+        rng.shuffle(buffer)
+        yield from buffer
+        return
+
+    directory = tempfile.mkdtemp(prefix="shuffle-", dir=spill_dir)
+    try:
+        paths = [os.path.join(directory, f"part-{i}.pkl") for i in range(partitions)]
+        counts = [0] * partitions
+        bucket_rng = np.random.default_rng(rng.getrandbits(64))
+        handles = [open(path, "wb") for path in paths]
+        try:
+            for batch in chain((buffer,), _iter_chunks(iterator, _SPILL_BATCH)):
+                buckets: list[list] = [[] for _ in paths]
+                for item, bucket in zip(
+                    batch, bucket_rng.integers(partitions, size=len(batch)).tolist()
+                ):
+                    buckets[bucket].append(item)
+                for index, bucket_items in enumerate(buckets):
+                    if bucket_items:
+                        pickle.dump(
+                            bucket_items, handles[index], pickle.HIGHEST_PROTOCOL
+                        )
+                        counts[index] += len(bucket_items)
+                batch.clear()  # El primer lote es el buffer: se libera
+        finally:
+            for handle in handles:
+                handle.close()
+
+        for path, count in zip(paths, counts):
+            if count <= max_items:
+                bucket_items = list(_iter_pickled(path))
+                rng.shuffle(bucket_items)
+                yield from bucket_items
+            else:
+                # Partición demasiado grande: se vuelve a repartir
+                yield from _shuffle_stream(
+                    _iter_pickled(path), rng, max_items, directory, partitions
+                )
+            os.remove(path)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Valores que se recorren a la vez al muestrear un iterable
+_SAMPLE_CHUNK = 10_000
+
+
+def _log_uniform(rng: random.Random) -> float:
+    """Logaritmo de un uniforme en (0, 1): nunca es 0 ni -inf."""
+    return math.log(rng.random() or 5e-324)
+
+
+def _as_weights(weights: Any, size: int) -> np.ndarray:
+    """Convierte los pesos de un bloque a float64 y comprueba que son válidos."""
+    array = np.asarray(weights, dtype=np.float64).ravel()
+    if array.size != size:
+        raise ValueError(f"Hay {array.size} pesos para {size} valores.")
+    if not np.all(np.isfinite(array) & (array >= 0)):
+        raise ValueError("Los pesos deben ser números finitos y no negativos.")
+    return array
+
+
+class ReservoirSampler:
+    """
+    Muestra aleatoria de k valores de un flujo, en una pasada y con memoria O(k).
+
+    Sin pesos usa el algoritmo L: una vez lleno el reservorio salta
+    directamente a la siguiente posición que entra en la muestra, así que el
+    coste crece con k·log(n/k) y no con n. Con pesos usa A-ExpJ: cada valor
+    tiene la clave u^(1/peso), se guardan las k mayores y los saltos se
+    miden en peso acumulado (los valores con peso 0 nunca salen). La muestra
+    se devuelve en el orden del flujo.
+
+    EJEMPLO:
+        sampler = ReservoirSampler(100, seed=0)
+        for chunk in chunks:
+            sampler.update(chunk)
+        muestra = sampler.sample()
+    """
+
+    def __init__(
+        self, k: int, seed: int | random.Random | None = None, weighted: bool = False
+    ):
+        if k < 1:
+            raise ValueError("El tamaño de la muestra debe ser al menos 1.")
+        self.k = k
+        self.weighted = weighted
+        self.count = 0  # Valores vistos
+        self._rng = _make_rng(seed)
+        # Sin pesos: lista de (posición, valor). Con pesos: heap de (clave, posición, valor)
+        self._reservoir: list = []
+        self._w = 1.0  # Algoritmo L: máximo de los k uniformes actuales
+        self._next = 0  # Algoritmo L: siguiente posición que entra
+        self._jump = 0.0  # A-ExpJ: peso que queda por saltar
+
+    def update(self, chunk: Any, weights: Any = None) -> "ReservoirSampler":
+        """
+        Añade un bloque de valores (y sus pesos, si el muestreo es ponderado).
+
+        Returns:
+            ReservoirSampler: El propio muestreador, para encadenar llamadas.
+        """
+        if self.weighted:
+            if weights is None:
+                raise ValueError(
+                    "El muestreo ponderado necesita los pesos de cada valor."
+                )
+            self._update_weighted(chunk, _as_weights(weights, len(chunk)))
         else:
-            # Si no es lista, AÑADE EL ITEM (append)
-            flattened.append(item)
+            self._update_uniform(chunk)
+        self.count += len(chunk)
+        return self
 
-    return flattened
+    def _advance(self):
+        """Algoritmo L: actualiza el umbral y calcula el siguiente salto."""
+        self._w *= math.exp(_log_uniform(self._rng) / self.k)
+        self._next += int(_log_uniform(self._rng) / math.log1p(-self._w)) + 1
+
+    def _update_uniform(self, chunk: Any):
+        start = 0
+        if len(self._reservoir) < self.k:
+            start = min(len(chunk), self.k - len(self._reservoir))
+            self._reservoir.extend(
+                zip(range(self.count, self.count + start), chunk[:start])
+            )
+            if len(self._reservoir) < self.k:
+                return
+            self._next = self.count + start - 1
+            self._advance()
+        end = self.count + len(chunk)
+        while self._next < end:
+            self._reservoir[self._rng.randrange(self.k)] = (
+                self._next,
+                chunk[self._next - self.count],
+            )
+            self._advance()
+
+    def _update_weighted(self, chunk: Any, weights: np.ndarray):
+        rng, heap = self._rng, self._reservoir
+        start = 0
+        while len(heap) < self.k and start < len(chunk):
+            if weights[start] > 0:
+                heapq.heappush(
+                    heap,
+                    (
+                        _log_uniform(rng) / weights[start],
+                        self.count + start,
+                        chunk[start],
+                    ),
+                )
+                if len(heap) == self.k:
+                    self._jump = _log_uniform(rng) / heap[0][0]
+            start += 1
+        if len(heap) < self.k or start == len(chunk):
+            return
+
+        # Peso acumulado desde el inicio del bloque: cada salto es una búsqueda binaria
+        cumulative = np.cumsum(weights)
+        base = cumulative[start - 1] if start else 0.0
+        while True:
+            index = int(np.searchsorted(cumulative, base + self._jump))
+            if index >= len(chunk):
+                self._jump -= cumulative[-1] - base
+                return
+            weight = weights[index]
+            threshold = math.exp(weight * heap[0][0])
+            key = math.log(threshold + (1 - threshold) * rng.random()) / weight
+            heapq.heapreplace(heap, (key, self.count + index, chunk[index]))
+            self._jump = _log_uniform(rng) / heap[0][0]
+            base = cumulative[index]
 
+    def positions(self) -> list[int]:
+        """Posiciones en el flujo de los valores de la muestra, en orden."""
+        return sorted(entry[-2] for entry in self._reservoir)
 
-def shuffle_list(data: list, seed: int | None = None) -> list:
+    def sample(self) -> list:
+        """Devuelve la muestra en el orden en que aparecieron los valores."""
+        return [entry[-1] for entry in sorted(self._reservoir, key=itemgetter(-2))]
+
+
+class StratifiedSampler:
     """
-    Mezcla aleatoriamente una lista de valores.
+    Muestra de hasta k valores por estrato, en una pasada.
+
+    Cada estrato tiene su propio ReservoirSampler (todos comparten el mismo
+    generador, así que la muestra depende solo de la semilla y del orden de
+    los datos). La memoria es O(k · estratos).
+    """
+
+    def __init__(
+        self, k: int, seed: int | random.Random | None = None, weighted: bool = False
+    ):
+        if k < 1:
+            raise ValueError("El tamaño de la muestra debe ser al menos 1.")
+        self.k = k
+        self.weighted = weighted
+        self.count = 0
+        self._rng = _make_rng(seed)
+        self.samplers: dict[Any, ReservoirSampler] = {}
+
+    def update(
+        self, chunk: Any, strata: Any, weights: Any = None
+    ) -> "StratifiedSampler":
+        """Añade un bloque de valores con el estrato (y el peso) de cada uno."""
+        if len(strata) != len(chunk):
+            raise ValueError(f"Hay {len(strata)} estratos para {len(chunk)} valores.")
+        if self.weighted:
+            if weights is None:
+                raise ValueError(
+                    "El muestreo ponderado necesita los pesos de cada valor."
+                )
+            weights = _as_weights(weights, len(chunk))
+
+        # Se agrupa el bloque por estrato, guardando la posición global de cada valor
+        groups: dict[Any, list[int]] = {}
+        for index, stratum in enumerate(strata):
+            groups.setdefault(_canonical_key(stratum), []).append(index)
+        for key, indexes in groups.items():
+            sampler = self.samplers.get(key)
+            if sampler is None:
+                sampler = self.samplers[key] = ReservoirSampler(
+                    self.k, self._rng, self.weighted
+                )
+            pairs = [(self.count + index, chunk[index]) for index in indexes]
+            sampler.update(pairs, None if weights is None else weights[indexes])
+        self.count += len(chunk)
+        return self
+
+    def sample(self) -> list:
+        """Devuelve la muestra de todos los estratos en el orden del flujo."""
+        pairs = chain.from_iterable(
+            sampler.sample() for sampler in self.samplers.values()
+        )
+        return [item for _, item in sorted(pairs, key=itemgetter(0))]
+
+
+def bernoulli_sample(
+    items: Iterable, fraction: float, seed: int | random.Random | None = None
+) -> Iterator:
+    """
+    Devuelve cada valor con probabilidad 'fraction', en una pasada y en orden.
+
+    En lugar de sortear cada valor se salta directamente al siguiente
+    elegido (los huecos siguen una distribución geométrica), así que los
+    valores descartados se recorren sin coste en Python.
 
     Args:
-        data (list): Lista de valores.
-        seed (int | None, optional): Semilla para asegurar reproducibilidad.
-                                      Por defecto es None.
+        items (Iterable): Valores de entrada.
+        fraction (float): Proporción esperada de la muestra, entre 0 y 1.
+        seed (int | random.Random | None, optional): Semilla. Por defecto None.
 
     Returns:
-        list: Lista de valores mezclados.
+        Iterator: Los valores elegidos.
+    """
+    if not 0 <= fraction <= 1:
+        raise ValueError("La fracción debe estar entre 0 y 1.")
+    if fraction == 0:
+        return
+    iterator = iter(items)
+    if fraction == 1:
+        yield from iterator
+        return
+    rng = _make_rng(seed)
+    log_keep = math.log1p(-fraction)
+    for item in iterator:
+        skip = int(_log_uniform(rng) / log_keep)
+        if skip:
+            item = next(islice(iterator, skip - 1, None), _NO_VALUE)
+            if item is _NO_VALUE:
+                return
+        yield item
+
+
+def sample_list(
+    data: Iterable,
+    k: int | None = None,
+    fraction: float | None = None,
+    seed: int | random.Random | None = None,
+    weights: Iterable | None = None,
+    strata: Iterable | None = None,
+) -> list:
+    """
+    Toma una muestra aleatoria de una lista (o de cualquier iterable) en una pasada.
+
+    Con 'k' devuelve k valores sin reemplazo (muestreo de reservorio, con
+    memoria O(k)); con 'fraction', cada valor con esa probabilidad. Los
+    pesos hacen que la probabilidad de cada valor sea proporcional a su peso
+    y los estratos toman k valores de cada estrato. El orden de los valores
+    se conserva.
+
+    Args:
+        data (Iterable): Valores de entrada.
+        k (int | None, optional): Tamaño de la muestra (por estrato).
+        fraction (float | None, optional): Proporción de valores (sin pesos ni estratos).
+        seed (int | random.Random | None, optional): Semilla. Por defecto None.
+        weights (Iterable | None, optional): Peso de cada valor (con k).
+        strata (Iterable | None, optional): Estrato de cada valor (con k).
+
+    Returns:
+        list: La muestra (np.ndarray si la entrada lo era).
+    """
+    if (k is None) == (fraction is None):
+        raise ValueError("Indica el tamaño de la muestra o la fracción (solo uno).")
+    if fraction is not None:
+        if weights is not None or strata is not None:
+            raise ValueError("El muestreo por fracción no admite pesos ni estratos.")
+        result = list(bernoulli_sample(data, fraction, seed))
+    else:
+        weighted = weights is not None
+        sampler = (
+            StratifiedSampler(k, seed, weighted)
+            if strata is not None
+            else ReservoirSampler(k, seed, weighted)
+        )
+        value_chunks = _iter_chunks(data, _SAMPLE_CHUNK)
+        weight_chunks = _iter_chunks(weights, _SAMPLE_CHUNK) if weighted else None
+        strata_chunks = (
+            _iter_chunks(strata, _SAMPLE_CHUNK) if strata is not None else None
+        )
+        for chunk in value_chunks:
+            chunk_weights = next(weight_chunks, []) if weighted else None
+            if strata_chunks is None:
+                sampler.update(chunk, chunk_weights)
+            else:
+                sampler.update(chunk, next(strata_chunks, []), chunk_weights)
+        result = sampler.sample()
+
+    if isinstance(data, np.ndarray):
+        return np.asarray(result, dtype=data.dtype)
+    return result
+
+
+#
+# --- 5. PIPELINE (encadenado de pasos) ---
+#
+
+
+def _iter_chunks(items: Iterable, chunk_size: int) -> Iterator[list]:
+    """Agrupa un iterable en listas de como mucho 'chunk_size' elementos."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _parse_scalar(text: str) -> Any:
+    """Convierte un argumento de un paso del pipeline a su tipo Python."""
+    if text.lower() == "none":
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+    return int(value) if value.is_integer() else value
+
+
+def _iter_remove_missing(items: Iterator) -> Iterator:
+    """Descarta los valores faltantes."""
+    return (item for item in items if not is_missing(item))
+
+
+def _iter_fill_missing(items: Iterator, fill_value: Any = 0) -> Iterator:
+    """Sustituye los valores faltantes por fill_value."""
+    return (fill_value if is_missing(item) else item for item in items)
+
+
+def _iter_unique(items: Iterator) -> Iterator:
+    """Descarta los valores ya vistos, conservando el orden."""
+    # El deduplicador se crea en cada recorrido, así cada pasada empieza de cero;
+    # de uno en uno para no adelantar la lectura de los pasos anteriores
+    return StreamingDeduplicator().iter_unique(items, batch_size=1)
+
+
+def _iter_clip(items: Iterator, min_val: float, max_val: float) -> Iterator:
+    """Descarta los no numéricos y recorta el resto a [min_val, max_val]."""
+    if min_val > max_val:
+        raise ValueError(
+            "El valor mínimo (min_val) no puede ser mayor que el valor máximo (max_val)."
+        )
+    for item in items:
+        if isinstance(item, (int, float)):
+            yield min_val if item < min_val else max_val if item > max_val else item
+
+
+def _iter_to_integers(items: Iterator) -> Iterator:
+    """Convierte cada valor a entero, descartando los no convertibles."""
+    for item in items:
+        value = _parse_integer(item)
+        if value is not None:
+            yield value
+
+
+def _iter_log(items: Iterator) -> Iterator:
+    """Aplica el logaritmo natural a los números positivos."""
+    return (
+        math.log(item) for item in items if isinstance(item, (int, float)) and item > 0
+    )
+
+
+def _iter_flatten(items: Iterator, depth: int | None = 1) -> Iterator:
+    """Aplana 'depth' niveles de listas anidadas (None: todos)."""
+    return iter_flatten(items, depth)
+
+
+def _iter_tokenize(items: Iterator) -> Iterator:
+    """Tokeniza cada documento como tokenize_text."""
+    return _DEFAULT_TOKENIZER.tokenize_many(items, join=True)
+
+
+def _iter_remove_punctuation(items: Iterator) -> Iterator:
+    """Aplica select_alphanumeric_spaces a cada documento."""
+    return _DEFAULT_TOKENIZER.strip_punctuation_many(items)
+
+
+def _iter_remove_stops(items: Iterator, *stop_words: str) -> Iterator:
+    """Elimina las stop words de cada documento."""
+    return _cached_stop_word_filter(stop_words).filter_many(items)
+
+
+# Pasos que producen exactamente una salida por cada entrada (sin descartar
+# ni añadir valores): sus resultados se pueden alinear por posición
+_ONE_TO_ONE_STEPS = frozenset(
+    {
+        "clean.fill-missing",
+        "text.tokenize",
+        "text.remove-punctuation",
+        "text.remove-stops",
+    }
+)
+
+
+class PipelineStep:
+    """
+    Paso de un Pipeline.
+
+    Un paso elemento a elemento ('func') transforma un iterador en otro sin
+    materializar los datos, así que varios pasos seguidos se fusionan en un
+    único recorrido. Un paso con 'scaler_class' necesita estadísticas
+    globales: el pipeline ajusta el escalador con los datos que le llegan y
+    después aplica su transform.
+
+    Solo guarda funciones y clases de módulo, así que se puede serializar
+    con pickle (p. ej. para enviarlo a otros procesos).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Iterator] | None = None,
+        args: tuple = (),
+        scaler_class: type[_Scaler] | None = None,
+    ):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.scaler_class = scaler_class
+
+    @property
+    def needs_fit(self) -> bool:
+        """True si el paso necesita estadísticas globales (barrera)."""
+        return self.scaler_class is not None
+
+    @property
+    def one_to_one(self) -> bool:
+        """True si el paso produce exactamente una salida por cada entrada."""
+        return self.name in _ONE_TO_ONE_STEPS
+
+    def apply(self, items: Iterator) -> Iterator:
+        """Aplica un paso elemento a elemento sobre un iterador."""
+        return self.func(items, *self.args)
+
+    def new_scaler(self) -> _Scaler:
+        """Crea el escalador (sin ajustar) de un paso con estadísticas globales."""
+        return self.scaler_class(*self.args)
+
+    def __repr__(self) -> str:
+        return f"PipelineStep({self.name!r}, args={self.args!r})"
+
+
+def _iter_scaled(items: Iterator, scaler: _Scaler, chunk_size: int) -> Iterator:
+    """Aplica un escalador ya ajustado por bloques vectorizados."""
+    for chunk in _iter_chunks(items, chunk_size):
+        yield from scaler.transform(chunk)
+
+
+# Pasos disponibles: nombre -> (función o clase escaladora, (mín, máx) argumentos)
+_PIPELINE_STEPS: dict[str, tuple[Callable[..., Any], tuple[int, float]]] = {
+    "clean.remove-missing": (_iter_remove_missing, (0, 0)),
+    "clean.fill-missing": (_iter_fill_missing, (0, 1)),
+    "clean.unique": (_iter_unique, (0, 0)),
+    "numeric.clip": (_iter_clip, (2, 2)),
+    "numeric.to-integers": (_iter_to_integers, (0, 0)),
+    "numeric.log-transform": (_iter_log, (0, 0)),
+    "numeric.normalize": (MinMaxScaler, (0, 2)),
+    "numeric.standardize": (ZScoreScaler, (0, 0)),
+    "numeric.robust-scale": (RobustScaler, (0, 2)),
+    "numeric.clip-percentile": (PercentileClipper, (0, 2)),
+    "text.tokenize": (_iter_tokenize, (0, 0)),
+    "text.remove-punctuation": (_iter_remove_punctuation, (0, 0)),
+    "text.remove-stops": (_iter_remove_stops, (0, math.inf)),
+    "struct.flatten": (_iter_flatten, (0, 1)),
+}
+
+
+def available_steps() -> list[str]:
+    """Devuelve los nombres de los pasos de pipeline disponibles."""
+    return list(_PIPELINE_STEPS)
+
+
+def make_pipeline_step(name: str, *args: Any) -> PipelineStep:
+    """
+    Crea un paso del pipeline por su nombre ('grupo.comando' de la CLI).
+
+    Args:
+        name (str): Nombre del paso, p. ej. 'numeric.clip'.
+        *args (Any): Argumentos del paso, p. ej. 0 y 100 para el clip.
+
+    Returns:
+        PipelineStep: El paso listo para usarse en un Pipeline.
+
+    Raises:
+        ValueError: Si el paso no existe o el número de argumentos no es válido.
+    """
+    if name not in _PIPELINE_STEPS:
+        raise ValueError(
+            f"Paso de pipeline desconocido: '{name}'. "
+            f"Disponibles: {', '.join(_PIPELINE_STEPS)}"
+        )
+    target, (min_args, max_args) = _PIPELINE_STEPS[name]
+    if not min_args <= len(args) <= max_args:
+        raise ValueError(f"Número de argumentos inválido para '{name}': {list(args)}")
+    if isinstance(target, type) and issubclass(target, _Scaler):
+        return PipelineStep(name, args=args, scaler_class=target)
+    return PipelineStep(name, target, args)
+
+
+class Pipeline:
+    """
+    Encadena pasos de preprocesamiento recorriendo los datos una sola vez.
+
+    Los pasos elemento a elemento consecutivos se fusionan en un solo
+    recorrido (generadores encadenados, sin listas intermedias). Solo los
+    pasos con estadísticas globales (normalize, standardize) obligan a una
+    pasada adicional para ajustar su escalador.
+
+    EJEMPLO:
+        Pipeline.from_spec("clean.remove-missing,numeric.clip:0:100,numeric.normalize")
+    """
+
+    def __init__(self, steps: list[PipelineStep], chunk_size: int = 10_000):
+        self.steps = list(steps)
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def from_spec(cls, spec: str, chunk_size: int = 10_000) -> "Pipeline":
+        """
+        Construye un pipeline desde un texto 'grupo.paso:arg:arg,grupo.paso'.
+
+        Args:
+            spec (str): Pasos separados por comas; argumentos separados por ':'.
+            chunk_size (int, optional): Tamaño de bloque de los pasos vectorizados.
+
+        Returns:
+            Pipeline: El pipeline con los pasos indicados.
+
+        Raises:
+            ValueError: Si un paso no existe o recibe un número de argumentos inválido.
+        """
+        steps = []
+        for part in filter(None, (piece.strip() for piece in spec.split(","))):
+            name, *raw_args = part.split(":")
+            steps.append(make_pipeline_step(name, *map(_parse_scalar, raw_args)))
+        return cls(steps, chunk_size)
+
+    def iter_run(self, data: Iterable) -> Iterator:
+        """
+        Ejecuta el pipeline de forma perezosa sobre un iterable de un solo uso.
+
+        Los datos solo se materializan en los pasos que necesitan
+        estadísticas globales.
+
+        Args:
+            data (Iterable): Valores de entrada.
+
+        Returns:
+            Iterator: Valores de salida.
+        """
+        items = iter(data)
+        for step in self.steps:
+            if step.needs_fit:
+                # Barrera: se materializa para ajustar y se vuelve a recorrer
+                materialized = list(items)
+                scaler = step.new_scaler().fit(materialized)
+                items = _iter_scaled(iter(materialized), scaler, self.chunk_size)
+            else:
+                items = step.apply(items)
+        return items
+
+    def run(self, data: Iterable) -> list:
+        """
+        Ejecuta el pipeline y devuelve el resultado como lista.
+
+        Args:
+            data (Iterable): Valores de entrada.
+
+        Returns:
+            list: Valores de salida.
+        """
+        return list(self.iter_run(data))
+
+    def stream(self, source: Callable[[], Iterable]) -> Iterator:
+        """
+        Ejecuta el pipeline sobre una fuente que se puede leer varias veces.
+
+        En cada paso con estadísticas globales se hace una pasada por la
+        fuente (aplicando los pasos anteriores) para ajustar el escalador
+        bloque a bloque; nunca se materializa la columna completa.
+
+        Args:
+            source (Callable[[], Iterable]): Función que devuelve un iterable
+                nuevo de los datos en cada llamada (p. ej. reabriendo un fichero).
+
+        Returns:
+            Iterator: Valores de salida.
+        """
+        stages: list[Callable[[Iterator], Iterator]] = []
+
+        def run_stages() -> Iterator:
+            items = iter(source())
+            for stage in stages:
+                items = stage(items)
+            return items
+
+        for step in self.steps:
+            if step.needs_fit:
+                scaler = step.new_scaler()
+                for chunk in _iter_chunks(run_stages(), self.chunk_size):
+                    scaler.partial_fit(chunk)
+                stages.append(
+                    partial(_iter_scaled, scaler=scaler, chunk_size=self.chunk_size)
+                )
+            else:
+                stages.append(step.apply)
+        return run_stages()
+
+
+#
+# --- 6. EJECUCIÓN EN PARALELO ---
+#
+
+
+def parallel_imap(
+    func: Callable[[Any], Any], chunks: Iterable, workers: int | None = None
+) -> Iterator:
+    """
+    Aplica 'func' a cada bloque en un pool de procesos, conservando el orden.
+
+    Como mucho hay 2 * workers bloques pendientes a la vez, así que la
+    entrada se puede consumir en streaming sin cargarla entera.
+
+    Args:
+        func (Callable): Función serializable con pickle (de módulo o partial).
+        chunks (Iterable): Bloques de datos.
+        workers (int | None, optional): Número de procesos. Por defecto,
+                                        os.cpu_count(). Con 1 no se crea pool.
+
+    Returns:
+        Iterator: Resultado de 'func' para cada bloque, en el mismo orden.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        yield from map(func, chunks)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _split_chunks(data: Any, chunk_size: int) -> list:
+    """Parte listas, tuplas o arrays en bloques de 'chunk_size' elementos."""
+    if _is_array_like(data):
+        data = np.asarray(data).ravel()
+    elif not isinstance(data, (list, tuple)):
+        return list(_iter_chunks(data, chunk_size))
+    return [
+        data[start : start + chunk_size] for start in range(0, len(data), chunk_size)
+    ]
+
+
+def _concat_chunks(results: Iterable, data: Any) -> Any:
+    """Une los resultados por bloque en un array (entrada array-like) o lista."""
+    if _is_array_like(data):
+        arrays = list(results)
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=np.float64)
+    return [item for result in results for item in result]
+
+
+def _fit_chunk(scaler_class: type[_Scaler], args: tuple, chunk: Any) -> _Scaler:
+    """Ajusta un escalador nuevo con un bloque (fase 1 del reduce)."""
+    return scaler_class(*args).fit(chunk)
+
+
+def _scaler_args(scaler: _Scaler) -> tuple:
+    """Parámetros de construcción de un escalador (sin sus estadísticas)."""
+    if isinstance(scaler, MinMaxScaler):
+        return (scaler.new_min, scaler.new_max)
+    if isinstance(scaler, _QuantileScaler):
+        return (scaler.lower_pct, scaler.upper_pct)
+    if isinstance(scaler, MissingImputer):
+        return (scaler.strategy, scaler.fill_value, scaler.top_k)
+    return ()
+
+
+def parallel_fit(
+    scaler: _Scaler, chunks: Iterable, workers: int | None = None
+) -> _Scaler:
+    """
+    Ajusta un escalador con bloques procesados en paralelo.
+
+    Cada proceso ajusta un escalador nuevo con su bloque y los resultados se
+    combinan con merge() en el proceso principal.
+
+    Args:
+        scaler (_Scaler): Escalador (o MissingImputer) a actualizar.
+        chunks (Iterable): Bloques de datos.
+        workers (int | None, optional): Número de procesos.
+
+    Returns:
+        _Scaler: El propio escalador, con las estadísticas de todos los bloques.
+    """
+    fit_chunk = partial(_fit_chunk, type(scaler), _scaler_args(scaler))
+    for chunk_scaler in parallel_imap(fit_chunk, chunks, workers):
+        scaler.merge(chunk_scaler)
+    return scaler
+
+
+def _parallel_scale(
+    scaler: _Scaler, data: Any, workers: int | None, chunk_size: int
+) -> Any:
+    """Escalado en dos fases: estadísticas por bloque + merge, y transform."""
+    chunks = _split_chunks(data, chunk_size)
+    parallel_fit(scaler, chunks, workers)
+    if not scaler._is_fitted():
+        return _as_output(np.empty(0, dtype=np.float64), data)
+    return _concat_chunks(parallel_imap(scaler.transform, chunks, workers), data)
+
+
+def _parallel_normalize(
+    data: Any,
+    workers: int | None,
+    chunk_size: int,
+    new_min: float = 0.0,
+    new_max: float = 1.0,
+) -> Any:
+    """normalize_min_max en paralelo (mínimo/máximo combinados por bloques)."""
+    return _parallel_scale(MinMaxScaler(new_min, new_max), data, workers, chunk_size)
+
+
+def _parallel_standardize(data: Any, workers: int | None, chunk_size: int) -> Any:
+    """standardize_z_score en paralelo (RunningStats combinados por bloques)."""
+    return _parallel_scale(ZScoreScaler(), data, workers, chunk_size)
+
+
+def _parallel_clip_percentiles(
+    data: Any,
+    workers: int | None,
+    chunk_size: int,
+    lower_pct: float = 1.0,
+    upper_pct: float = 99.0,
+) -> Any:
+    """clip_percentiles en paralelo (TDigest combinados por bloques)."""
+    return _parallel_scale(
+        PercentileClipper(lower_pct, upper_pct), data, workers, chunk_size
+    )
+
+
+def _parallel_robust_scale(
+    data: Any,
+    workers: int | None,
+    chunk_size: int,
+    lower_pct: float = 25.0,
+    upper_pct: float = 75.0,
+) -> Any:
+    """robust_scale en paralelo (TDigest combinados por bloques)."""
+    return _parallel_scale(
+        RobustScaler(lower_pct, upper_pct), data, workers, chunk_size
+    )
+
+
+def merge_unique_chunks(
+    chunk_uniques: Iterable[list], memory_mb: float = 512, spill_dir: str | None = None
+) -> Iterator:
+    """
+    Combina, en orden, los valores únicos calculados por bloques.
+
+    Fase 2 del dedup en paralelo: cada bloque ya viene sin duplicados y aquí
+    se descartan los valores vistos en bloques anteriores.
+
+    Args:
+        chunk_uniques (Iterable[list]): Resultado de remove_duplicated_values
+                                        para cada bloque, en orden.
+        memory_mb (float, optional): Presupuesto de memoria antes de volcar
+                                     a disco (ver StreamingDeduplicator).
+        spill_dir (str | None, optional): Directorio para el volcado.
+
+    Returns:
+        Iterator: Primeras apariciones de cada valor.
+    """
+    items = (item for values in chunk_uniques for item in values)
+    return StreamingDeduplicator(memory_mb, spill_dir=spill_dir).iter_unique(items)
+
+
+def _parallel_unique(
+    data: Any,
+    workers: int | None,
+    chunk_size: int,
+    approximate: bool = False,
+    fp_rate: float = 0.001,
+    capacity: int | None = None,
+) -> list:
+    """remove_duplicated_values en paralelo: únicos por bloque + merge en orden."""
+    chunks = _split_chunks(data, chunk_size)
+    chunk_uniques = parallel_imap(remove_duplicated_values, chunks, workers)
+    if approximate:
+        bloom = BloomFilter(capacity or max(len(data), 1), fp_rate)
+        return [item for values in chunk_uniques for item in bloom.filter_new(values)]
+    return list(merge_unique_chunks(chunk_uniques))
+
+
+def _parallel_fill(
+    data: Any,
+    workers: int | None,
+    chunk_size: int,
+    fill_value: Any = 0,
+    mask: np.ndarray | None = None,
+    strategy: str = "constant",
+) -> Any:
+    """
+    filling_missing_values en paralelo: las estrategias estadísticas se
+    ajustan por bloques y se combinan; las que miran a los vecinos se
+    aplican en serie, en orden.
+    """
+    if mask is not None or strategy in _SEQUENTIAL_STRATEGIES:
+        return filling_missing_values(data, fill_value, mask, strategy)
+    chunks = _split_chunks(data, chunk_size)
+    if strategy in _STAT_STRATEGIES:
+        imputer = parallel_fit(MissingImputer(strategy, fill_value), chunks, workers)
+        fill_value, strategy = imputer.fill_value_, "constant"
+    fill_chunk = partial(
+        filling_missing_values, fill_value=fill_value, strategy=strategy
+    )
+    return _concat_chunks(parallel_imap(fill_chunk, chunks, workers), data)
+
+
+# Funciones con estadísticas globales y su versión en dos fases
+_TWO_PHASE_FUNCTIONS = {
+    normalize_min_max: _parallel_normalize,
+    standardize_z_score: _parallel_standardize,
+    clip_percentiles: _parallel_clip_percentiles,
+    robust_scale: _parallel_robust_scale,
+    remove_duplicated_values: _parallel_unique,
+    filling_missing_values: _parallel_fill,
+}
+
+
+def parallel_map(
+    func: Callable[[list], list],
+    data: Any,
+    workers: int | None = None,
+    chunk_size: int = 100_000,
+) -> Any:
+    """
+    Aplica una función de preprocesamiento por bloques en un pool de procesos.
+
+    Las funciones elemento a elemento se aplican a cada bloque y los
+    resultados se concatenan en orden. normalize_min_max,
+    standardize_z_score, clip_percentiles, robust_scale,
+    remove_duplicated_values y filling_missing_values (también dentro de un
+    functools.partial) se ejecutan en dos fases:
+    estadísticas por bloque, combinación y transformación, de modo que el
+    resultado coincide con la versión en serie (salvo redondeo en la media
+    y la desviación, y la aproximación de la mediana del t-digest).
+
+    Args:
+        func (Callable): Función que recibe y devuelve una lista (o array).
+                         Debe poder serializarse con pickle.
+        data (Any): Lista, tupla o array de entrada.
+        workers (int | None, optional): Número de procesos. Por defecto,
+                                        os.cpu_count().
+        chunk_size (int, optional): Elementos por bloque. Por defecto 100_000.
+
+    Returns:
+        Any: Lista (o np.ndarray si la entrada es array-like) con el resultado.
+    """
+    base, args, kwargs = func, (), {}
+    if isinstance(func, partial):
+        base, args, kwargs = func.func, func.args, func.keywords
+
+    if base in _TWO_PHASE_FUNCTIONS:
+        return _TWO_PHASE_FUNCTIONS[base](data, workers, chunk_size, *args, **kwargs)
+
+    chunks = _split_chunks(data, chunk_size)
+    return _concat_chunks(parallel_imap(func, chunks, workers), data)
+
+
+#
+# --- 7. LECTURA DE VALORES (parsing) ---
+#
+
+
+# Número de valores que se miran para decidir si una columna es numérica
+PARSE_SAMPLE_SIZE = 32
+
+# Tamaño de los bloques que se intentan convertir de una vez en una columna numérica
+PARSE_BLOCK_SIZE = 1024
+
+# Valores especiales (en minúsculas): "none" -> None, "nan" -> nan
+_SPECIAL_TOKENS = {"none": None, "nan": np.nan}
+
+# Primeros caracteres posibles de un número (además de dígitos y espacios)
+_FLOAT_START = frozenset("+-.iInN")
+
+# Los enteros de float64 solo se convierten en bloque dentro de este rango
+_INT64_SAFE = 2.0**63
+
+
+def parse_value(token: str) -> Any:
+    """
+    Convierte un string a su tipo Python: None, nan, "", int, float o str.
+
+    Args:
+        token (str): Valor de entrada.
+
+    Returns:
+        Any: "none" -> None, "nan" -> nan (sin distinguir mayúsculas), "" -> "",
+        los números a int (si son enteros) o float, y el resto sin cambios.
+    """
+    if not token:
+        return token
+    if len(token) in (3, 4):
+        lowered = token.lower()
+        if lowered in _SPECIAL_TOKENS:
+            return _SPECIAL_TOKENS[lowered]
+    # float() solo acepta textos que empiezan así: se evita la excepción con texto
+    first = token[0]
+    if not (first.isdigit() or first in _FLOAT_START or first.isspace()):
+        return token
+    try:
+        value = float(token)
+    except ValueError:
+        return token
+    return int(value) if value.is_integer() else value
+
+
+def _parse_numeric_block(tokens: list) -> list:
+    """Convierte un bloque de números con float() en C; ValueError si hay otro valor."""
+    values = np.fromiter(map(float, tokens), dtype=np.float64, count=len(tokens))
+    is_integer = np.isfinite(values) & (values == np.floor(values))
+    if is_integer.all() and np.abs(values).max(initial=0.0) < _INT64_SAFE:
+        return values.astype(np.int64).tolist()
+
+    result = values.astype(object)
+    if np.abs(values[is_integer]).max(initial=0.0) < _INT64_SAFE:
+        result[is_integer] = values[is_integer].astype(np.int64)
+    else:
+        result[is_integer] = [int(value) for value in values[is_integer]]
+    result[np.isnan(values)] = np.nan  # El mismo objeto nan que parse_value
+    return result.tolist()
+
+
+def parse_values(tokens: Iterable[str]) -> list:
+    """
+    Convierte muchos strings a la vez, con el mismo resultado que parse_value.
+
+    Se mira una muestra para inferir el tipo de la columna. Si es numérica,
+    se convierte por bloques de PARSE_BLOCK_SIZE valores: cada bloque pasa
+    por float() en un bucle de C (np.fromiter) y los enteros se detectan de
+    forma vectorizada. Solo los bloques con algún valor no numérico ("none",
+    "" o texto) y las columnas de texto se convierten valor a valor.
+
+    Args:
+        tokens (Iterable[str]): Valores de entrada.
+
+    Returns:
+        list: Valores convertidos, en el mismo orden.
+    """
+    tokens = tokens if isinstance(tokens, list) else list(tokens)
+    sample = [parse_value(token) for token in tokens[:PARSE_SAMPLE_SIZE]]
+    if len(tokens) <= PARSE_SAMPLE_SIZE or any(
+        isinstance(value, str) for value in sample
+    ):
+        return sample + [parse_value(token) for token in tokens[PARSE_SAMPLE_SIZE:]]
+
+    result = []
+    for start in range(0, len(tokens), PARSE_BLOCK_SIZE):
+        block = tokens[start : start + PARSE_BLOCK_SIZE]
+        try:
+            result.extend(_parse_numeric_block(block))
+        except ValueError:
+            result.extend(parse_value(token) for token in block)
+    return result
+
+
+# Cifras (caracteres) de un texto que se convierte con float() sin cambiar su
+# parte entera: hasta 15 cifras el redondeo de float no llega a cruzar un entero
+_EXACT_FLOAT_DIGITS = 15
+
+# Por debajo de 2^53 los float64 representan exactamente todos los enteros
+_FLOAT_EXACT_INT = 2.0**53
+
+
+def _parse_integer(item: Any) -> int | None:
+    """
+    Convierte un valor a entero exacto, truncando los decimales.
+
+    Los textos cortos se leen con float(), que es exacto en su parte entera;
+    los largos (o por encima de 2^53) se releen con Decimal para no perder
+    precisión.
+
+    Returns:
+        int | None: El entero, o None si el valor no es un número finito.
     """
-    if seed is not None:
-        random.seed(seed)
+    # isinstance con los tipos de NumPy es lento: los str van primero
+    if isinstance(item, str):
+        try:
+            value = float(item)
+        except ValueError:
+            return None
+        if not math.isfinite(value):
+            return None
+        if len(item) > _EXACT_FLOAT_DIGITS or abs(value) >= _FLOAT_EXACT_INT:
+            return int(Decimal(item))
+        return int(value)
+    if isinstance(item, (int, np.integer)):
+        return int(item)
+    if isinstance(item, (float, np.floating)) and math.isfinite(item):
+        return int(item)
+    return None
+
+
+def _parse_integer_block(block: list, as_array: bool) -> Any:
+    """Convierte un bloque en bucles de C; None si algún valor necesita otro camino."""
+    try:
+        if as_array:
+            return np.fromiter(map(int, block), dtype=np.int64, count=len(block))
+        return list(map(int, block))
+    except (ValueError, TypeError, OverflowError):
+        pass
+    # Decimales: float() es exacto en la parte entera si el texto es corto
+    try:
+        if max(map(len, block)) > _EXACT_FLOAT_DIGITS:
+            return None
+        values = np.fromiter(map(float, block), dtype=np.float64, count=len(block))
+    except (ValueError, TypeError):
+        return None
+    if not np.all(np.abs(values) < _FLOAT_EXACT_INT):  # También descarta nan
+        return None
+    values = values.astype(np.int64)  # Trunca hacia cero, como int()
+    return values if as_array else values.tolist()
+
+
+def _parse_integer_array(data: np.ndarray, as_array: bool) -> tuple[Any, list[int]]:
+    """parse_integers para arrays numéricos: sin bucles en Python."""
+    data = data.ravel()
+    if data.dtype.kind == "f":
+        valid = np.isfinite(data)
+        if as_array:
+            valid &= np.abs(data) < _INT64_SAFE
+    elif data.dtype.kind == "u" and as_array:
+        valid = data <= _INT64_MAX
+    else:
+        valid = np.ones(data.shape, dtype=bool)
+
+    accepted = data[valid]
+    if as_array:
+        values = accepted.astype(np.int64)  # Trunca hacia cero, como int()
+    elif accepted.dtype.kind in "iu":
+        values = accepted.tolist()
+    elif np.abs(accepted).max(initial=0) < _INT64_SAFE:
+        values = accepted.astype(np.int64).tolist()
+    else:
+        values = [int(value) for value in accepted.tolist()]
+    return values, np.flatnonzero(~valid).tolist()
+
+
+def parse_integers(data: Iterable, as_array: bool = False) -> tuple[Any, list[int]]:
+    """
+    Convierte muchos valores a enteros exactos e informa de los rechazados.
+
+    Se convierte por bloques de PARSE_BLOCK_SIZE valores: cada bloque pasa
+    por int() (o por float() si solo tiene decimales cortos) en un bucle de C,
+    sin un try por valor. Solo los bloques con algún valor no convertible,
+    o con números que float() no leería de forma exacta, se convierten valor
+    a valor (con Decimal para los textos largos). Los decimales se
+    truncan hacia cero y los valores que no son números finitos se rechazan.
+
+    Args:
+        data (Iterable): Strings o números (lista, iterable o np.ndarray).
+        as_array (bool, optional): Si es True devuelve un np.ndarray int64 y
+            también rechaza los enteros que no caben en él. Por defecto False.
+
+    Returns:
+        tuple[Any, list[int]]: Los enteros convertidos (list de int exactos o
+        np.ndarray int64) y las posiciones de los valores rechazados.
+    """
+    if isinstance(data, np.ndarray) and data.dtype.kind in "biuf":
+        return _parse_integer_array(data, as_array)
+
+    items = data if isinstance(data, (list, tuple, np.ndarray)) else list(data)
+    pieces: list = []
+    rejected: list[int] = []
+    for start in range(0, len(items), PARSE_BLOCK_SIZE):
+        block = items[start : start + PARSE_BLOCK_SIZE]
+        parsed = _parse_integer_block(block, as_array)
+        if parsed is None:
+            parsed = []
+            for position, item in enumerate(block, start):
+                value = _parse_integer(item)
+                if value is None or (
+                    as_array and not _INT64_MIN <= value <= _INT64_MAX
+                ):
+                    rejected.append(position)
+                else:
+                    parsed.append(value)
+            if as_array:
+                parsed = np.array(parsed, dtype=np.int64)
+        pieces.append(parsed)
 
-    shuffled_list = data.copy()
-    random.shuffle(shuffled_list)
-    return shuffled_list
+    if as_array:
+        return (
+            np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int64)
+        ), rejected
+    return list(chain.from_iterable(pieces)), rejected
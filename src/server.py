@@ -0,0 +1,500 @@
+"""
+Servidor de preprocesamiento de larga duración.
+
+Expone los pasos de 'preprocessing.py' como una API JSON sobre HTTP/1.1
+(TCP o socket Unix) construida sobre asyncio, para no pagar el arranque del
+intérprete y de click en cada llamada.
+
+Las peticiones concurrentes a la misma operación (mismo paso y mismos
+argumentos) se agrupan en micro-lotes: si el paso produce exactamente una
+salida por entrada, el lote se concatena en una sola llamada vectorizada y
+el resultado se reparte entre las peticiones.
+
+API:
+    POST /<grupo>/<paso>   {"data": [...], "args": [...]}  -> {"result": [...]}
+    POST /pipeline         {"data": [...], "steps": "..."} -> {"result": [...]}
+    GET  /health                                           -> {"status": "ok"}
+    GET  /endpoints                                        -> {"endpoints": [...]}
+    GET  /stats            latencia y tamaño de lote por endpoint
+"""
+
+# Imports
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from contextlib import suppress
+from functools import lru_cache
+from http import HTTPStatus
+from itertools import chain
+from typing import Any, Callable
+
+import src.preprocessing as pp
+
+# Tamaño máximo del cuerpo de una petición (bytes)
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Número de latencias recientes que se guardan por endpoint para los percentiles
+LATENCY_WINDOW = 2048
+
+# Lotes con más valores se ejecutan en un hilo aparte, sin bloquear el bucle de eventos
+INLINE_BATCH_VALUES = 10_000
+
+# Operaciones que no son pasos de pipeline: nombre -> (función, (mín, máx) argumentos)
+_EXTRA_OPERATIONS: dict[str, tuple[Callable[..., list], tuple[int, int]]] = {
+    "struct.shuffle": (pp.shuffle_list, (0, 1)),
+    "struct.sample": (pp.sample_list, (1, 3)),
+}
+
+
+class ServerError(Exception):
+    """Error de una petición, con el código HTTP que se debe devolver."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LatencyStats:
+    """
+    Estadísticas de latencia de un endpoint.
+
+    Guarda totales acumulados y una ventana de latencias recientes para los
+    percentiles, además del número de lotes ejecutados.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: deque[float] = deque(maxlen=window)
+        self.batches = 0
+        self.batched_requests = 0
+
+    def record(self, seconds: float, ok: bool = True):
+        """Registra la latencia de una petición."""
+        self.count += 1
+        self.errors += not ok
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def record_batch(self, size: int):
+        """Registra un lote ejecutado con 'size' peticiones."""
+        self.batches += 1
+        self.batched_requests += size
+
+    def to_dict(self) -> dict:
+        """Devuelve las estadísticas en milisegundos."""
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": 1000 * self.total / self.count if self.count else 0.0,
+            "p50_ms": 1000 * _percentile(recent, 0.50),
+            "p99_ms": 1000 * _percentile(recent, 0.99),
+            "max_ms": 1000 * self.max,
+            "batches": self.batches,
+            "mean_batch_size": (
+                self.batched_requests / self.batches if self.batches else 0.0
+            ),
+        }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class _Operation:
+    """Operación ya resuelta: sabe ejecutar un lote de peticiones."""
+
+    def __init__(self, func: Callable[[list], list], concatenate: bool = False):
+        self.func = func
+        self.concatenate = concatenate
+
+    def run_batch(self, batch: list[list]) -> list:
+        """
+        Ejecuta un lote y devuelve un resultado (o una excepción) por petición.
+
+        Si la operación es uno a uno, todo el lote se procesa en una sola
+        llamada; si esa llamada falla, se repite petición a petición para
+        que el error solo llegue a la que lo provoca.
+        """
+        if self.concatenate and len(batch) > 1:
+            with suppress(ValueError, TypeError):
+                results = self.func(list(chain.from_iterable(batch)))
+                split, start = [], 0
+                for data in batch:
+                    split.append(results[start : start + len(data)])
+                    start += len(data)
+                return split
+
+        outputs = []
+        for data in batch:
+            try:
+                outputs.append(self.func(data))
+            except (ValueError, TypeError) as error:
+                outputs.append(error)
+        return outputs
+
+
+@lru_cache(maxsize=256)
+def _resolve_operation(endpoint: str, args_key: str) -> _Operation:
+    """
+    Construye (y cachea) la operación de un endpoint con unos argumentos.
+
+    Args:
+        endpoint (str): 'grupo.paso' o 'pipeline'.
+        args_key (str): Argumentos en JSON (o la especificación de pasos).
+
+    Returns:
+        _Operation: La operación lista para ejecutar lotes.
+
+    Raises:
+        ServerError: Si el endpoint no existe (404) o los argumentos no son válidos (400).
+    """
+    try:
+        if endpoint == "pipeline":
+            pipeline = pp.Pipeline.from_spec(args_key)
+            one_to_one = all(step.one_to_one for step in pipeline.steps)
+            return _Operation(pipeline.run, concatenate=one_to_one)
+
+        args = json.loads(args_key)
+        if endpoint in _EXTRA_OPERATIONS:
+            func, (min_args, max_args) = _EXTRA_OPERATIONS[endpoint]
+            if not min_args <= len(args) <= max_args:
+                raise ValueError(
+                    f"Número de argumentos inválido para '{endpoint}': {args}"
+                )
+            return _Operation(lambda data: func(data, *args))
+
+        if endpoint not in pp.available_steps():
+            raise ServerError(
+                HTTPStatus.NOT_FOUND, f"Endpoint desconocido: '{endpoint}'"
+            )
+        step = pp.make_pipeline_step(endpoint, *args)
+        return _Operation(pp.Pipeline([step]).run, concatenate=step.one_to_one)
+    except ValueError as error:
+        raise ServerError(HTTPStatus.BAD_REQUEST, str(error)) from error
+
+
+class PreprocessingServer:
+    """
+    Servidor asyncio que agrupa en micro-lotes las peticiones concurrentes.
+
+    Cada operación (endpoint + argumentos) tiene su cola: la primera petición
+    programa la ejecución del lote tras 'batch_delay' segundos y las que
+    lleguen mientras tanto se suman a él (hasta 'max_batch'). Los lotes
+    pequeños se ejecutan en el propio bucle (sin coste de cambio de hilo);
+    los de más de 'inline_values' valores, en el executor por defecto, para
+    que una petición grande no retrase a las demás ni a /health.
+    """
+
+    def __init__(
+        self,
+        batch_delay: float = 0.0005,
+        max_batch: int = 256,
+        inline_values: int = INLINE_BATCH_VALUES,
+    ):
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.inline_values = inline_values
+        self.stats: dict[str, LatencyStats] = {}
+        self._pending: dict[tuple[str, str], list[tuple[list, asyncio.Future]]] = {}
+        self._running: set[asyncio.Task] = set()
+
+    def _stats(self, endpoint: str) -> LatencyStats:
+        if endpoint not in self.stats:
+            self.stats[endpoint] = LatencyStats()
+        return self.stats[endpoint]
+
+    async def submit(self, endpoint: str, args_key: str, data: list) -> list:
+        """
+        Encola una petición en el lote de su operación y espera su resultado.
+
+        Args:
+            endpoint (str): 'grupo.paso' o 'pipeline'.
+            args_key (str): Argumentos en JSON (o la especificación de pasos).
+            data (list): Valores de la petición.
+
+        Returns:
+            list: Resultado de la operación para 'data'.
+        """
+        _resolve_operation(endpoint, args_key)  # Valida antes de encolar
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (endpoint, args_key)
+        pending = self._pending.setdefault(key, [])
+        pending.append((data, future))
+        if len(pending) >= self.max_batch:
+            self._flush(key)
+        elif len(pending) == 1:
+            if self.batch_delay > 0:
+                loop.call_later(self.batch_delay, self._flush, key)
+            else:
+                loop.call_soon(self._flush, key)
+        return await future
+
+    def _flush(self, key: tuple[str, str]):
+        """Ejecuta el lote pendiente de una operación (en un hilo si es grande)."""
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        operation = _resolve_operation(*key)
+        datas = [data for data, _ in batch]
+        if sum(map(len, datas)) <= self.inline_values:
+            try:
+                results = operation.run_batch(datas)
+            except (
+                Exception
+            ) as error:  # Un fallo inesperado no debe dejar peticiones colgadas
+                results = [
+                    ServerError(
+                        HTTPStatus.INTERNAL_SERVER_ERROR, f"Error interno: {error}"
+                    )
+                ] * len(batch)
+            self._deliver(key, batch, results)
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._run_in_executor(key, batch, operation, datas)
+        )
+        self._running.add(task)  # Referencia fuerte hasta que termine
+        task.add_done_callback(self._running.discard)
+
+    async def _run_in_executor(
+        self,
+        key: tuple[str, str],
+        batch: list,
+        operation: "_Operation",
+        datas: list[list],
+    ):
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, operation.run_batch, datas
+            )
+        except Exception as error:
+            results = [
+                ServerError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Error interno: {error}")
+            ] * len(batch)
+        self._deliver(key, batch, results)
+
+    def _deliver(self, key: tuple[str, str], batch: list, results: list):
+        """Reparte los resultados de un lote entre sus peticiones."""
+        self._stats(key[0]).record_batch(len(batch))
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # El cliente se ha ido
+            if isinstance(result, ServerError):
+                future.set_exception(result)
+            elif isinstance(result, Exception):
+                future.set_exception(ServerError(HTTPStatus.BAD_REQUEST, str(result)))
+            else:
+                future.set_result(result)
+
+    async def handle(self, method: str, path: str, body: bytes) -> tuple[int, dict]:
+        """
+        Atiende una petición ya leída.
+
+        Args:
+            method (str): Método HTTP.
+            path (str): Ruta, p. ej. '/numeric/clip'.
+            body (bytes): Cuerpo JSON.
+
+        Returns:
+            tuple[int, dict]: Código HTTP y respuesta JSON.
+        """
+        endpoint = path.split("?", 1)[0].strip("/").replace("/", ".")
+        if method == "GET":
+            if endpoint == "health":
+                return HTTPStatus.OK, {"status": "ok"}
+            if endpoint == "endpoints":
+                names = [*pp.available_steps(), *_EXTRA_OPERATIONS, "pipeline"]
+                return HTTPStatus.OK, {"endpoints": names}
+            if endpoint == "stats":
+                return HTTPStatus.OK, {
+                    name: s.to_dict() for name, s in self.stats.items()
+                }
+            return HTTPStatus.NOT_FOUND, {
+                "error": f"Endpoint desconocido: '{endpoint}'"
+            }
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {
+                "error": f"Método no permitido: {method}"
+            }
+
+        start = time.perf_counter()
+        try:
+            payload = _parse_payload(body)
+            if endpoint == "pipeline":
+                args_key = payload.get("steps")
+                if not isinstance(args_key, str):
+                    raise ServerError(
+                        HTTPStatus.BAD_REQUEST, "'steps' debe ser un texto"
+                    )
+            else:
+                args = payload.get("args", [])
+                if not isinstance(args, list):
+                    raise ServerError(
+                        HTTPStatus.BAD_REQUEST, "'args' debe ser una lista"
+                    )
+                args_key = json.dumps(args)
+            result = await self.submit(endpoint, args_key, payload["data"])
+        except ServerError as error:
+            if error.status != HTTPStatus.NOT_FOUND:
+                self._stats(endpoint).record(time.perf_counter() - start, ok=False)
+            return error.status, {"error": str(error)}
+
+        self._stats(endpoint).record(time.perf_counter() - start)
+        return HTTPStatus.OK, {"result": result}
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        """Atiende una conexión HTTP/1.1 (con keep-alive) hasta que se cierra."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (
+                    asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError,
+                    ConnectionError,
+                ):
+                    break
+                try:
+                    method, path, version, headers = _parse_head(head)
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"Content-Length negativo: {length}")
+                except ValueError:
+                    writer.write(
+                        _http_response(
+                            HTTPStatus.BAD_REQUEST,
+                            {"error": "Petición mal formada"},
+                            False,
+                        )
+                    )
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(
+                        _http_response(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            {"error": "Cuerpo demasiado grande"},
+                            False,
+                        )
+                    )
+                    break
+                try:
+                    body = await reader.readexactly(length)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                status, payload = await self.handle(method, path, body)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                writer.write(_http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def start(
+        self, host: str = "127.0.0.1", port: int = 8765, unix_socket: str | None = None
+    ) -> asyncio.AbstractServer:
+        """
+        Abre el socket (TCP o Unix) y empieza a aceptar conexiones.
+
+        Args:
+            host (str, optional): Host TCP. Por defecto '127.0.0.1'.
+            port (int, optional): Puerto TCP (0 = uno libre). Por defecto 8765.
+            unix_socket (str | None, optional): Ruta de un socket Unix; si se
+                indica, se usa en lugar de TCP.
+
+        Returns:
+            asyncio.AbstractServer: El servidor ya escuchando.
+        """
+        if unix_socket is not None:
+            return await asyncio.start_unix_server(
+                self.handle_connection, path=unix_socket
+            )
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def serve_forever(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        unix_socket: str | None = None,
+        on_ready: Callable[[str], Any] | None = None,
+    ):
+        """Sirve hasta que se cancela; 'on_ready' recibe la dirección de escucha."""
+        server = await self.start(host, port, unix_socket)
+        if on_ready is not None:
+            if unix_socket is not None:
+                on_ready(f"unix:{unix_socket}")
+            else:
+                bound_host, bound_port = server.sockets[0].getsockname()[:2]
+                on_ready(f"http://{bound_host}:{bound_port}")
+        async with server:
+            await server.serve_forever()
+
+
+def _parse_payload(body: bytes) -> dict:
+    """Decodifica y valida el cuerpo JSON de una petición POST."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError as error:
+        raise ServerError(HTTPStatus.BAD_REQUEST, f"JSON inválido: {error}") from error
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), list):
+        raise ServerError(
+            HTTPStatus.BAD_REQUEST, "El cuerpo debe ser un objeto con una lista 'data'"
+        )
+    return payload
+
+
+def _parse_head(head: bytes) -> tuple[str, str, str, dict[str, str]]:
+    """Separa la línea de petición y las cabeceras (en minúsculas)."""
+    request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+    method, path, version = request_line.split(" ")
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, path, version, headers
+
+
+def _finite_or_null(value: Any) -> Any:
+    """Sustituye NaN e infinitos por None (null), que sí es JSON válido."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, (list, tuple)):
+        return [_finite_or_null(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _finite_or_null(item) for key, item in value.items()}
+    return value
+
+
+def _http_response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    """Serializa una respuesta HTTP/1.1 con cuerpo JSON (NaN/infinitos como null)."""
+    try:
+        body = json.dumps(payload, allow_nan=False).encode("utf-8")
+    except ValueError:
+        # Solo se recorre el resultado si de verdad tiene valores no finitos
+        body = json.dumps(_finite_or_null(payload), allow_nan=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
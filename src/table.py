@@ -0,0 +1,450 @@
+"""
+Preprocesamiento de tablas (CSV / Parquet) columna a columna.
+
+Aplica a cada columna su propia cadena de pasos del pipeline, descrita con
+una especificación como:
+
+    age: fill-missing 0 | clip 0 120 | normalize; comment: tokenize | remove-stops
+
+La tabla se lee por bloques de filas y, dentro de cada bloque, las columnas
+se procesan por separado (en paralelo con workers > 1). Las filas se
+mantienen alineadas: un valor que un paso descarta (p. ej. un texto en
+'clip' o un no positivo en 'log-transform') queda como celda vacía.
+"""
+
+# Imports
+import csv
+import json
+import math
+import re
+from collections import deque
+from typing import Any, Callable, Iterable, Iterator
+
+import numpy as np
+
+import src.preprocessing as pp
+
+# Número de filas que se leen y procesan a la vez
+CHUNK_ROWS = 10_000
+
+# Pasos que no conservan una salida por fila y no tienen sentido en una tabla
+_TABLE_UNSUPPORTED_STEPS = frozenset({"clean.unique", "struct.flatten"})
+
+# Tabla por bloques: nombre de columna -> valores de esas filas
+TableChunk = dict[str, list]
+
+
+def _resolve_step_name(name: str) -> str:
+    """Admite 'grupo.paso' o solo 'paso' (los nombres no se repiten entre grupos)."""
+    available = pp.available_steps()
+    if name in available:
+        return name
+    matches = [step for step in available if step.split(".", 1)[1] == name]
+    if len(matches) != 1:
+        raise ValueError(
+            f"Paso desconocido: '{name}'. Disponibles: {', '.join(available)}"
+        )
+    return matches[0]
+
+
+def parse_table_spec(spec: str) -> dict[str, list[pp.PipelineStep]]:
+    """
+    Convierte una especificación de tabla en los pasos de cada columna.
+
+    Las columnas se separan con ';' o saltos de línea, los pasos con '|' y
+    los argumentos con espacios. Las líneas que empiezan por '#' se ignoran.
+
+    Args:
+        spec (str): P. ej. 'age: fill-missing 0 | clip 0 120 | normalize'.
+
+    Returns:
+        dict[str, list[PipelineStep]]: Pasos por columna, en orden.
+
+    Raises:
+        ValueError: Si la especificación está mal formada o usa pasos desconocidos.
+    """
+    columns = {}
+    for part in re.split(r"[;\n]", spec):
+        part = part.strip()
+        if not part or part.startswith("#"):
+            continue
+        column, separator, steps_text = part.partition(":")
+        if not separator or not column.strip():
+            raise ValueError(
+                f"Especificación de columna inválida: '{part}' (se espera 'columna: pasos')"
+            )
+        steps = []
+        for step_text in filter(
+            None, (piece.strip() for piece in steps_text.split("|"))
+        ):
+            name, *raw_args = step_text.split()
+            steps.append(
+                pp.make_pipeline_step(
+                    _resolve_step_name(name), *map(pp._parse_scalar, raw_args)
+                )
+            )
+        columns.setdefault(column.strip(), []).extend(steps)
+    if not columns:
+        raise ValueError("La especificación de la tabla está vacía.")
+    return columns
+
+
+def _parse_cell(value: Any) -> Any:
+    """Convierte una celda de texto (CSV) en número, None o el propio texto."""
+    if not isinstance(value, str):
+        return value
+    if value == "" or value.lower() == "none":
+        return None
+    return pp._parse_scalar(value)
+
+
+def _present_positions(values: list) -> list[int]:
+    """Posiciones de los valores que no son faltantes."""
+    return np.flatnonzero(~pp.missing_mask(values)).tolist()
+
+
+def _apply_aligned(step: pp.PipelineStep, values: list) -> list:
+    """
+    Aplica un paso elemento a elemento manteniendo una salida por fila.
+
+    Las celdas faltantes solo las ve 'fill-missing'; los valores que el paso
+    descarta pasan a ser None.
+    """
+    if step.name == "clean.fill-missing":
+        return list(step.apply(iter(values)))
+
+    positions = _present_positions(values)
+    output = [None] * len(values)
+    if step.one_to_one:
+        results = step.apply(values[i] for i in positions)
+        for i, result in zip(positions, results):
+            output[i] = result
+    else:
+        for i in positions:
+            output[i] = next(step.apply(iter((values[i],))), None)
+    return output
+
+
+def _scale_aligned(scaler: pp._Scaler, values: list) -> list:
+    """Escala los valores numéricos de una columna; el resto pasa a None."""
+    positions = [
+        i
+        for i, value in enumerate(values)
+        if isinstance(value, (int, float)) and not pp.is_missing(value)
+    ]
+    output = [None] * len(values)
+    if not positions:
+        return output
+    for i, result in zip(positions, scaler.transform([values[i] for i in positions])):
+        output[i] = result
+    return output
+
+
+class ColumnPlan:
+    """
+    Pasos de una columna y los escaladores ya ajustados de sus barreras.
+
+    Se serializa con pickle para procesar bloques de la columna en otros
+    procesos.
+    """
+
+    def __init__(self, column: str, steps: list[pp.PipelineStep]):
+        unsupported = [
+            step.name for step in steps if step.name in _TABLE_UNSUPPORTED_STEPS
+        ]
+        if unsupported:
+            raise ValueError(
+                f"Pasos no disponibles en tablas (no conservan las filas): {', '.join(unsupported)}"
+            )
+        self.column = column
+        self.steps = list(steps)
+        # Las columnas de texto se dejan como texto ("007" no pasa a 7)
+        self.parse = not any(step.name.startswith("text.") for step in self.steps)
+        self.scalers: list[pp._Scaler] = []
+
+    @property
+    def n_barriers(self) -> int:
+        """Número de pasos con estadísticas globales."""
+        return sum(step.needs_fit for step in self.steps)
+
+    def run(self, values: list) -> tuple[list, pp.PipelineStep | None]:
+        """
+        Aplica los pasos hasta la primera barrera sin escalador ajustado.
+
+        Args:
+            values (list): Valores de la columna en un bloque de filas.
+
+        Returns:
+            tuple[list, PipelineStep | None]: Los valores procesados y la
+            barrera en la que se ha parado (None si se han aplicado todos).
+        """
+        if self.parse:
+            values = [_parse_cell(value) for value in values]
+        fitted = iter(self.scalers)
+        for step in self.steps:
+            if step.needs_fit:
+                scaler = next(fitted, None)
+                if scaler is None:
+                    return values, step
+                values = _scale_aligned(scaler, values)
+            else:
+                values = _apply_aligned(step, values)
+        return values, None
+
+
+def _transform_column_chunk(task: tuple[ColumnPlan, list]) -> list:
+    """Procesa un bloque de una columna (todos sus escaladores ya ajustados)."""
+    plan, values = task
+    return plan.run(values)[0]
+
+
+def _fit_column_chunk(task: tuple[ColumnPlan, list]) -> pp._Scaler:
+    """Ajusta la siguiente barrera de una columna con un bloque (fase 1 del reduce)."""
+    plan, values = task
+    values, step = plan.run(values)
+    return step.new_scaler().fit([values[i] for i in _present_positions(values)])
+
+
+class TablePipeline:
+    """
+    Aplica una cadena de pasos distinta a cada columna de una tabla.
+
+    EJEMPLO:
+        TablePipeline.from_spec("age: fill-missing 0 | clip 0 120 | normalize")
+    """
+
+    def __init__(self, columns: dict[str, list[pp.PipelineStep]]):
+        self.plans = [ColumnPlan(column, steps) for column, steps in columns.items()]
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "TablePipeline":
+        """Construye el pipeline desde una especificación (ver parse_table_spec)."""
+        return cls(parse_table_spec(spec))
+
+    def _check_columns(self, chunk: TableChunk):
+        missing = [plan.column for plan in self.plans if plan.column not in chunk]
+        if missing:
+            raise ValueError(
+                f"Columnas no encontradas en la tabla: {', '.join(missing)}"
+            )
+
+    def fit(
+        self, source: Callable[[], Iterable[TableChunk]], workers: int = 1
+    ) -> "TablePipeline":
+        """
+        Ajusta los escaladores de todas las columnas.
+
+        Hace una pasada por la fuente por cada nivel de barrera (no por cada
+        columna): en la pasada k se ajusta la k-ésima barrera de todas las
+        columnas que la tienen, bloque a bloque y fusionando los resultados.
+
+        Args:
+            source (Callable[[], Iterable[TableChunk]]): Devuelve los bloques
+                de la tabla en cada llamada (p. ej. reabriendo el fichero).
+            workers (int, optional): Procesos para las columnas. Por defecto 1.
+
+        Returns:
+            TablePipeline: El propio pipeline, para encadenar llamadas.
+        """
+        for plan in self.plans:
+            plan.scalers = []
+        for depth in range(max((plan.n_barriers for plan in self.plans), default=0)):
+            pending = [plan for plan in self.plans if plan.n_barriers > depth]
+            fitted: list[pp._Scaler | None] = [None] * len(pending)
+
+            def tasks() -> Iterator[tuple[ColumnPlan, list]]:
+                for chunk in source():
+                    self._check_columns(chunk)
+                    for plan in pending:
+                        yield plan, chunk[plan.column]
+
+            results = pp.parallel_imap(_fit_column_chunk, tasks(), workers)
+            for index, scaler in enumerate(results):
+                slot = index % len(pending)
+                fitted[slot] = (
+                    scaler if fitted[slot] is None else fitted[slot].merge(scaler)
+                )
+            for plan, scaler in zip(pending, fitted):
+                plan.scalers.append(
+                    scaler if scaler is not None else _empty_scaler(plan, depth)
+                )
+        return self
+
+    def transform(
+        self, chunks: Iterable[TableChunk], workers: int = 1
+    ) -> Iterator[TableChunk]:
+        """
+        Procesa la tabla bloque a bloque (requiere haber llamado a fit si hay barreras).
+
+        Args:
+            chunks (Iterable[TableChunk]): Bloques de la tabla.
+            workers (int, optional): Procesos para las columnas. Por defecto 1.
+
+        Returns:
+            Iterator[TableChunk]: Bloques con las columnas de la especificación
+            procesadas y el resto sin cambios.
+        """
+        originals: deque[TableChunk] = deque()
+
+        def tasks() -> Iterator[tuple[ColumnPlan, list]]:
+            for chunk in chunks:
+                self._check_columns(chunk)
+                originals.append(chunk)
+                for plan in self.plans:
+                    yield plan, chunk[plan.column]
+
+        results = pp.parallel_imap(_transform_column_chunk, tasks(), workers)
+        for index, values in enumerate(results):
+            slot = index % len(self.plans)
+            if slot == 0:
+                current = dict(originals.popleft())
+            current[self.plans[slot].column] = values
+            if slot == len(self.plans) - 1:
+                yield current
+
+    def run(
+        self, source: Callable[[], Iterable[TableChunk]], workers: int = 1
+    ) -> Iterator[TableChunk]:
+        """Ajusta (si hace falta) y procesa una fuente que se puede leer varias veces."""
+        if any(plan.n_barriers for plan in self.plans):
+            self.fit(source, workers)
+        return self.transform(source(), workers)
+
+    def apply(self, table: TableChunk) -> TableChunk:
+        """
+        Procesa una tabla en memoria (dict columna -> lista de valores).
+
+        Args:
+            table (TableChunk): La tabla completa.
+
+        Returns:
+            TableChunk: La tabla procesada.
+        """
+        return next(self.run(lambda: [table]), {column: [] for column in table})
+
+
+def _empty_scaler(plan: ColumnPlan, depth: int) -> pp._Scaler:
+    """Escalador ajustado sin datos (tabla vacía)."""
+    step = [step for step in plan.steps if step.needs_fit][depth]
+    return step.new_scaler().fit([])
+
+
+#
+# Lectura y escritura (CSV / Parquet)
+#
+
+
+def table_format(path: str) -> str:
+    """Deduce el formato ('csv' o 'parquet') por la extensión del fichero."""
+    return "parquet" if path.lower().endswith((".parquet", ".pq")) else "csv"
+
+
+def _require_pyarrow():
+    """Importa pyarrow (dependencia opcional, solo para Parquet)."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as error:
+        raise ImportError(
+            "Leer o escribir Parquet requiere pyarrow (pip install pyarrow)."
+        ) from error
+    return pyarrow
+
+
+def read_table_chunks(
+    path: str, chunk_rows: int = CHUNK_ROWS, fmt: str | None = None
+) -> Iterator[TableChunk]:
+    """
+    Lee una tabla por bloques de filas.
+
+    Args:
+        path (str): Fichero CSV (con cabecera) o Parquet.
+        chunk_rows (int, optional): Filas por bloque. Por defecto CHUNK_ROWS.
+        fmt (str | None, optional): 'csv' o 'parquet'. Por defecto, según la extensión.
+
+    Returns:
+        Iterator[TableChunk]: Bloques columna -> valores. En CSV los valores
+        son texto; en Parquet, los tipos del fichero.
+    """
+    if (fmt or table_format(path)) == "parquet":
+        pyarrow = _require_pyarrow()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(
+            batch_size=chunk_rows
+        ):
+            yield batch.to_pydict()
+        return
+
+    with open(path, newline="", encoding="utf-8") as handle:
+        reader = csv.reader(handle)
+        header = next(reader, None)
+        if header is None:
+            return
+        for rows in pp._iter_chunks(reader, chunk_rows):
+            # Las filas cortas se completan con celdas vacías
+            columns = zip(*(row + [""] * (len(header) - len(row)) for row in rows))
+            yield {name: list(values) for name, values in zip(header, columns)}
+
+
+def _format_cell(value: Any) -> str:
+    """Convierte un valor procesado en una celda CSV (faltantes -> vacía)."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def write_table(
+    chunks: Iterable[TableChunk], handle_or_path: Any, fmt: str | None = None
+) -> int:
+    """
+    Escribe los bloques de una tabla de forma incremental.
+
+    Args:
+        chunks (Iterable[TableChunk]): Bloques columna -> valores.
+        handle_or_path (Any): Ruta de salida o fichero de texto ya abierto (solo CSV).
+        fmt (str | None, optional): 'csv' o 'parquet'. Por defecto, según la extensión.
+
+    Returns:
+        int: Número de filas escritas.
+    """
+    is_path = isinstance(handle_or_path, str)
+    fmt = fmt or (table_format(handle_or_path) if is_path else "csv")
+    rows = 0
+    if fmt == "parquet":
+        pyarrow = _require_pyarrow()
+        writer = None
+        try:
+            for chunk in chunks:
+                batch = pyarrow.Table.from_pydict(chunk)
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(handle_or_path, batch.schema)
+                writer.write_table(batch.cast(writer.schema))
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return rows
+
+    handle = (
+        open(handle_or_path, "w", newline="", encoding="utf-8")
+        if is_path
+        else handle_or_path
+    )
+    try:
+        writer = csv.writer(handle)
+        header = None
+        for chunk in chunks:
+            if header is None:
+                header = list(chunk)
+                writer.writerow(header)
+            columns = [
+                [_format_cell(value) for value in chunk[name]] for name in header
+            ]
+            for row in zip(*columns):
+                writer.writerow(row)
+                rows += 1
+    finally:
+        if is_path:
+            handle.close()
+    return rows
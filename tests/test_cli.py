@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from click.testing import CliRunner
 from src.cli import cli # Importamos el grupo principal 'cli' de tu archivo
@@ -141,6 +143,36 @@ def test_numeric_to_integers(runner):
     assert result.exit_code == 0
     assert "Resultado: [10, 20, 30]\n" in result.output
 
+
+def test_numeric_to_integers_report(runner, tmp_path):
+    """Prueba: cli numeric to-integers --input ... --output .npy --report (rechazados)"""
+    import numpy as np
+
+    input_file = tmp_path / "ids.txt"
+    input_file.write_text("10\n12345678901234567891\nx\n2.9\n\n", encoding="utf-8")
+    output_file = tmp_path / "ids.npy"
+    report_file = tmp_path / "rechazados.csv"
+    args = [
+        "numeric",
+        "to-integers",
+        "--input",
+        str(input_file),
+        "--output",
+        str(output_file),
+        "--report",
+        str(report_file),
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert np.load(output_file).tolist() == [10, 2]
+    assert report_file.read_text(encoding="utf-8").splitlines() == [
+        "position,value",
+        "1,12345678901234567891",
+        "2,x",
+        "4,",
+    ]
+
+
 def test_numeric_log_transform(runner):
     """
     Prueba el comando: 'cli numeric log-transform ...'
@@ -187,22 +219,129 @@ def test_text_remove_punctuation(runner):
     # Basado en la lógica anterior, 'í' y '!' se eliminan
     assert "Resultado: Test con smbolos S\n" in result.output
 
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["--method", "count"], "Resultado: {'hola': 2, 'mundo': 1}\n"),
+        (["--method", "count", "--binary"], "Resultado: {'hola': 1, 'mundo': 1}\n"),
+    ],
+)
+def test_text_vectorize(runner, args, expected):
+    """Prueba: cli text vectorize "..." --method count"""
+    result = runner.invoke(cli, ["text", "vectorize", "Hola mundo, hola", *args])
+    assert result.exit_code == 0
+    assert expected in result.output
+
+
+def test_text_vectorize_to_npz(runner, tmp_path):
+    """Prueba: cli text vectorize --input docs.txt --output X.npz --method count --vocabulary-output"""
+    import numpy as np
+
+    input_file = tmp_path / "docs.txt"
+    input_file.write_text("Hola mundo, hola\n\nel perro y el gato\n", encoding="utf-8")
+    output_file = tmp_path / "X.npz"
+    vocabulary_file = tmp_path / "vocab.txt"
+    args = [
+        "text",
+        "vectorize",
+        "--input",
+        str(input_file),
+        "--output",
+        str(output_file),
+        "--method",
+        "count",
+        "--vocabulary-output",
+        str(vocabulary_file),
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert vocabulary_file.read_text(encoding="utf-8").split() == [
+        "hola",
+        "mundo",
+        "el",
+        "perro",
+        "y",
+        "gato",
+    ]
+    with np.load(output_file) as archive:
+        assert archive["shape"].tolist() == [3, 6]
+        assert archive["indptr"].tolist() == [0, 2, 2, 6]
+        assert archive["data"].tolist() == [2, 1, 2, 1, 1, 1]
+
+
+def test_text_vocabulary_and_vectorize(runner, tmp_path):
+    """Prueba: cli text vocabulary --input docs.txt --vocabulary vocab/ --min-df 2, y vectorize --vocabulary"""
+    input_file = tmp_path / "docs.txt"
+    input_file.write_text(
+        "hola mundo\nhola amigo\nadios mundo cruel\nhola\n", encoding="utf-8"
+    )
+    vocabulary_dir = tmp_path / "vocab"
+    args = [
+        "text",
+        "vocabulary",
+        "--input",
+        str(input_file),
+        "--vocabulary",
+        str(vocabulary_dir),
+        "--min-df",
+        "2",
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert "Vocabulario: 2 tokens de 4 documentos" in result.output
+    result = runner.invoke(
+        cli,
+        [
+            "text",
+            "vectorize",
+            "hola adios mundo",
+            "--method",
+            "count",
+            "--vocabulary",
+            str(vocabulary_dir),
+        ],
+    )
+    assert result.exit_code == 0
+    assert "Resultado: {'hola': 1, 'mundo': 1}" in result.output
+
+
 # --- Tests para 'struct' (Completos) ---
 
-def test_struct_flatten(runner):
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["1", "2", "3", "4"], "Resultado: [1, 2, 3, 4]\n"),
+        (["[1, [2, 3]]", "4", "None"], "Resultado: [1, [2, 3], 4, None]\n"),
+        (["[1, [2, 3]]", "4", "--depth", "2"], "Resultado: [1, 2, 3, 4]\n"),
+        (
+            ["[1, [2, [3, [4]]]]", '"texto"', "--full"],
+            "Resultado: [1, 2, 3, 4, 'texto']\n",
+        ),
+    ],
+)
+def test_struct_flatten(runner, args, expected):
     """
     Prueba: cli struct flatten ...
-    (Prueba el comportamiento de simulación del CLI)
+    (Cada argumento se lee como JSON: listas anidadas reales)
     """
-    # ... struct flatten 1 2 3 4
-    args = ['struct', 'flatten', '1', '2', '3', '4']
-    result = runner.invoke(cli, args)
-    
+    result = runner.invoke(cli, ["struct", "flatten", *args])
+
     assert result.exit_code == 0
-    # Prueba la salida de simulación de tu CLI
-    assert "(Entrada simulada: [[1, 2], [3, 4]])\n" in result.output
-    # Prueba el resultado final
-    assert "Resultado: [1, 2, 3, 4]\n" in result.output
+    assert expected in result.output
+
+
+def test_struct_flatten_streaming(runner):
+    """Prueba: cli struct flatten --input - --full (una estructura JSON por línea)"""
+    result = runner.invoke(
+        cli,
+        ["struct", "flatten", "--input", "-", "--full"],
+        input="[1, [2, [3]]]\n4\n[[5], []]\n",
+    )
+    assert result.exit_code == 0
+    assert result.output.split() == ["1", "2", "3", "4", "5"]
+
 
 def test_struct_shuffle_with_seed(runner):
     """Prueba: cli struct shuffle ... --seed ..."""
@@ -215,4 +354,858 @@ def test_struct_shuffle_with_seed(runner):
     result = runner.invoke(cli, args)
     assert result.exit_code == 0
     # La seed 42 siempre dará este orden para [1, 2, 3, 4, 5]
-    assert "Resultado: [4, 2, 3, 5, 1]\n" in result.output
\ No newline at end of file
+    assert "Resultado: [4, 2, 3, 5, 1]\n" in result.output
+
+
+def test_struct_shuffle_streaming_spills_to_disk(runner, tmp_path):
+    """Prueba: cli struct shuffle --input - --buffer-mb (mezcla en disco)"""
+    values = [str(i) for i in range(20_000)]
+    args = [
+        "struct",
+        "shuffle",
+        "--input",
+        "-",
+        "--seed",
+        "1",
+        "--buffer-mb",
+        "0.01",
+        "--spill-dir",
+        str(tmp_path),
+    ]
+    result = runner.invoke(cli, args, input="\n".join(values) + "\n")
+    assert result.exit_code == 0
+    output = result.output.split()
+    assert output != values and sorted(output) == sorted(values)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_struct_shuffle_streaming_keeps_lines_verbatim(runner):
+    """Prueba: cli struct shuffle --input - (los números no canónicos no se reescriben)"""
+    lines = ["007", "1.50", "1e3", "None", "texto"]
+    result = runner.invoke(
+        cli,
+        ["struct", "shuffle", "--input", "-", "--seed", "3"],
+        input="\n".join(lines) + "\n",
+    )
+    assert result.exit_code == 0
+    assert sorted(result.output.splitlines()) == sorted(lines)
+
+
+@pytest.mark.parametrize(
+    "extra, expected",
+    [
+        (["--k", "2"], 2),
+        (["--k", "1", "--stratify-column", "pais"], 3),
+        (["--k", "5", "--weight-column", "peso"], 4),
+    ],
+)
+def test_struct_sample_csv(runner, tmp_path, extra, expected):
+    """Prueba: cli struct sample --input ventas.csv --format csv --k ... (pesos y estratos)"""
+    input_file = tmp_path / "ventas.csv"
+    input_file.write_text(
+        "id,peso,pais\n1,1,es\n2,0,es\n3,5,fr\n4,2,fr\n5,1,it\n", encoding="utf-8"
+    )
+    args = [
+        "struct",
+        "sample",
+        "--input",
+        str(input_file),
+        "--format",
+        "csv",
+        "--seed",
+        "0",
+        *extra,
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    output = [int(value) for value in result.output.split()]
+    assert len(output) == expected and output == sorted(output)
+    if "--weight-column" in extra:
+        assert 2 not in output  # Peso 0: nunca sale
+
+
+@pytest.mark.parametrize("extra", [["--fraction", "1"], ["--k", "10"]])
+def test_struct_sample_streaming_keeps_lines_verbatim(runner, extra):
+    """Prueba: cli struct sample --input - (los valores se escriben tal cual se leen)"""
+    lines = ["007", "1.50", "1e3"]
+    result = runner.invoke(
+        cli,
+        ["struct", "sample", "--input", "-", "--seed", "0", *extra],
+        input="\n".join(lines) + "\n",
+    )
+    assert result.exit_code == 0
+    assert result.output.splitlines() == lines
+
+
+@pytest.mark.parametrize(
+    "input_format, content, extra",
+    [
+        ("csv", "id,peso,pais\n007,1,es\n", ["--weight-column", "zz"]),
+        (
+            "csv",
+            "id,peso,pais\n007,1,es\n",
+            ["--column", "zz", "--stratify-column", "pais"],
+        ),
+        (
+            "jsonl",
+            '{"id": 7, "pais": "es"}\n',
+            ["--column", "id", "--stratify-column", "zz"],
+        ),
+    ],
+)
+def test_struct_sample_unknown_column(runner, tmp_path, input_format, content, extra):
+    """Prueba: cli struct sample --weight-column/--column/--stratify-column con una columna que no existe"""
+    input_file = tmp_path / f"ventas.{input_format}"
+    input_file.write_text(content, encoding="utf-8")
+    args = [
+        "struct",
+        "sample",
+        "--input",
+        str(input_file),
+        "--format",
+        input_format,
+        "--k",
+        "2",
+        *extra,
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 2
+    assert "zz" in result.output
+
+
+def test_struct_sample_csv_keeps_values_verbatim(runner, tmp_path):
+    """Prueba: cli struct sample --format csv --stratify-column (los ids no se reescriben)"""
+    input_file = tmp_path / "ventas.csv"
+    input_file.write_text("id,pais\n007,es\n1.50,fr\n", encoding="utf-8")
+    args = [
+        "struct",
+        "sample",
+        "--input",
+        str(input_file),
+        "--format",
+        "csv",
+        "--k",
+        "1",
+        "--stratify-column",
+        "pais",
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert result.output.splitlines() == ["007", "1.50"]
+
+
+def test_struct_sample_requires_size(runner):
+    """Prueba: cli struct sample sin --k ni --fraction da error de uso"""
+    result = runner.invoke(cli, ["struct", "sample", "1", "2", "3"])
+    assert result.exit_code != 0
+    assert "--k o --fraction" in result.output
+
+
+# --- Tests del modo streaming (--input / --output) ---
+
+
+def test_clean_remove_missing_from_input_file(runner, tmp_path):
+    """Prueba: cli clean remove-missing --input fichero --output fichero"""
+    input_file = tmp_path / "datos.txt"
+    input_file.write_text("10\nNone\n20.5\n\nnan\ntext\n", encoding="utf-8")
+    output_file = tmp_path / "salida.txt"
+
+    args = [
+        "clean",
+        "remove-missing",
+        "--input",
+        str(input_file),
+        "--output",
+        str(output_file),
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert output_file.read_text(encoding="utf-8") == "10\n20.5\ntext\n"
+
+
+def test_numeric_standardize_from_stdin(runner):
+    """Prueba: cli numeric standardize --input - (lectura desde stdin)"""
+    result = runner.invoke(
+        cli, ["numeric", "standardize", "--input", "-"], input="10\n20\n30\n"
+    )
+    assert result.exit_code == 0
+    values = [float(line) for line in result.output.split()]
+    assert values == pytest.approx([-1.224744871391589, 0.0, 1.224744871391589])
+
+
+def test_numeric_normalize_from_csv_column(runner, tmp_path):
+    """Prueba: cli numeric normalize --input datos.csv --format csv --column edad"""
+    input_file = tmp_path / "datos.csv"
+    input_file.write_text("nombre,edad\nana,10\nluis,20\neva,30\n", encoding="utf-8")
+    args = [
+        "numeric",
+        "normalize",
+        "--input",
+        str(input_file),
+        "--format",
+        "csv",
+        "--column",
+        "edad",
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert result.output == "0.0\n0.5\n1.0\n"
+
+
+def test_csv_unknown_column_is_usage_error(runner, tmp_path):
+    """Prueba: cli numeric normalize --format csv --column zz (columna inexistente)"""
+    input_file = tmp_path / "datos.csv"
+    input_file.write_text("nombre,edad\nana,10\n", encoding="utf-8")
+    args = [
+        "numeric",
+        "normalize",
+        "--input",
+        str(input_file),
+        "--format",
+        "csv",
+        "--column",
+        "zz",
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 2
+    assert "'zz'" in result.output and "nombre, edad" in result.output
+
+
+def test_empty_csv_produces_no_output(runner, tmp_path):
+    """Prueba: cli clean remove-missing --input vacio.csv --format csv (sin cabecera)"""
+    input_file = tmp_path / "vacio.csv"
+    input_file.write_text("", encoding="utf-8")
+    result = runner.invoke(
+        cli, ["clean", "remove-missing", "--input", str(input_file), "--format", "csv"]
+    )
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+def test_text_tokenize_from_jsonl(runner, tmp_path):
+    """Prueba: cli text tokenize --input docs.jsonl --format jsonl --column texto"""
+    input_file = tmp_path / "docs.jsonl"
+    input_file.write_text(
+        '{"texto": "Hola, mundo!"}\n{"texto": "Otra PRUEBA."}\n', encoding="utf-8"
+    )
+    args = [
+        "text",
+        "tokenize",
+        "--input",
+        str(input_file),
+        "--format",
+        "jsonl",
+        "--column",
+        "texto",
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert result.output == '"hola mundo"\n"otra prueba"\n'
+
+
+def test_command_without_data_fails(runner):
+    """Sin argumentos ni --input el comando debe fallar con un error de uso."""
+    result = runner.invoke(cli, ["clean", "unique"])
+    assert result.exit_code != 0
+    assert "--input" in result.output
+
+
+def test_numeric_fit_and_apply(runner, tmp_path):
+    """Prueba: cli numeric fit ... --stats-file y cli numeric apply ... --stats-file"""
+    stats_file = tmp_path / "stats.json"
+    result = runner.invoke(
+        cli, ["numeric", "fit", "10", "20", "30", "--stats-file", str(stats_file)]
+    )
+    assert result.exit_code == 0
+    assert stats_file.exists()
+
+    # Los nuevos valores se escalan con el mínimo y máximo del ajuste
+    result = runner.invoke(
+        cli, ["numeric", "apply", "15", "40", "--stats-file", str(stats_file)]
+    )
+    assert result.exit_code == 0
+    assert "Resultado: [0.25, 1.5]\n" in result.output
+
+
+@pytest.mark.parametrize(
+    "args, scaler",
+    [
+        (["--method", "robust"], ("RobustScaler",)),
+        (
+            ["--method", "percentile-clip", "--lower-pct", "0", "--upper-pct", "100"],
+            ("PercentileClipper", 0, 100),
+        ),
+    ],
+)
+def test_numeric_fit_quantile_scalers(runner, tmp_path, args, scaler):
+    """Prueba: cli numeric fit --method robust|percentile-clip y cli numeric apply"""
+    import src.preprocessing as pp
+
+    name, *percentiles = scaler
+    expected = f"Resultado: {getattr(pp, name)(*percentiles).fit([1, 2, 3, 4, 5, 1000]).transform([3, 2000])}"
+    stats_file = tmp_path / "stats.json"
+    result = runner.invoke(
+        cli,
+        [
+            "numeric",
+            "fit",
+            "1",
+            "2",
+            "3",
+            "4",
+            "5",
+            "1000",
+            "--stats-file",
+            str(stats_file),
+            *args,
+        ],
+    )
+    assert result.exit_code == 0
+    result = runner.invoke(
+        cli, ["numeric", "apply", "3", "2000", "--stats-file", str(stats_file)]
+    )
+    assert result.exit_code == 0
+    assert expected in result.output
+
+
+def test_numeric_stats_save_and_merge(runner, tmp_path):
+    """Prueba: cli numeric stats --save ... y cli numeric stats --merge ..."""
+    part_1, part_2 = tmp_path / "p1.json", tmp_path / "p2.json"
+    assert (
+        runner.invoke(
+            cli, ["numeric", "stats", "10", "20", "--save", str(part_1)]
+        ).exit_code
+        == 0
+    )
+    assert (
+        runner.invoke(cli, ["numeric", "stats", "30", "--save", str(part_2)]).exit_code
+        == 0
+    )
+
+    result = runner.invoke(
+        cli, ["numeric", "stats", "--merge", str(part_1), "--merge", str(part_2)]
+    )
+    assert result.exit_code == 0
+    assert "'count': 3, 'mean': 20.0" in result.output
+    assert "'min': 10.0, 'max': 30.0" in result.output
+
+
+def test_pipeline_command(runner, tmp_path):
+    """Prueba: cli pipeline --steps ... (argumentos y --input)"""
+    steps = (
+        "clean.remove-missing,numeric.to-integers,numeric.clip:0:100,numeric.normalize"
+    )
+    result = runner.invoke(
+        cli, ["pipeline", "0", "None", "250", "50", "--steps", steps]
+    )
+    assert result.exit_code == 0
+    assert "Resultado: [0.0, 1.0, 0.5]\n" in result.output
+
+    input_file = tmp_path / "datos.txt"
+    input_file.write_text("0\nNone\n250\n50\n", encoding="utf-8")
+    result = runner.invoke(
+        cli, ["pipeline", "--steps", steps, "--input", str(input_file)]
+    )
+    assert result.exit_code == 0
+    assert result.output == "0.0\n1.0\n0.5\n"
+
+
+def test_pipeline_command_invalid_step(runner):
+    """Un paso desconocido debe dar un error de parámetro."""
+    result = runner.invoke(cli, ["pipeline", "1", "--steps", "clean.nope"])
+    assert result.exit_code != 0
+    assert "clean.nope" in result.output
+
+
+@pytest.mark.parametrize(
+    "strategy, expected",
+    [
+        ("mean", ["1", "2.0", "3", "2.0", "2.0"]),
+        ("median", ["1", "2.0", "3", "2.0", "2.0"]),
+        ("ffill", ["1", "1", "3", "3", "3"]),
+        ("interpolate", ["1", "2.0", "3", "3", "3"]),
+    ],
+)
+def test_clean_fill_missing_strategy_streaming(runner, strategy, expected):
+    """Prueba: cli clean fill-missing --input - --strategy ..."""
+    result = runner.invoke(
+        cli,
+        ["clean", "fill-missing", "--input", "-", "--strategy", strategy],
+        input="1\nNone\n3\nnan\n\n",
+    )
+    assert result.exit_code == 0
+    assert result.output.split() == expected
+
+
+def test_clean_fill_missing_strategy_args(runner):
+    """Prueba: cli clean fill-missing 10 None 30 --strategy interpolate"""
+    result = runner.invoke(
+        cli, ["clean", "fill-missing", "10", "None", "30", "--strategy", "interpolate"]
+    )
+    assert result.exit_code == 0
+    assert "Resultado: [10, 20.0, 30]" in result.output
+
+
+def test_numeric_clip_percentiles(runner):
+    """Prueba: cli numeric clip ... --lower-pct 10 --upper-pct 90 (también en streaming)"""
+    values = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "1000"]
+    result = runner.invoke(
+        cli, ["numeric", "clip", *values, "--lower-pct", "10", "--upper-pct", "90"]
+    )
+    assert result.exit_code == 0
+    assert (
+        result.output.startswith("Resultado: [1.9, 2.0,") and "108.09" in result.output
+    )
+    result = runner.invoke(
+        cli,
+        ["numeric", "clip", "--input", "-", "--upper-pct", "90"],
+        input="\n".join(values) + "\n",
+    )
+    assert result.exit_code == 0
+    assert [float(value) for value in result.output.split()] == pytest.approx(
+        [1, 2, 3, 4, 5, 6, 7, 8, 9, 108.1]
+    )
+
+
+def test_numeric_robust_scale(runner):
+    """Prueba: cli numeric robust-scale --input - --workers 2"""
+    result = runner.invoke(
+        cli,
+        ["numeric", "robust-scale", "--input", "-", "--workers", "2"],
+        input="1\n2\n3\n4\n5\n1000\n",
+    )
+    assert result.exit_code == 0
+    assert [float(value) for value in result.output.split()] == pytest.approx(
+        [-1.0, -0.6, -0.2, 0.2, 0.6, 398.6]
+    )
+
+
+def test_clean_missing_mask(runner, tmp_path):
+    """Prueba: cli clean missing-mask ... y --output mascara.npy (array de bool)"""
+    import numpy as np
+
+    result = runner.invoke(
+        cli, ["clean", "missing-mask", "10", "None", "", "nan", "text"]
+    )
+    assert result.exit_code == 0
+    assert "Resultado: [False, True, True, True, False]" in result.output
+    output_file = tmp_path / "mascara.npy"
+    result = runner.invoke(
+        cli,
+        ["clean", "missing-mask", "--input", "-", "--output", str(output_file)],
+        input="1\nNone\n3\n",
+    )
+    assert result.exit_code == 0
+    mask = np.load(output_file)
+    assert mask.dtype == bool and mask.tolist() == [False, True, False]
+
+
+def test_clean_unique_with_workers(runner, tmp_path):
+    """Prueba: cli clean unique --input ... --workers 2"""
+    input_file = tmp_path / "ids.txt"
+    input_file.write_text(
+        "\n".join(str(i % 7) for i in range(50)) + "\n", encoding="utf-8"
+    )
+    result = runner.invoke(
+        cli, ["clean", "unique", "--input", str(input_file), "--workers", "2"]
+    )
+    assert result.exit_code == 0
+    assert result.output.split() == ["0", "1", "2", "3", "4", "5", "6"]
+
+
+def test_clean_unique_spills_to_disk(runner, tmp_path):
+    """Prueba: cli clean unique --input ... --memory-mb (volcado a disco, mismo orden)"""
+    input_file = tmp_path / "ids.txt"
+    values = [str(i * 37 % 20_000) for i in range(40_000)]
+    input_file.write_text("\n".join(values) + "\n", encoding="utf-8")
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    args = [
+        "clean",
+        "unique",
+        "--input",
+        str(input_file),
+        "--memory-mb",
+        "0.01",
+        "--spill-dir",
+        str(spill_dir),
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert result.output.split() == list(dict.fromkeys(values))
+    assert list(spill_dir.iterdir()) == []
+
+
+def test_clean_unique_approximate_state_file(runner, tmp_path):
+    """Prueba: cli clean unique --approximate --state-file (el estado se conserva entre ejecuciones)"""
+    state_file = str(tmp_path / "vistos.npz")
+    args = [
+        "clean",
+        "unique",
+        "--input",
+        "-",
+        "--approximate",
+        "--capacity",
+        "1000",
+        "--state-file",
+        state_file,
+    ]
+    first = runner.invoke(cli, args, input="1\n2\n1\n3\n")
+    assert first.exit_code == 0
+    assert first.output.split() == ["1", "2", "3"]
+    second = runner.invoke(cli, args, input="3\n4\n2\n5\n")
+    assert second.exit_code == 0
+    assert second.output.split() == ["4", "5"]
+
+
+def test_text_tokenize_as_list(runner):
+    """Prueba: cli text tokenize --input - --as-list (una lista JSON por documento)"""
+    result = runner.invoke(
+        cli,
+        ["text", "tokenize", "--input", "-", "--as-list"],
+        input="Hola, mundo!\nOtra prueba.\n",
+    )
+    assert result.exit_code == 0
+    assert result.output == '["hola", "mundo"]\n["otra", "prueba"]\n'
+
+
+def test_text_remove_stops_with_file(runner, tmp_path):
+    """Prueba: cli text remove-stops ... --stop-words-file stops.txt"""
+    stops_file = tmp_path / "stops.txt"
+    stops_file.write_text("de\npor lo tanto\n", encoding="utf-8")
+    args = [
+        "text",
+        "remove-stops",
+        "Por lo tanto es un texto de prueba",
+        "--stop-words-file",
+        str(stops_file),
+        "--stop-word",
+        "un",
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert "Resultado: es texto prueba\n" in result.output
+
+
+def test_bench_save_and_compare(runner, tmp_path):
+    """Prueba: cli bench --max-size 100 --case ... --save y --compare"""
+    baseline = tmp_path / "baseline.json"
+    args = [
+        "bench",
+        "--max-size",
+        "100",
+        "--case",
+        "normalize_min_max",
+        "--case",
+        "cli numeric clip",
+        "--repeat",
+        "1",
+    ]
+    result = runner.invoke(cli, args + ["--save", str(baseline)])
+    assert result.exit_code == 0
+    assert "normalize_min_max" in result.output
+    assert "cli numeric clip" in result.output
+
+    data = json.loads(baseline.read_text(encoding="utf-8"))
+    assert {r["size"] for r in data["results"]} == {10, 100}
+
+    # Con una baseline más lenta no hay regresiones
+    for record in data["results"]:
+        record["seconds"] = 10.0
+    baseline.write_text(json.dumps(data), encoding="utf-8")
+    result = runner.invoke(cli, args + ["--compare", str(baseline)])
+    assert result.exit_code == 0
+    assert "Sin regresiones" in result.output
+
+
+def test_bench_compare_flags_regressions():
+    """suite.compare marca los casos más lentos que la baseline + umbral."""
+    from benchmarks import suite
+
+    old = [{"case": "f", "mix": "numeric", "size": 10, "seconds": 1.0}]
+    assert suite.compare(old, [dict(old[0], seconds=1.1)]) == []
+    regressions = suite.compare(old, [dict(old[0], seconds=2.0)])
+    assert regressions[0]["ratio"] == pytest.approx(2.0)
+
+
+def test_cli_import_does_not_load_numpy():
+    """Importar 'src.cli' (p. ej. para '--help') no debe cargar NumPy."""
+    from benchmarks import startup
+
+    assert startup.loaded_heavy_modules("src.cli") == []
+
+
+def test_bench_startup_budget(runner):
+    """Prueba: cli bench --startup respeta (o no) el presupuesto dado."""
+    result = runner.invoke(
+        cli, ["bench", "--startup", "--repeat", "1", "--budget", "10"]
+    )
+    assert result.exit_code == 0
+    assert "Arranque dentro del presupuesto" in result.output
+
+    result = runner.invoke(
+        cli, ["bench", "--startup", "--repeat", "1", "--budget", "0"]
+    )
+    assert result.exit_code == 1
+    assert "supera el presupuesto" in result.output
+
+
+#  Tests para el servidor ('serve')
+
+
+async def _http_request(port, method, path, payload=None):
+    """Cliente HTTP mínimo para los tests del servidor."""
+    import asyncio
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+        + body
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, content = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(content)
+
+
+def test_server_http_endpoints():
+    """El servidor responde a POST /grupo/paso, /pipeline y GET /stats sobre TCP."""
+    import asyncio
+    from src.server import PreprocessingServer
+
+    async def scenario():
+        server = await PreprocessingServer().start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            clip = await _http_request(
+                port, "POST", "/numeric/clip", {"data": [5, -10, 250], "args": [0, 100]}
+            )
+            chain = await _http_request(
+                port,
+                "POST",
+                "/pipeline",
+                {
+                    "data": [0, None, 250, 50],
+                    "steps": "clean.remove-missing,numeric.clip:0:100,numeric.normalize",
+                },
+            )
+            missing = await _http_request(
+                port, "POST", "/numeric/unknown", {"data": []}
+            )
+            stats = await _http_request(port, "GET", "/stats")
+        return clip, chain, missing, stats
+
+    clip, chain, missing, stats = asyncio.run(scenario())
+    assert clip == (200, {"result": [5, 0, 100]})
+    assert chain == (200, {"result": [0.0, 1.0, 0.5]})
+    assert missing[0] == 404
+    assert stats[1]["numeric.clip"]["count"] == 1
+
+
+def test_server_batches_concurrent_requests():
+    """Las peticiones concurrentes a la misma operación se ejecutan en un solo lote."""
+    import asyncio
+    from src.server import PreprocessingServer
+
+    server = PreprocessingServer(batch_delay=0.01)
+
+    async def scenario():
+        bodies = [
+            json.dumps({"data": docs}).encode()
+            for docs in (["Hola, mundo"], ["a b", "c!"], [])
+        ]
+        bad = server.handle(
+            "POST", "/numeric/clip", json.dumps({"data": [1], "args": [5, 0]}).encode()
+        )
+        return await asyncio.gather(
+            *(server.handle("POST", "/text/tokenize", body) for body in bodies), bad
+        )
+
+    *tokenized, bad = asyncio.run(scenario())
+    assert [response for _, response in tokenized] == [
+        {"result": ["hola mundo"]},
+        {"result": ["a b", "c"]},
+        {"result": []},
+    ]
+    assert bad[0] == 400
+    stats = server.stats["text.tokenize"].to_dict()
+    assert stats["batches"] == 1 and stats["mean_batch_size"] == 3
+
+
+def test_server_rejects_negative_content_length():
+    """Un Content-Length negativo es una petición mal formada (400), no un error interno."""
+    import asyncio
+    from src.server import PreprocessingServer
+
+    async def scenario():
+        server = await PreprocessingServer().start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /numeric/clip HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+        return response
+
+    head, _, content = asyncio.run(scenario()).partition(b"\r\n\r\n")
+    assert int(head.split()[1]) == 400 and "error" in json.loads(content)
+
+
+@pytest.mark.filterwarnings(
+    "ignore::RuntimeWarning"
+)  # La media de 1e308 + 1e308 desborda
+def test_server_non_finite_results_are_null():
+    """NaN e infinitos se envían como null: la respuesta es JSON estricto."""
+    import asyncio
+    from src.server import PreprocessingServer
+
+    async def scenario():
+        server = await PreprocessingServer().start(port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await _http_request(
+                port, "POST", "/numeric/standardize", {"data": [1e308, 1e308]}
+            )
+
+    status, response = asyncio.run(scenario())
+    assert status == 200 and response == {"result": [None, None]}
+
+
+def test_server_large_batches_run_in_executor():
+    """Los lotes por encima de inline_values se ejecutan fuera del bucle con el mismo resultado."""
+    import asyncio
+    from src.server import PreprocessingServer
+
+    server = PreprocessingServer(batch_delay=0.01, inline_values=2)
+
+    async def scenario():
+        bodies = [
+            json.dumps({"data": data, "args": [0, 10]}).encode()
+            for data in ([5, 20], [-1], [])
+        ]
+        health = asyncio.ensure_future(server.handle("GET", "/health", b""))
+        return (
+            await asyncio.gather(
+                *(server.handle("POST", "/numeric/clip", body) for body in bodies)
+            ),
+            await health,
+        )
+
+    responses, health = asyncio.run(scenario())
+    assert [response for _, response in responses] == [
+        {"result": [5, 10]},
+        {"result": [0]},
+        {"result": []},
+    ]
+    assert health == (200, {"status": "ok"})
+    assert server.stats["numeric.clip"].to_dict()["batches"] == 1
+
+
+#  Tests para el comando 'table'
+
+
+def test_table_csv(runner, tmp_path):
+    """Prueba: cli table datos.csv --spec ... --output salida.csv"""
+    source = tmp_path / "datos.csv"
+    source.write_text(
+        'id,age,comment\n1,30,"Hola, mundo"\n2,,Es un test\n3,200,\n', encoding="utf-8"
+    )
+    output = tmp_path / "salida.csv"
+    args = [
+        "table",
+        str(source),
+        "--spec",
+        "age: fill-missing 0 | clip 0 120 | normalize",
+        "--spec",
+        "comment: tokenize",
+        "--chunk-rows",
+        "2",
+        "--output",
+        str(output),
+    ]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert output.read_text(encoding="utf-8").splitlines() == [
+        "id,age,comment",
+        "1,0.25,hola mundo",
+        "2,0.0,es un test",
+        "3,1.0,",
+    ]
+
+
+def test_table_unknown_column(runner, tmp_path):
+    """Prueba: cli table con una columna que no existe en el CSV"""
+    source = tmp_path / "datos.csv"
+    source.write_text("id\n1\n", encoding="utf-8")
+    result = runner.invoke(cli, ["table", str(source), "--spec", "age: clip 0 1"])
+    assert result.exit_code != 0
+    assert "age" in result.output
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        (["numeric", "normalize"], [0.0, 0.25, 0.5, 0.75, 1.0]),
+        (
+            ["numeric", "clip", "--min-val", "1", "--max-val", "3"],
+            [1.0, 1.0, 2.0, 3.0, 3.0],
+        ),
+        (
+            ["numeric", "log-transform"],
+            [0.0, 0.6931471805599453, 1.0986122886681098, 1.3862943611198906],
+        ),
+    ],
+)
+def test_numeric_npy_input_output(runner, tmp_path, args, expected):
+    """Prueba: cli numeric ... --input datos.npz --column y --output salida.npy"""
+    import numpy as np
+
+    source, output = tmp_path / "datos.npz", tmp_path / "salida.npy"
+    np.savez(source, x=np.zeros(3), y=np.arange(5, dtype=float))
+    result = runner.invoke(
+        cli, args + ["--input", str(source), "--column", "y", "--output", str(output)]
+    )
+    assert result.exit_code == 0
+    assert np.load(output).tolist() == pytest.approx(expected)
+
+
+def test_npy_output_promotes_later_float_chunks(runner, tmp_path):
+    """Prueba: cli clean remove-missing --output o.npy con enteros y, en otro bloque, decimales"""
+    import numpy as np
+
+    source, output = tmp_path / "ints.txt", tmp_path / "o.npy"
+    source.write_text(
+        "\n".join(map(str, range(10_000))) + "\n1.5\n2.75\n", encoding="utf-8"
+    )
+    result = runner.invoke(
+        cli,
+        ["clean", "remove-missing", "--input", str(source), "--output", str(output)],
+    )
+    assert result.exit_code == 0
+    loaded = np.load(output)
+    assert loaded.dtype == np.float64 and loaded[-2:].tolist() == [1.5, 2.75]
+
+
+def test_npz_output_is_rejected(runner, tmp_path):
+    """Prueba: cli numeric clip --output salida.npz (solo se admite .npy)"""
+    source = tmp_path / "datos.txt"
+    source.write_text("1\n2\n", encoding="utf-8")
+    result = runner.invoke(
+        cli,
+        [
+            "numeric",
+            "clip",
+            "--min-val",
+            "0",
+            "--max-val",
+            "1",
+            "--input",
+            str(source),
+            "--output",
+            str(tmp_path / "salida.npz"),
+        ],
+    )
+    assert result.exit_code != 0
+    assert ".npy" in result.output
+    assert not (tmp_path / "salida.npz").exists()
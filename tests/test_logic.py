@@ -1,5 +1,8 @@
 # tests/test_logic.py
 import pytest
+from collections import Counter
+from functools import partial
+import numpy as np
 from numpy import nan # Importamos nan para los casos de prueba
 from src.preprocessing import * # Importamos todas las funciones que vamos a probar
 # Usamos @pytest.mark.parametrize para probar múltiples casos
@@ -74,10 +77,159 @@ def test_filling_missing_values(input_list, fill_value, expected_output):
     """
     # Llama a la función que se está probando con los dos argumentos
     result = filling_missing_values(input_list, fill_value)
-    
+
     # Comprueba que el resultado es el esperado
     assert result == expected_output, f"Falló para la entrada {input_list} con fill_value={fill_value}"
 
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ([10, None, 20.5, "", "text", nan, " ", 0, False], [0, 1, 0, 1, 0, 1, 0, 0, 0]),
+        (np.array([1.0, nan, 3.0]), [0, 1, 0]),
+        (np.array(["a", "", "b"]), [0, 1, 0]),
+        (np.array([1, 2, 3]), [0, 0, 0]),
+        (np.array([1, None, "x"], dtype=object), [0, 1, 0]),
+        ([], []),
+    ],
+)
+def test_missing_mask(data, expected):
+    """La máscara marca None, "" y nan, con listas y con arrays de cualquier dtype."""
+    mask = missing_mask(data)
+    assert mask.dtype == bool
+    assert mask.tolist() == [bool(flag) for flag in expected]
+
+
+def test_missing_functions_reuse_mask():
+    """remove/fill aceptan una máscara ya calculada y conservan arrays como arrays."""
+    data = [1, None, 3, nan]
+    mask = missing_mask(data)
+    assert remove_missing_values(data, mask=mask) == [1, 3]
+    assert filling_missing_values(data, -1, mask=mask) == [1, -1, 3, -1]
+    values = np.array([1.0, nan, 3.0])
+    assert remove_missing_values(values).tolist() == [1.0, 3.0]
+    assert filling_missing_values(values, 0).tolist() == [1.0, 0.0, 3.0]
+    assert filling_missing_values(values, "NA").tolist() == [1.0, "NA", 3.0]
+
+
+@pytest.mark.parametrize("strategy", ["constant", "mean", "ffill"])
+def test_missing_functions_accept_generators(strategy):
+    """Como en la versión con bucles, cualquier iterable vale (también un generador)."""
+    assert remove_missing_values(x for x in [1, None, 2]) == [1, 2]
+    assert missing_mask(x for x in ["", 3]).tolist() == [True, False]
+    assert filling_missing_values((x for x in [1, None, 3]), 0, strategy=strategy)[
+        0::2
+    ] == [1, 3]
+
+
+@pytest.mark.parametrize(
+    "strategy, expected",
+    [
+        ("mean", [1, 14 / 3, 3, 14 / 3, 10, 14 / 3]),
+        ("median", [1, 3.0, 3, 3.0, 10, 3.0]),
+        ("mode", [1, 1, 3, 1, 10, 1]),
+        ("ffill", [1, 1, 3, 3, 10, 10]),
+        ("bfill", [1, 3, 3, 10, 10, -1]),
+        ("interpolate", [1, 2.0, 3, 6.5, 10, 10]),
+    ],
+)
+def test_filling_missing_values_strategies(strategy, expected):
+    """Cada estrategia rellena con su estadística o con los vecinos (fill_value si no hay)."""
+    data = [1, None, 3, "", 10, nan]
+    assert filling_missing_values(data, -1, strategy=strategy) == pytest.approx(
+        expected
+    )
+
+
+@pytest.mark.parametrize("strategy", ["ffill", "bfill", "interpolate"])
+def test_gap_filler_does_not_depend_on_chunks(strategy):
+    """Los huecos que cruzan bloques se rellenan igual que con la columna entera."""
+    data = [None, 2.0, None, None, None, 6.0, None, 8.0, None, None]
+    filler = GapFiller(strategy, fill_value=0)
+    chunks = [data[i : i + 3] for i in range(0, len(data), 3)]
+    streamed = [value for filled in filler.iter_fill(chunks) for value in filled]
+    assert streamed == filling_missing_values(data, 0, strategy=strategy)
+
+
+@pytest.mark.parametrize("strategy", ["mean", "median", "mode"])
+def test_missing_imputer_merge_matches_fit(strategy):
+    """Ajustar por bloques y combinar con merge() da el mismo relleno que un solo fit."""
+    data = [x % 13 for x in range(60)] + [None, 4, 4]
+    whole = MissingImputer(strategy).fit(data)
+    merged = (
+        MissingImputer(strategy)
+        .fit(data[:25])
+        .merge(MissingImputer(strategy).fit(data[25:]))
+    )
+    assert merged.fill_value_ == pytest.approx(whole.fill_value_)
+    assert parallel_map(
+        partial(filling_missing_values, strategy=strategy),
+        data,
+        workers=2,
+        chunk_size=16,
+    )[60] == pytest.approx(whole.fill_value_)
+
+
+def test_tdigest_quantiles():
+    """El t-digest es exacto con pocos valores y aproximado (con memoria acotada) con muchos."""
+    assert TDigest().update([3, 1, 2, None, nan, 4]).quantile(0.5) == 2.5
+    values = np.random.default_rng(0).normal(size=200_000)
+    digest = TDigest()
+    for chunk in np.array_split(values, 7):
+        digest.update(chunk)
+    assert len(digest.means) <= 200
+    assert digest.quantile(np.array([0.01, 0.5, 0.99])) == pytest.approx(
+        np.quantile(values, [0.01, 0.5, 0.99]), abs=0.02
+    )
+
+
+@pytest.mark.parametrize(
+    "func, args", [(clip_percentiles, (10, 90)), (robust_scale, (25, 75))]
+)
+def test_quantile_functions_match_numpy(func, args):
+    """Con pocos valores los percentiles son los de np.percentile (interpolación lineal)."""
+    data = [1, 2, 3, 4, 5, 6, 7, 8, 9, 1000]
+    low, high = np.percentile(data, args)
+    if func is clip_percentiles:
+        expected = np.clip(data, low, high)
+    else:
+        expected = (np.array(data) - np.median(data)) / (high - low)
+    assert func(data, *args) == pytest.approx(expected.tolist())
+
+
+@pytest.mark.parametrize(
+    "scaler_class, func",
+    [(RobustScaler, robust_scale), (PercentileClipper, clip_percentiles)],
+)
+def test_quantile_scalers_merge_and_save(scaler_class, func, tmp_path):
+    """Los escaladores por cuantiles se combinan por bloques y se guardan/cargan."""
+    values = np.random.default_rng(0).standard_cauchy(50_000)
+    merged = (
+        scaler_class().fit(values[:20_000]).merge(scaler_class().fit(values[20_000:]))
+    )
+    whole = scaler_class().fit(values)
+    assert merged.transform(values[:5]) == pytest.approx(
+        whole.transform(values[:5]), rel=1e-3, abs=1e-3
+    )
+    parallel = parallel_map(func, values, workers=2, chunk_size=20_000)
+    assert parallel[:5] == pytest.approx(
+        whole.transform(values[:5]), rel=1e-3, abs=1e-3
+    )
+    path = str(tmp_path / "stats.json")
+    merged.save(path)
+    loaded = load_scaler(path)
+    assert isinstance(loaded, scaler_class)
+    assert loaded.transform(values[:5]) == pytest.approx(merged.transform(values[:5]))
+
+
+def test_count_min_sketch_never_underestimates():
+    """El count-min sketch nunca da menos apariciones de las reales."""
+    sketch = CountMinSketch(width=64, depth=3)
+    counts = {f"v{i}": i + 1 for i in range(200)}
+    sketch.add(counts)
+    assert (sketch.estimate(list(counts)) >= np.array(list(counts.values()))).all()
+
+
 @pytest.mark.parametrize(
     "data, new_min, new_max, expected",
     [
@@ -136,6 +288,36 @@ def test_convert_to_integers(data, expected):
     """Prueba la conversión de strings a enteros[cite: 63]."""
     assert convert_to_integers(data) == expected
 
+
+@pytest.mark.parametrize(
+    "data, as_array, expected, rejected",
+    [
+        (
+            ["10", "20.5", "texto", None, "-1.9", "inf", "1e3"],
+            False,
+            [10, 20, -1, 1000],
+            [2, 3, 5],
+        ),
+        (
+            ["12345678901234567891", "9007199254740993"],
+            False,
+            [12345678901234567891, 9007199254740993],
+            [],
+        ),
+        (["0.99999999999999999999", nan, True], False, [0, 1], [1]),
+        (["10", "12345678901234567891", ""], True, [10], [1, 2]),
+        (np.array([1.9, nan, -2.5]), False, [1, -2], [1]),
+        (np.array([1e300, 3.0]), True, [3], [0]),
+        ([str(i) for i in range(3000)] + ["x"], True, list(range(3000)), [3000]),
+    ],
+)
+def test_parse_integers(data, as_array, expected, rejected):
+    """Enteros exactos (sin pasar por float), int64 opcional y posiciones rechazadas."""
+    values, rejected_positions = parse_integers(data, as_array=as_array)
+    assert isinstance(values, np.ndarray) == as_array
+    assert list(values) == expected and rejected_positions == rejected
+
+
 @pytest.mark.parametrize(
     "data, expected",
     [
@@ -148,6 +330,113 @@ def test_logarithmic_transform(data, expected):
     """Prueba la transformación logarítmica."""
     assert logarithmic_transform(data) == pytest.approx(expected)
 
+
+@pytest.mark.parametrize(
+    "func, args, data, expected",
+    [
+        (
+            normalize_min_max,
+            (0.0, 1.0),
+            [10, 20, 30, 40, 50],
+            [0.0, 0.25, 0.5, 0.75, 1.0],
+        ),
+        (normalize_min_max, (0.0, 1.0), [5, 5, 5], [0.0, 0.0, 0.0]),
+        (standardize_z_score, (), [7, 7, 7], [0.0, 0.0, 0.0]),
+        (clip_values, (10, 20), [5, 10, 15, 20, 25], [10, 10, 15, 20, 20]),
+        (logarithmic_transform, (), [-10, 0, 5, 20], [math.log(5), math.log(20)]),
+    ],
+)
+def test_numeric_functions_with_ndarray(func, args, data, expected):
+    """Las funciones numéricas aceptan np.ndarray y devuelven np.ndarray."""
+    result = func(np.array(data), *args)
+    assert isinstance(result, np.ndarray)
+    assert result.tolist() == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "data, min_val, max_val, expected, dtype",
+    [
+        (np.array([1, 5, 9], dtype=np.int64), 2, 8, [2, 5, 8], np.int64),
+        (np.array([0, 200, 255], dtype=np.uint8), 10.0, 1000, [10, 200, 255], np.uint8),
+        (np.array([-5, 5], dtype=np.int32), -math.inf, 0, [-5, 0], np.int32),
+        (np.array([1, 5, 9], dtype=np.int64), 2.5, 8, [2.5, 5.0, 8.0], np.float64),
+        (np.array([1, 5], dtype=np.uint8), 300, 400, [300.0, 300.0], np.float64),
+    ],
+)
+def test_clip_values_integer_array_dtype(data, min_val, max_val, expected, dtype):
+    """Un array de enteros se recorta sin pasar a float si los límites caben en su dtype."""
+    result = clip_values(data, min_val, max_val)
+    assert result.dtype == dtype and result.tolist() == expected
+
+
+def test_numeric_functions_object_array_filters_non_numeric():
+    """Un array de tipo object se filtra igual que una lista."""
+    data = np.array([10, "skip", None, 20, 30], dtype=object)
+    assert normalize_min_max(data).tolist() == pytest.approx([0.0, 0.5, 1.0])
+    assert standardize_z_score(data).tolist() == pytest.approx(
+        standardize_z_score([10, 20, 30])
+    )
+
+
+@pytest.mark.parametrize("scaler_class", [MinMaxScaler, ZScoreScaler])
+def test_scaler_partial_fit_matches_fit(scaler_class, sample_numeric_list):
+    """Ajustar por bloques da las mismas estadísticas que ajustar de una vez."""
+    full = scaler_class().fit(sample_numeric_list)
+    chunked = (
+        scaler_class()
+        .partial_fit([10, 20])
+        .partial_fit([30, "skip"])
+        .partial_fit([40, 50])
+    )
+    assert chunked.to_dict() == pytest.approx(full.to_dict())
+    assert chunked.transform([25, 35]) == pytest.approx(full.transform([25, 35]))
+
+
+def test_scaler_fit_transform_matches_functions(sample_numeric_list):
+    """fit_transform reproduce normalize_min_max y standardize_z_score."""
+    assert MinMaxScaler(1.0, 2.0).fit_transform(sample_numeric_list) == pytest.approx(
+        normalize_min_max(sample_numeric_list, 1.0, 2.0)
+    )
+    assert ZScoreScaler().fit_transform(sample_numeric_list) == pytest.approx(
+        standardize_z_score(sample_numeric_list)
+    )
+
+
+def test_scaler_save_and_load(tmp_path, sample_numeric_list):
+    """Las estadísticas guardadas se recuperan con load_scaler."""
+    path = tmp_path / "stats.json"
+    ZScoreScaler().fit(sample_numeric_list).save(path)
+    loaded = load_scaler(path)
+    assert isinstance(loaded, ZScoreScaler)
+    assert loaded.mean_ == 30
+    assert loaded.transform([30]) == [0.0]
+
+
+def test_scaler_transform_without_fit_raises():
+    """transform antes de fit debe lanzar ValueError."""
+    with pytest.raises(ValueError):
+        MinMaxScaler().transform([1, 2, 3])
+
+
+def test_running_stats_merge_matches_numpy():
+    """Combinar bloques con merge da la misma media y desviación que NumPy."""
+    data = np.random.default_rng(0).normal(1e9, 3.0, size=1000)
+    merged = (
+        RunningStats()
+        .update_many(data[:300])
+        .merge(RunningStats().update_many(data[300:]))
+    )
+    one_by_one = RunningStats()
+    for value in data:
+        one_by_one.update(value)
+
+    for stats in (merged, one_by_one):
+        assert stats.count == 1000
+        assert stats.mean == pytest.approx(data.mean())
+        assert stats.std == pytest.approx(data.std())
+        assert (stats.min, stats.max) == (data.min(), data.max())
+
+
 # --- 4. Tests para Funciones de Texto (Text) ---
 
 @pytest.mark.parametrize(
@@ -184,6 +473,171 @@ def test_remove_stop_words(text, stop_words, expected):
     """Prueba la eliminación de stop-words."""
     assert remove_stop_words(text, stop_words) == expected
 
+
+def test_tokenizer_batch_api():
+    """tokenize_many devuelve listas de tokens o strings como tokenize_text."""
+    docs = ["Hola, mundo!", None, "Puntuación!!! 123"]
+    tokenizer = Tokenizer()
+    assert list(tokenizer.tokenize_many(docs)) == [
+        ["hola", "mundo"],
+        [],
+        ["puntuación", "123"],
+    ]
+    assert list(tokenizer.tokenize_many(docs, join=True)) == [
+        tokenize_text(doc) for doc in docs
+    ]
+    assert list(tokenizer.strip_punctuation_many(docs)) == [
+        select_alphanumeric_spaces(doc) for doc in docs
+    ]
+
+
+def test_tokenizer_without_lowercase():
+    """Con lowercase=False se conservan las mayúsculas."""
+    assert Tokenizer(lowercase=False).tokenize("Hola Mundo") == ["Hola", "Mundo"]
+
+
+@pytest.mark.parametrize(
+    "text, stop_words, expected",
+    [
+        ("por lo tanto vamos de viaje", ["de", "por lo tanto"], "vamos viaje"),
+        ("lo tanto por", ["por lo tanto"], "lo tanto por"),  # La frase debe ir completa
+        ("a b c d e", ["a b c", "b c d"], "e"),  # Frases solapadas
+        ("x x y z", ["x y"], "x z"),
+    ],
+)
+def test_stop_word_filter_phrases(text, stop_words, expected):
+    """El autómata elimina frases de varias palabras, incluso solapadas."""
+    stop_filter = StopWordFilter(stop_words)
+    assert stop_filter.filter(text) == expected
+    assert remove_stop_words(text, stop_words) == expected
+
+
+def test_stop_word_filter_from_file(tmp_path):
+    """El filtro se carga desde fichero y se reutiliza en lote."""
+    path = tmp_path / "stops.txt"
+    path.write_text("# comentario\nde\n\nla\n", encoding="utf-8")
+    stop_filter = StopWordFilter.from_file(path)
+    assert stop_filter.words == frozenset({"de", "la"})
+    assert list(stop_filter.filter_many(["La casa de Ana", None])) == ["casa ana", ""]
+
+
+@pytest.mark.parametrize(
+    "docs",
+    [
+        tokenize_many(["Hola mundo, hola", None, "el perro y el gato"]),
+        [
+            tokenize_text(doc)
+            for doc in ["Hola mundo, hola", None, "el perro y el gato"]
+        ],
+    ],
+)
+def test_count_vectorizer(docs):
+    """Acepta la salida de tokenize_many o de tokenize_text; una columna por token."""
+    vectorizer = CountVectorizer()
+    matrix = vectorizer.fit_transform(docs)
+    assert vectorizer.feature_names() == ["hola", "mundo", "el", "perro", "y", "gato"]
+    assert matrix.toarray().tolist() == [
+        [2, 1, 0, 0, 0, 0],
+        [0] * 6,
+        [0, 0, 2, 1, 1, 1],
+    ]
+    fixed = CountVectorizer(["gato", "hola"], binary=True).transform(docs)
+    assert fixed.toarray().tolist() == [[0, 1], [0, 0], [1, 0]]
+
+
+def test_count_vectorizer_growing_vocabulary_vstack():
+    """Los bloques transformados mientras crece el vocabulario se unen con vstack."""
+    vectorizer = CountVectorizer()
+    chunks = [[["a", "b"], ["a"]], [["c", "a"]]]
+    matrix = CSRMatrix.vstack(vectorizer.fit_transform(chunk) for chunk in chunks)
+    assert matrix.shape == (3, 3) and matrix.nnz == 5
+    assert matrix.toarray().tolist() == [[1, 1, 0], [1, 0, 0], [1, 0, 1]]
+
+
+def test_hashing_vectorizer_is_stable():
+    """Las columnas dependen solo del token: iguales en bloques y vectorizadores distintos."""
+    docs = tokenize_many(["uno dos dos", "tres uno"])
+    matrix = HashingVectorizer(n_features=64).transform(docs)
+    assert matrix.shape == (2, 64) and matrix.toarray().sum(axis=1).tolist() == [3, 2]
+    again = CSRMatrix.vstack(
+        HashingVectorizer(n_features=64).transform_many([docs[:1], docs[1:]])
+    )
+    assert np.array_equal(again.toarray(), matrix.toarray())
+    assert np.all(
+        np.diff(matrix.indices[matrix.indptr[0] : matrix.indptr[1]]) > 0
+    )  # Columnas ordenadas
+
+
+def test_csr_matrix_save_load(tmp_path):
+    """El .npz tiene las claves de scipy.sparse.save_npz y se vuelve a leer igual."""
+    path = tmp_path / "X.npz"
+    matrix = CountVectorizer().fit_transform([["a", "b", "a"], [], ["b"]])
+    matrix.save(str(path))
+    with np.load(path) as archive:
+        assert set(archive.files) == {"data", "indices", "indptr", "format", "shape"}
+        assert archive["format"].item() == b"csr"
+    loaded = CSRMatrix.load(str(path))
+    assert loaded.shape == (3, 2) and np.array_equal(loaded.toarray(), matrix.toarray())
+
+
+def test_vocabulary_fit_prunes_by_document_frequency():
+    """min_df/max_df (número o proporción) y max_size podan por documentos, no por apariciones."""
+    docs = [["a", "a", "b"], ["a", "c"], ["a", "b", "d"], ["b"]]
+    vocabulary = Vocabulary.fit(docs)
+    assert list(vocabulary) == ["a", "b", "c", "d"] and vocabulary.df.tolist() == [
+        3,
+        3,
+        1,
+        1,
+    ]
+    assert list(Vocabulary.fit(docs, min_df=2, max_df=0.5)) == []
+    assert list(Vocabulary.fit(docs, min_df=2)) == ["a", "b"]
+    assert list(Vocabulary.fit(docs, max_df=0.5)) == ["c", "d"]
+    assert list(Vocabulary.fit(docs, max_size=3)) == ["a", "b", "c"]
+    with pytest.raises(ValueError):
+        Vocabulary.fit(docs, max_df=1.5)
+
+
+def test_vocabulary_fit_with_spill_matches_memory(tmp_path):
+    """Con el volcado a disco por particiones el resultado es el mismo que en memoria."""
+    docs = [[f"t{(i * 7 + j) % 500}" for j in range(i % 20)] for i in range(2000)]
+    in_memory = Vocabulary.fit(docs, min_df=3)
+    spilled = Vocabulary.fit(
+        docs, min_df=3, memory_mb=0.001, spill_dir=str(tmp_path), partitions=4
+    )
+    assert list(spilled) == list(in_memory) and np.array_equal(spilled.df, in_memory.df)
+    assert list(tmp_path.iterdir()) == []  # Los ficheros del volcado se borran
+
+
+def test_vocabulary_lookup_and_mmap_load(tmp_path):
+    """save/load con mmap: get, get_many y [] devuelven los mismos ids."""
+    tokens = [f"palabra{i}" for i in range(1000)] + ["ñandú", ""]
+    vocabulary = Vocabulary(tokens)
+    vocabulary.save(str(tmp_path / "vocab"))
+    loaded = Vocabulary.load(str(tmp_path / "vocab"))
+    assert isinstance(loaded.table, np.memmap) and len(loaded) == len(tokens)
+    assert loaded["ñandú"] == 1000 and loaded.get("") == 1001 and "palabra7" in loaded
+    assert loaded.get("otra") == -1 and loaded.get(None) == -1
+    with pytest.raises(KeyError):
+        loaded["otra"]
+    query = ["palabra3", "otra", "palabra999", "palabra3"]
+    assert loaded.get_many(query).tolist() == [3, -1, 999, 3]
+    assert list(loaded) == tokens
+
+
+def test_count_vectorizer_with_persistent_vocabulary():
+    """Un Vocabulary es fijo: fit_transform no lo amplía y los desconocidos se ignoran."""
+    vocabulary = Vocabulary(["gato", "hola"])
+    vectorizer = CountVectorizer(vocabulary)
+    matrix = vectorizer.fit_transform([["hola", "perro", "hola"], ["gato"]])
+    assert matrix.toarray().tolist() == [
+        [0, 2],
+        [1, 0],
+    ] and vectorizer.feature_names() == ["gato", "hola"]
+    with pytest.raises(TypeError):
+        vectorizer.partial_fit([["perro"]])
+
+
 # --- 5. Tests para Funciones de Estructura (Struct) ---
 
 @pytest.mark.parametrize(
@@ -201,22 +655,48 @@ def test_flatten_list(data, expected):
     # la implementación y el test deberían cambiar.
     assert flatten_list(data) == expected
 
+
+@pytest.mark.parametrize(
+    "depth, expected",
+    [
+        (0, [1, [2, (3, [4])], "ab"]),
+        (1, [1, 2, (3, [4]), "ab"]),
+        (2, [1, 2, 3, [4], "ab"]),
+        (None, [1, 2, 3, 4, "ab"]),
+    ],
+)
+def test_flatten_list_depth(depth, expected):
+    """La profundidad limita cuántos niveles se aplanan; los str no se separan."""
+    assert flatten_list([1, [2, (3, [4])], "ab"], depth) == expected
+
+
+def test_iter_flatten_is_lazy_and_iterative():
+    """iter_flatten acepta generadores y arrays, es perezoso y no tiene límite de recursión."""
+    generator = iter_flatten((x for x in [[1, 2], np.array([[3], [4]])]))
+    assert next(generator) == 1
+    assert list(generator) == [2, 3, 4]
+    deep = [0]
+    for i in range(50_000):
+        deep = [deep, i]
+    assert sum(1 for _ in iter_flatten(deep)) == 50_001
+
+
 def test_shuffle_list_reproducibility():
     """Prueba la mezcla aleatoria y la reproducibilidad con seed[cite: 87]."""
     data = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-    
+
     # 1. Con la misma seed, el resultado es idéntico
     shuffled_1 = shuffle_list(data, seed=42)
     shuffled_2 = shuffle_list(data, seed=42)
     assert shuffled_1 == shuffled_2
-    
+
     # 2. Con diferente seed, el resultado es diferente
     shuffled_3 = shuffle_list(data, seed=101)
     assert shuffled_1 != shuffled_3
-    
+
     # 3. La lista original no debe ser modificada
     assert data == [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-    
+
     # 4. Sin seed, el resultado debe ser (muy probablemente) diferente
     shuffled_4 = shuffle_list(data, seed=None)
     shuffled_5 = shuffle_list(data, seed=None)
@@ -224,4 +704,379 @@ def test_shuffle_list_reproducibility():
     if data == shuffled_4: # Si no mezcló, intenta de nuevo
         shuffled_4 = shuffle_list(data, seed=None)
     assert data != shuffled_4
-    assert shuffled_4 != shuffled_5 # Probabilidad muy alta de ser cierto
\ No newline at end of file
+    assert shuffled_4 != shuffled_5  # Probabilidad muy alta de ser cierto
+
+
+def test_shuffle_list_isolated_rng():
+    """La semilla no toca el estado global de random; in_place mezcla la propia lista."""
+    import random
+
+    state = random.getstate()
+    data = list(range(20))
+    assert shuffle_list(data, seed=7) == shuffle_list(data, seed=7)
+    assert random.getstate() == state
+    expected = shuffle_list(data, seed=7)
+    assert shuffle_list(data, seed=7, in_place=True) is data and data == expected
+    array = np.arange(20)
+    assert np.array_equal(shuffle_list(array, seed=3), shuffle_list(array, seed=3))
+    assert np.array_equal(array, np.arange(20))
+
+
+@pytest.mark.parametrize("buffer_mb, partitions", [(512, 64), (0.01, 2), (0.01, 16)])
+def test_external_shuffle_is_reproducible_permutation(buffer_mb, partitions, tmp_path):
+    """Con o sin particiones en disco devuelve una permutación reproducible."""
+    data = list(range(30_000))
+    result = list(
+        external_shuffle(
+            data, buffer_mb, seed=5, spill_dir=str(tmp_path), partitions=partitions
+        )
+    )
+    assert sorted(result) == data and result != data
+    assert result == list(
+        external_shuffle(iter(data), buffer_mb, seed=5, partitions=partitions)
+    )
+    assert list(tmp_path.iterdir()) == []  # Los ficheros temporales se borran
+    if buffer_mb == 512:
+        assert result == shuffle_list(data, seed=5)
+
+
+@pytest.mark.parametrize("data", [list(range(1000)), range(1000), np.arange(1000)])
+def test_sample_list_reservoir(data):
+    """Devuelve k valores distintos en el orden de entrada, reproducibles por semilla."""
+    sample = list(sample_list(data, k=10, seed=3))
+    assert len(set(sample)) == 10 and sample == sorted(sample)
+    assert sample == list(sample_list(data, k=10, seed=3))
+    assert list(sample_list(data, k=2000, seed=3)) == list(data)
+
+
+def test_reservoir_sampler_is_uniform_across_chunks():
+    """Con bloques de cualquier tamaño cada valor tiene la misma probabilidad."""
+    counts = np.zeros(100)
+    for seed in range(2000):
+        sampler = ReservoirSampler(10, seed=seed)
+        for start in range(0, 100, 7):
+            sampler.update(list(range(start, min(start + 7, 100))))
+        counts[sampler.sample()] += 1
+    assert np.allclose(counts / 2000, 0.1, atol=0.03)
+
+
+def test_sample_list_weighted_and_stratified():
+    """Los pesos fijan la probabilidad (peso 0 nunca sale) y los estratos su cuota."""
+    hits = Counter(
+        x
+        for seed in range(4000)
+        for x in sample_list("abcd", k=1, seed=seed, weights=[0, 1, 1, 2])
+    )
+    assert "a" not in hits and abs(hits["d"] / 4000 - 0.5) < 0.04
+    sample = sample_list(
+        list(range(30)), k=2, seed=1, strata=[x % 3 for x in range(30)]
+    )
+    assert sorted(Counter(x % 3 for x in sample).values()) == [2, 2, 2]
+    with pytest.raises(ValueError):
+        sample_list([1, 2], k=1, weights=[1, -1])
+
+
+@pytest.mark.parametrize("fraction, expected", [(0, 0), (1, 100_000), (0.01, 1000)])
+def test_sample_list_fraction(fraction, expected):
+    """Con fraction el tamaño de la muestra es el esperado y se conserva el orden."""
+    sample = sample_list(range(100_000), fraction=fraction, seed=2)
+    assert abs(len(sample) - expected) <= 100 and sample == sorted(sample)
+
+
+# --- 6. Tests para el Pipeline ---
+
+
+@pytest.mark.parametrize(
+    "spec, data, expected",
+    [
+        (
+            "clean.remove-missing,numeric.to-integers,numeric.clip:0:100,numeric.normalize",
+            ["5", None, "250", "50", "", "x", "-3"],
+            [0.05, 1.0, 0.5, 0.0],
+        ),
+        ("clean.fill-missing:-1,clean.unique", [1, None, 2, "", 1], [1, -1, 2]),
+        (
+            "text.tokenize,text.remove-stops:de:la",
+            ["La casa DE Pedro!"],
+            ["casa pedro"],
+        ),
+        (
+            "numeric.standardize,numeric.clip:0:10",
+            [10, 20, 30],
+            [0.0, 0.0, 1.224744871391589],
+        ),
+    ],
+)
+def test_pipeline_matches_chained_functions(spec, data, expected):
+    """El pipeline da el mismo resultado en memoria y en streaming."""
+    chain = Pipeline.from_spec(spec)
+    assert chain.run(data) == pytest.approx(expected)
+    assert list(chain.stream(lambda: iter(data))) == pytest.approx(expected)
+
+
+def test_pipeline_is_lazy_until_barrier():
+    """Los pasos elemento a elemento no consumen la entrada hasta que se pide."""
+    consumed = []
+
+    def source():
+        for value in [1, 2, 3]:
+            consumed.append(value)
+            yield value
+
+    result = Pipeline.from_spec("numeric.clip:0:2,clean.unique").iter_run(source())
+    assert consumed == []
+    assert next(result) == 1
+    assert consumed == [1]
+
+
+def test_pipeline_unknown_step_raises():
+    """Un paso inexistente o con argumentos de más lanza ValueError."""
+    with pytest.raises(ValueError):
+        Pipeline.from_spec("clean.nope")
+    with pytest.raises(ValueError):
+        Pipeline.from_spec("numeric.clip:1")
+
+
+# --- 7. Tests para la ejecución en paralelo ---
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        partial(normalize_min_max, new_min=-1.0, new_max=1.0),
+        standardize_z_score,
+        remove_duplicated_values,
+        partial(clip_values, min_val=0, max_val=50),
+        remove_missing_values,
+    ],
+)
+def test_parallel_map_matches_serial(func):
+    """parallel_map da el mismo resultado que la función en serie."""
+    data = [x % 97 for x in range(1000)] + [None, "texto", nan] * 10
+    result = parallel_map(func, data, workers=2, chunk_size=64)
+    assert result == pytest.approx(func(data), nan_ok=True)
+
+
+def test_parallel_map_with_ndarray():
+    """Con un np.ndarray se devuelve un np.ndarray concatenado."""
+    data = np.arange(1, 101, dtype=float)
+    result = parallel_map(logarithmic_transform, data, workers=2, chunk_size=30)
+    assert isinstance(result, np.ndarray)
+    assert result == pytest.approx(np.log(data))
+
+
+# --- 8. Tests para el preprocesamiento de tablas ---
+
+from src.table import TablePipeline, parse_table_spec
+
+
+def test_table_pipeline_keeps_rows_aligned():
+    """Cada columna usa sus pasos; los valores descartados quedan como None."""
+    table = {
+        "id": ["1", "2", "3", "4"],
+        "age": ["30", "", "200", "abc"],
+        "comment": ["Hola, mundo", "el test", "", "007"],
+    }
+    chain = TablePipeline.from_spec(
+        "age: fill-missing 0 | clip 0 120 | normalize; comment: tokenize | remove-stops el"
+    )
+    result = chain.apply(table)
+    assert result["id"] == ["1", "2", "3", "4"]
+    assert result["age"] == [0.25, 0.0, 1.0, None]
+    assert result["comment"] == ["hola mundo", "test", None, "007"]
+
+
+def test_table_pipeline_parallel_matches_serial():
+    """Procesar las columnas en paralelo por bloques da el mismo resultado."""
+    chunks = [{"a": [str(i), "x"], "b": [str(i * i), ""]} for i in range(1, 6)]
+    chain = TablePipeline.from_spec(
+        "a: standardize; b: fill-missing 1 | log-transform | normalize"
+    )
+    serial = list(chain.run(lambda: iter(chunks)))
+    parallel = list(chain.run(lambda: iter(chunks), workers=2))
+    assert parallel == serial
+    assert serial[0]["b"][1] == 0.0  # fill-missing 1 -> log 0 -> mínimo
+
+
+@pytest.mark.parametrize(
+    "spec", ["", "age clip 0 1", "age: nope", "age: unique", "age: clip 1"]
+)
+def test_table_spec_errors(spec):
+    """Especificaciones mal formadas, pasos desconocidos o no disponibles en tablas."""
+    with pytest.raises(ValueError):
+        TablePipeline(parse_table_spec(spec))
+
+
+# --- 9. Tests para la lectura/escritura de arrays (.npy / .npz) ---
+
+from src.array_io import iter_array_chunks, open_array, write_npy
+
+
+def test_array_chunks_from_npy_and_npz(tmp_path):
+    """Los .npy y .npz (comprimidos o no) se leen por bloques; los mapeables sin copias."""
+    values = np.arange(10, dtype=float)
+    np.save(tmp_path / "a.npy", values)
+    np.savez(tmp_path / "b.npz", x=values * 2, y=values)
+    np.savez_compressed(tmp_path / "c.npz", x=values * 3)
+
+    chunks = list(iter_array_chunks(str(tmp_path / "a.npy"), chunk_size=4))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert isinstance(chunks[0], np.memmap)
+    assert isinstance(open_array(str(tmp_path / "b.npz"), "y"), np.memmap)
+    assert np.concatenate(
+        list(iter_array_chunks(str(tmp_path / "b.npz"), 3, "y"))
+    ) == pytest.approx(values)
+    assert np.concatenate(
+        list(iter_array_chunks(str(tmp_path / "c.npz"), 3))
+    ) == pytest.approx(values * 3)
+    with pytest.raises(ValueError):
+        list(iter_array_chunks(str(tmp_path / "b.npz"), key="z"))
+
+
+@pytest.mark.parametrize(
+    "chunks, dtype",
+    [
+        ([np.arange(3.0), np.arange(2.0)], np.float64),
+        ([[1, 2], [3]], np.int64),
+        ([], np.float64),
+    ],
+)
+def test_write_npy_roundtrip(tmp_path, chunks, dtype):
+    """write_npy escribe un .npy válido sin conocer la longitud de antemano."""
+    path = str(tmp_path / "out.npy")
+    count = write_npy(chunks, path)
+    loaded = np.load(path)
+    assert count == loaded.size == sum(len(chunk) for chunk in chunks)
+    assert loaded.dtype == dtype
+
+
+def test_write_npy_promotes_dtype(tmp_path):
+    """Un bloque de decimales tras uno de enteros promueve todo el fichero, sin truncar."""
+    path = str(tmp_path / "out.npy")
+    assert write_npy([[], np.arange(5), [1.5, nan]], path) == 7
+    loaded = np.load(path)
+    assert loaded.dtype == np.float64
+    assert loaded[:6].tolist() == [0, 1, 2, 3, 4, 1.5] and np.isnan(loaded[6])
+    with pytest.raises(ValueError):
+        write_npy([[1, 2], [2.5]], str(tmp_path / "fijo.npy"), dtype=np.int64)
+
+
+# --- 10. Tests para la lectura de valores (parsing) ---
+
+
+@pytest.mark.parametrize(
+    "token, expected",
+    [
+        ("10", 10),
+        ("10.0", 10),
+        ("2.5", 2.5),
+        ("-3", -3),
+        ("1e3", 1000),
+        ("None", None),
+        ("NONE", None),
+        ("", ""),
+        ("texto", "texto"),
+        ("inf", float("inf")),
+    ],
+)
+def test_parse_value(token, expected):
+    """parse_value mantiene las reglas de la CLI (None, nan, "", int, float, str)."""
+    result = parse_value(token)
+    assert result == expected and type(result) is type(expected)
+
+
+@pytest.mark.parametrize(
+    "tokens",
+    [
+        [str(i) for i in range(2000)],
+        [str(i / 4) for i in range(2000)],
+        [str(i) for i in range(1500)] + ["none", "nan", "", "x"] + ["7"] * 1500,
+        ["hola", "10", "NaN", "2.5", ""] * 200,
+        [str(2**70), "1.5"] * 100,
+    ],
+)
+def test_parse_values_matches_parse_value(tokens):
+    """El parser por bloques da el mismo resultado (y tipos) que valor a valor."""
+    bulk = parse_values(tokens)
+    scalar = [parse_value(token) for token in tokens]
+    assert bulk == pytest.approx(scalar, nan_ok=True)
+    assert [type(value) for value in bulk] == [type(value) for value in scalar]
+
+
+# --- 11. Tests para la deduplicación en streaming ---
+
+
+def test_remove_duplicated_values_unhashable():
+    """Las listas y dicts anidados se deduplican por su contenido."""
+    data = [[1, 2], 3, [1, 2], {"a": [1]}, {"a": [1]}, 3, [2, 1]]
+    assert remove_duplicated_values(data) == [[1, 2], 3, {"a": [1]}, [2, 1]]
+
+
+@pytest.mark.parametrize("memory_mb, partitions", [(512, 64), (0.001, 1), (0.001, 7)])
+def test_streaming_deduplicator_spill_matches_memory(memory_mb, partitions, tmp_path):
+    """Con volcado a disco el resultado es el mismo, en el orden de primera aparición."""
+    data = [i * 7 % 1000 for i in range(20_000)] + [nan, [1, 2], nan, [1, 2], "x", 5]
+    dedup = StreamingDeduplicator(memory_mb, partitions, spill_dir=str(tmp_path))
+    result = list(dedup.iter_unique(data))
+    assert dedup.spilled == (memory_mb < 1)
+    assert result[:1000] == [i * 7 % 1000 for i in range(1000)]
+    assert np.isnan(result[1000]) and result[1001:] == [[1, 2], "x"]
+    assert list(tmp_path.iterdir()) == []  # Los ficheros temporales se borran
+
+
+# --- 12. Tests para la deduplicación aproximada (filtro de Bloom) ---
+
+
+@pytest.mark.parametrize(
+    "chunk",
+    [
+        [5, 3, 5, 1, 3],
+        np.array([5, 3, 5, 1, 3]),
+        ["b", "a", "b", nan, [1], nan, [1]],
+    ],
+)
+def test_bloom_filter_dedupes_chunk_in_order(chunk):
+    """Dentro de un bloque los repetidos se quitan de forma exacta y en orden."""
+    result = BloomFilter(1000, 0.01).filter_new(chunk)
+    assert list(map(str, result)) == list(dict.fromkeys(map(str, chunk)))
+
+
+def test_bloom_filter_never_lets_duplicates_through():
+    """Un valor ya visto nunca vuelve a salir, venga del camino vectorizado o no."""
+    bloom = BloomFilter(10_000, 0.001)
+    bloom.filter_new(list(range(5000)))
+    assert bloom.filter_new([1.0, True, 4999, "nuevo", 5000]) == ["nuevo", 5000]
+    assert 42 in bloom and "otro" not in bloom
+
+
+def test_bloom_filter_false_positive_rate():
+    """Lleno hasta su capacidad, la tasa de falsos positivos es la pedida."""
+    bloom = BloomFilter(20_000, 0.01)
+    bloom.filter_new(list(range(20_000)))
+    fresh = list(range(10**9, 10**9 + 20_000))
+    assert 1 - len(bloom.filter_new(fresh)) / len(fresh) < 0.02
+
+
+def test_bloom_filter_save_load(tmp_path):
+    """El estado guardado sigue filtrando los valores vistos en otra ejecución."""
+    path = str(tmp_path / "vistos.npz")
+    bloom = BloomFilter(1000, 0.01)
+    bloom.filter_new(["a", "b", 1])
+    bloom.save(path)
+    restored = BloomFilter.load(path)
+    assert restored.count == 3
+    assert restored.filter_new(["b", "c", 1, 2]) == ["c", 2]
+
+
+def test_remove_duplicated_values_approximate():
+    """El modo aproximado devuelve lo mismo que el exacto sin falsos positivos."""
+    data = [3, "a", 3, [1], "a", [1], 7]
+    assert remove_duplicated_values(data, approximate=True) == remove_duplicated_values(
+        data
+    )
+    assert parallel_map(
+        partial(remove_duplicated_values, approximate=True),
+        data * 10,
+        workers=2,
+        chunk_size=4,
+    ) == [3, "a", [1], 7]